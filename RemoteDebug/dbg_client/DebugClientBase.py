@@ -27,6 +27,12 @@ from AsyncFile import *
 from DebugConfig import ConfigVarTypeStrings
 from FlexCompleter import Completer
 
+# the command dispatcher is shared with the eric6 debug client, it is loaded
+# by its file name to leave the search path of the debugged program alone
+CommandDispatcher = imp.load_source('DebugClientCommandDispatcher',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                 'dbg_client_eric6', 'CommandDispatcher.py')).CommandDispatcher
+
 
 DebugClientInstance = None
 
@@ -223,6 +229,10 @@ class DebugClientBase(object):
         
         self.skipdirs = sys.path[:]
         
+        # handlers of the protocol commands sent by the IDE
+        self.commandDispatcher = CommandDispatcher()
+        self.__registerCommands()
+        
         self.variant = 'You should not see this'
         
         # commandline completion stuff
@@ -372,6 +382,48 @@ class DebugClientBase(object):
             # Ok, go away.
             sys.exit()
 
+    def __registerCommands(self):
+        """
+        Private method to register the handlers of the protocol commands sent
+        by the IDE.
+        """
+        for cmd, handler in (
+            (RequestVariables, self.__handleRequestVariables),
+            (RequestVariable, self.__handleRequestVariable),
+            (RequestThreadList, self.__handleRequestThreadList),
+            (RequestThreadSet, self.__handleRequestThreadSet),
+            (RequestStep, self.__handleRequestStep),
+            (RequestStepOver, self.__handleRequestStepOver),
+            (RequestStepOut, self.__handleRequestStepOut),
+            (RequestStepQuit, self.__handleRequestStepQuit),
+            (RequestContinue, self.__handleRequestContinue),
+            (RequestOK, self.__handleRequestOK),
+            (RequestEnv, self.__handleRequestEnv),
+            (RequestLoad, self.__handleRequestLoad),
+            (RequestRun, self.__handleRequestRun),
+            (RequestCoverage, self.__handleRequestCoverage),
+            (RequestProfile, self.__handleRequestProfile),
+            (RequestShutdown, self.__handleRequestShutdown),
+            (RequestBreak, self.__handleRequestBreak),
+            (RequestBreakEnable, self.__handleRequestBreakEnable),
+            (RequestBreakIgnore, self.__handleRequestBreakIgnore),
+            (RequestWatch, self.__handleRequestWatch),
+            (RequestWatchEnable, self.__handleRequestWatchEnable),
+            (RequestWatchIgnore, self.__handleRequestWatchIgnore),
+            (RequestEval, self.__handleRequestEval),
+            (RequestExec, self.__handleRequestExec),
+            (RequestBanner, self.__handleRequestBanner),
+            (RequestCapabilities, self.__handleRequestCapabilities),
+            (RequestCompletion, self.__handleRequestCompletion),
+            (RequestSetFilter, self.__handleRequestSetFilter),
+            (RequestUTPrepare, self.__handleRequestUTPrepare),
+            (RequestUTRun, self.__handleRequestUTRun),
+            (RequestUTStop, self.__handleRequestUTStop),
+            (ResponseForkTo, self.__handleResponseForkTo),
+            (RequestForkMode, self.__handleRequestForkMode),
+        ):
+            self.commandDispatcher.register(cmd, handler)
+
     def handleLine(self,line):
         """
         Public method to handle the receipt of a complete line.
@@ -394,486 +446,7 @@ class DebugClientBase(object):
             cmd = line[:eoc + 1]
             arg = line[eoc + 1:]
             
-            if cmd == RequestVariables:
-                frmnr, scope, filter = eval(arg)
-                self.__dumpVariables(int(frmnr), int(scope), filter)
-                return
-            
-            if cmd == RequestVariable:
-                var, frmnr, scope, filter = eval(arg)
-                self.__dumpVariable(var, int(frmnr), int(scope), filter)
-                return
-            
-            if cmd == RequestThreadList:
-                self.__dumpThreadList()
-                return
-            
-            if cmd == RequestThreadSet:
-                tid = eval(arg)
-                if tid in self.threads:
-                    self.setCurrentThread(tid)
-                    self.write(ResponseThreadSet + '\n')
-                    stack = self.currentThread.getStack()
-                    self.write('%s%s\n' % (ResponseStack, unicode(stack)))
-                return
-            
-            if cmd == RequestStep:
-                self.currentThread.step(1)
-                self.eventExit = 1
-                return
-
-            if cmd == RequestStepOver:
-                self.currentThread.step(0)
-                self.eventExit = 1
-                return
-            
-            if cmd == RequestStepOut:
-                self.currentThread.stepOut()
-                self.eventExit = 1
-                return
-            
-            if cmd == RequestStepQuit:
-                if self.passive:
-                    self.progTerminated(42)
-                else:
-                    self.set_quit()
-                    self.eventExit = 1
-                return
-
-            if cmd == RequestContinue:
-                special = int(arg)
-                self.currentThread.go(special)
-                self.eventExit = 1
-                return
-
-            if cmd == RequestOK:
-                self.write(self.pendingResponse + '\n')
-                self.pendingResponse = ResponseOK
-                return
-
-            if cmd == RequestEnv:
-                env = eval(arg)
-                for key, value in env.items():
-                    if key.endswith("+"):
-                        if os.environ.has_key(key[:-1]):
-                            os.environ[key[:-1]] += value
-                        else:
-                            os.environ[key[:-1]] = value
-                    else:
-                        os.environ[key] = value
-                return
-
-            if cmd == RequestLoad:
-                self._fncache = {}
-                self.dircache = []
-                sys.argv = []
-                wd, fn, args, tracePython = arg.split('|')
-                self.__setCoding(fn)
-                try:
-                    sys.setappdefaultencoding(self.__coding)
-                except AttributeError:
-                    pass
-                sys.argv.append(fn)
-                sys.argv.extend(eval(args))
-                sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-                if wd == '':
-                    os.chdir(sys.path[1])
-                else:
-                    os.chdir(wd)
-                tracePython = int(tracePython)
-                self.running = sys.argv[0]
-                self.mainFrame = None
-                self.inRawMode = 0
-                self.debugging = 1
-                
-                self.threads.clear()
-                self.attachThread(mainThread = 1)
-                
-                # set the system exception handling function to ensure, that
-                # we report on all unhandled exceptions
-                sys.excepthook = self.__unhandled_exception
-                
-                # clear all old breakpoints, they'll get set after we have started
-                self.mainThread.clear_all_breaks()
-                
-                self.mainThread.tracePython = tracePython
-                
-                # This will eventually enter a local event loop.
-                # Note the use of backquotes to cause a repr of self.running. The
-                # need for this is on Windows os where backslash is the path separator.
-                # They will get inadvertantly stripped away during the eval causing 
-                # IOErrors, if self.running is passed as a normal str.
-                self.debugMod.__dict__['__file__'] = self.running
-                sys.modules['__main__'] = self.debugMod
-                res = self.mainThread.run('execfile(' + `self.running` + ')',
-                                          self.debugMod.__dict__)
-                self.progTerminated(res)
-                return
-
-            if cmd == RequestRun:
-                sys.argv = []
-                wd, fn, args = arg.split('|')
-                self.__setCoding(fn)
-                try:
-                    sys.setappdefaultencoding(self.__coding)
-                except AttributeError:
-                    pass
-                sys.argv.append(fn)
-                sys.argv.extend(eval(args))
-                sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-                if wd == '':
-                    os.chdir(sys.path[1])
-                else:
-                    os.chdir(wd)
-
-                self.running = sys.argv[0]
-                self.mainFrame = None
-                self.botframe = None
-                self.inRawMode = 0
-                
-                self.threads.clear()
-                self.attachThread(mainThread = 1)
-                
-                # set the system exception handling function to ensure, that
-                # we report on all unhandled exceptions
-                sys.excepthook = self.__unhandled_exception
-                
-                self.mainThread.tracePython = 0
-                
-                self.debugMod.__dict__['__file__'] = sys.argv[0]
-                sys.modules['__main__'] = self.debugMod
-                res = 0
-                try:
-                    execfile(sys.argv[0], self.debugMod.__dict__)
-                except SystemExit as exc:
-                    res = exc.code
-                    atexit._run_exitfuncs()
-                self.writestream.flush()
-                self.progTerminated(res)
-                return
-
-            if cmd == RequestCoverage:
-                from coverage import coverage
-                sys.argv = []
-                wd, fn, args, erase = arg.split('@@')
-                self.__setCoding(fn)
-                try:
-                    sys.setappdefaultencoding(self.__coding)
-                except AttributeError:
-                    pass
-                sys.argv.append(fn)
-                sys.argv.extend(eval(args))
-                sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-                if wd == '':
-                    os.chdir(sys.path[1])
-                else:
-                    os.chdir(wd)
-                
-                # set the system exception handling function to ensure, that
-                # we report on all unhandled exceptions
-                sys.excepthook = self.__unhandled_exception
-                
-                # generate a coverage object
-                self.cover = coverage(auto_data = True, 
-                    data_file = "%s.coverage" % os.path.splitext(sys.argv[0])[0])
-                self.cover.use_cache(True)
-                
-                if int(erase):
-                    self.cover.erase()
-                sys.modules['__main__'] = self.debugMod
-                self.debugMod.__dict__['__file__'] = sys.argv[0]
-                self.running = sys.argv[0]
-                res = 0
-                self.cover.start()
-                try:
-                    execfile(sys.argv[0], self.debugMod.__dict__)
-                except SystemExit as exc:
-                    res = exc.code
-                    atexit._run_exitfuncs()
-                self.cover.stop()
-                self.cover.save()
-                self.writestream.flush()
-                self.progTerminated(res)
-                return
-
-            if cmd == RequestProfile:
-                sys.setprofile(None)
-                import PyProfile
-                sys.argv = []
-                wd, fn, args, erase = arg.split('|')
-                self.__setCoding(fn)
-                try:
-                    sys.setappdefaultencoding(self.__coding)
-                except AttributeError:
-                    pass
-                sys.argv.append(fn)
-                sys.argv.extend(eval(args))
-                sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-                if wd == '':
-                    os.chdir(sys.path[1])
-                else:
-                    os.chdir(wd)
-
-                # set the system exception handling function to ensure, that
-                # we report on all unhandled exceptions
-                sys.excepthook = self.__unhandled_exception
-                
-                # generate a profile object
-                self.prof = PyProfile.PyProfile(sys.argv[0])
-                
-                if int(erase):
-                    self.prof.erase()
-                self.debugMod.__dict__['__file__'] = sys.argv[0]
-                sys.modules['__main__'] = self.debugMod
-                self.running = sys.argv[0]
-                res = 0
-                try:
-                    self.prof.run('execfile(%r)' % sys.argv[0])
-                except SystemExit as exc:
-                    res = exc.code
-                    atexit._run_exitfuncs()
-                self.prof.save()
-                self.writestream.flush()
-                self.progTerminated(res)
-                return
-
-            if cmd == RequestShutdown:
-                self.sessionClose()
-                return
-            
-            if cmd == RequestBreak:
-                fn, line, temporary, set, cond = arg.split('@@')
-                line = int(line)
-                set = int(set)
-                temporary = int(temporary)
-
-                if set:
-                    if cond == 'None' or cond == '':
-                        cond = None
-                    else:
-                        try:
-                            compile(cond, '<string>', 'eval')
-                        except SyntaxError:
-                            self.write('%s%s,%d\n' % \
-                                (ResponseBPConditionError, fn, line))
-                            return
-                    self.mainThread.set_break(fn, line, temporary, cond)
-                else:
-                    self.mainThread.clear_break(fn, line)
-
-                return
-            
-            if cmd == RequestBreakEnable:
-                fn, line, enable = arg.split(',')
-                line = int(line)
-                enable = int(enable)
-                
-                bp = self.mainThread.get_break(fn, line)
-                if bp is not None:
-                    if enable:
-                        bp.enable()
-                    else:
-                        bp.disable()
-                    
-                return
-            
-            if cmd == RequestBreakIgnore:
-                fn, line, count = arg.split(',')
-                line = int(line)
-                count = int(count)
-                
-                bp = self.mainThread.get_break(fn, line)
-                if bp is not None:
-                    bp.ignore = count
-                    
-                return
-            
-            if cmd == RequestWatch:
-                cond, temporary, set = arg.split('@@')
-                set = int(set)
-                temporary = int(temporary)
-
-                if set:
-                    if not cond.endswith('??created??') and \
-                       not cond.endswith('??changed??'):
-                        try:
-                            compile(cond, '<string>', 'eval')
-                        except SyntaxError:
-                            self.write('%s%s\n' % (ResponseWPConditionError, cond))
-                            return
-                    self.mainThread.set_watch(cond, temporary)
-                else:
-                    self.mainThread.clear_watch(cond)
-
-                return
-            
-            if cmd == RequestWatchEnable:
-                cond, enable = arg.split(',')
-                enable = int(enable)
-                
-                bp = self.mainThread.get_watch(cond)
-                if bp is not None:
-                    if enable:
-                        bp.enable()
-                    else:
-                        bp.disable()
-                    
-                return
-            
-            if cmd == RequestWatchIgnore:
-                cond, count = arg.split(',')
-                count = int(count)
-                
-                bp = self.mainThread.get_watch(cond)
-                if bp is not None:
-                    bp.ignore = count
-                    
-                return
-            
-            if cmd == RequestEval:
-                try:
-                    value = eval(arg, self.currentThread.getCurrentFrame().f_globals,
-                                      self.currentThread.getCurrentFrameLocals())
-                except:
-                    # Report the exception and the traceback
-                    try:
-                        type, value, tb = sys.exc_info()
-                        sys.last_type = type
-                        sys.last_value = value
-                        sys.last_traceback = tb
-                        tblist = traceback.extract_tb(tb)
-                        del tblist[:1]
-                        list = traceback.format_list(tblist)
-                        if list:
-                            list.insert(0, "Traceback (innermost last):\n")
-                            list[len(list):] = \
-                                traceback.format_exception_only(type, value)
-                    finally:
-                        tblist = tb = None
-
-                    map(self.write,list)
-
-                    self.write(ResponseException + '\n')
-                
-                else:
-                    self.write(unicode(value) + '\n')
-                    self.write(ResponseOK + '\n')
-                
-                return
-            
-            if cmd == RequestExec:
-                _globals = self.currentThread.getCurrentFrame().f_globals
-                _locals = self.currentThread.getCurrentFrameLocals()
-                try:
-                    code = compile(arg + '\n', '<stdin>', 'single')
-                    exec code in _globals, _locals
-                except:
-                    # Report the exception and the traceback
-                    try:
-                        type, value, tb = sys.exc_info()
-                        sys.last_type = type
-                        sys.last_value = value
-                        sys.last_traceback = tb
-                        tblist = traceback.extract_tb(tb)
-                        del tblist[:1]
-                        list = traceback.format_list(tblist)
-                        if list:
-                            list.insert(0, "Traceback (innermost last):\n")
-                            list[len(list):] = \
-                                traceback.format_exception_only(type, value)
-                    finally:
-                        tblist = tb = None
-
-                    map(self.write, list)
-
-                    self.write(ResponseException + '\n')
-                
-                return
-            
-            if cmd == RequestBanner:
-                self.write('%s%s\n' % (ResponseBanner, 
-                    unicode(("Python %s" % sys.version, socket.gethostname(), 
-                             self.variant))))
-                return
-            
-            if cmd == RequestCapabilities:
-                self.write('%s%d, "Python"\n' % (ResponseCapabilities, 
-                    self.__clientCapabilities()))
-                return
-            
-            if cmd == RequestCompletion:
-                self.__completionList(arg)
-                return
-            
-            if cmd == RequestSetFilter:
-                scope, filterString = eval(arg)
-                self.__generateFilterObjects(int(scope), filterString)
-                return
-            
-            if cmd == RequestUTPrepare:
-                fn, tn, tfn, cov, covname, erase = arg.split('|')
-                sys.path.insert(0, os.path.dirname(os.path.abspath(fn)))
-                os.chdir(sys.path[0])
-
-                # set the system exception handling function to ensure, that
-                # we report on all unhandled exceptions
-                sys.excepthook = self.__unhandled_exception
-                
-                try:
-                    import unittest
-                    utModule = __import__(tn)
-                    try:
-                        self.test = unittest.defaultTestLoader\
-                                    .loadTestsFromName(tfn, utModule)
-                    except AttributeError:
-                        self.test = unittest.defaultTestLoader\
-                                    .loadTestsFromModule(utModule)
-                except:
-                    exc_type, exc_value, exc_tb = sys.exc_info()
-                    self.write('%s%s\n' % (ResponseUTPrepared,
-                        unicode((0, str(exc_type), str(exc_value)))))
-                    self.__exceptionRaised()
-                    return
-                
-                # generate a coverage object
-                if int(cov):
-                    from coverage import coverage
-                    self.cover = coverage(auto_data = True, 
-                        data_file = "%s.coverage" % os.path.splitext(covname)[0])
-                    self.cover.use_cache(True)
-                    if int(erase):
-                        self.cover.erase()
-                else:
-                    self.cover = None
-                
-                self.write('%s%s\n' % (ResponseUTPrepared,
-                    unicode((self.test.countTestCases(), "", ""))))
-                return
-            
-            if cmd == RequestUTRun:
-                from DCTestResult import DCTestResult
-                self.testResult = DCTestResult(self)
-                if self.cover:
-                    self.cover.start()
-                self.test.run(self.testResult)
-                if self.cover:
-                    self.cover.stop()
-                    self.cover.save()
-                self.write('%s\n' % ResponseUTFinished)
-                return
-            
-            if cmd == RequestUTStop:
-                self.testResult.stop()
-                return
-            
-            if cmd == ResponseForkTo:
-                # this results from a separate event loop
-                self.fork_child = (arg == 'child')
-                self.eventExit = 1
-                return
-            
-            if cmd == RequestForkMode:
-                self.fork_auto, self.fork_child = eval(arg)
+            if self.commandDispatcher.dispatch(cmd, arg):
                 return
         
         # If we are handling raw mode input then reset the mode and break out
@@ -959,6 +532,612 @@ class DebugClientBase(object):
 
                     map(self.write, list)
 
+    def __handleRequestVariables(self, arg):
+        """
+        Private method handling the RequestVariables command.
+        
+        @param arg argument of the command (string)
+        """
+        frmnr, scope, filter = eval(arg)
+        self.__dumpVariables(int(frmnr), int(scope), filter)
+
+    def __handleRequestVariable(self, arg):
+        """
+        Private method handling the RequestVariable command.
+        
+        @param arg argument of the command (string)
+        """
+        var, frmnr, scope, filter = eval(arg)
+        self.__dumpVariable(var, int(frmnr), int(scope), filter)
+
+    def __handleRequestThreadList(self, arg):
+        """
+        Private method handling the RequestThreadList command.
+        
+        @param arg argument of the command (string)
+        """
+        self.__dumpThreadList()
+
+    def __handleRequestThreadSet(self, arg):
+        """
+        Private method handling the RequestThreadSet command.
+        
+        @param arg argument of the command (string)
+        """
+        tid = eval(arg)
+        if tid in self.threads:
+            self.setCurrentThread(tid)
+            self.write(ResponseThreadSet + '\n')
+            stack = self.currentThread.getStack()
+            self.write('%s%s\n' % (ResponseStack, unicode(stack)))
+
+    def __handleRequestStep(self, arg):
+        """
+        Private method handling the RequestStep command.
+        
+        @param arg argument of the command (string)
+        """
+        self.currentThread.step(1)
+        self.eventExit = 1
+
+    def __handleRequestStepOver(self, arg):
+        """
+        Private method handling the RequestStepOver command.
+        
+        @param arg argument of the command (string)
+        """
+        self.currentThread.step(0)
+        self.eventExit = 1
+
+    def __handleRequestStepOut(self, arg):
+        """
+        Private method handling the RequestStepOut command.
+        
+        @param arg argument of the command (string)
+        """
+        self.currentThread.stepOut()
+        self.eventExit = 1
+
+    def __handleRequestStepQuit(self, arg):
+        """
+        Private method handling the RequestStepQuit command.
+        
+        @param arg argument of the command (string)
+        """
+        if self.passive:
+            self.progTerminated(42)
+        else:
+            self.set_quit()
+            self.eventExit = 1
+
+    def __handleRequestContinue(self, arg):
+        """
+        Private method handling the RequestContinue command.
+        
+        @param arg argument of the command (string)
+        """
+        special = int(arg)
+        self.currentThread.go(special)
+        self.eventExit = 1
+
+    def __handleRequestOK(self, arg):
+        """
+        Private method handling the RequestOK command.
+        
+        @param arg argument of the command (string)
+        """
+        self.write(self.pendingResponse + '\n')
+        self.pendingResponse = ResponseOK
+
+    def __handleRequestEnv(self, arg):
+        """
+        Private method handling the RequestEnv command.
+        
+        @param arg argument of the command (string)
+        """
+        env = eval(arg)
+        for key, value in env.items():
+            if key.endswith("+"):
+                if os.environ.has_key(key[:-1]):
+                    os.environ[key[:-1]] += value
+                else:
+                    os.environ[key[:-1]] = value
+            else:
+                os.environ[key] = value
+
+    def __handleRequestLoad(self, arg):
+        """
+        Private method handling the RequestLoad command.
+        
+        @param arg argument of the command (string)
+        """
+        self._fncache = {}
+        self.dircache = []
+        sys.argv = []
+        wd, fn, args, tracePython = arg.split('|')
+        self.__setCoding(fn)
+        try:
+            sys.setappdefaultencoding(self.__coding)
+        except AttributeError:
+            pass
+        sys.argv.append(fn)
+        sys.argv.extend(eval(args))
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if wd == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(wd)
+        tracePython = int(tracePython)
+        self.running = sys.argv[0]
+        self.mainFrame = None
+        self.inRawMode = 0
+        self.debugging = 1
+        
+        self.threads.clear()
+        self.attachThread(mainThread = 1)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        
+        # clear all old breakpoints, they'll get set after we have started
+        self.mainThread.clear_all_breaks()
+        
+        self.mainThread.tracePython = tracePython
+        
+        # This will eventually enter a local event loop.
+        # Note the use of backquotes to cause a repr of self.running. The
+        # need for this is on Windows os where backslash is the path separator.
+        # They will get inadvertantly stripped away during the eval causing 
+        # IOErrors, if self.running is passed as a normal str.
+        self.debugMod.__dict__['__file__'] = self.running
+        sys.modules['__main__'] = self.debugMod
+        res = self.mainThread.run('execfile(' + `self.running` + ')',
+                                  self.debugMod.__dict__)
+        self.progTerminated(res)
+
+    def __handleRequestRun(self, arg):
+        """
+        Private method handling the RequestRun command.
+        
+        @param arg argument of the command (string)
+        """
+        sys.argv = []
+        wd, fn, args = arg.split('|')
+        self.__setCoding(fn)
+        try:
+            sys.setappdefaultencoding(self.__coding)
+        except AttributeError:
+            pass
+        sys.argv.append(fn)
+        sys.argv.extend(eval(args))
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if wd == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(wd)
+        
+        self.running = sys.argv[0]
+        self.mainFrame = None
+        self.botframe = None
+        self.inRawMode = 0
+        
+        self.threads.clear()
+        self.attachThread(mainThread = 1)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        
+        self.mainThread.tracePython = 0
+        
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        sys.modules['__main__'] = self.debugMod
+        res = 0
+        try:
+            execfile(sys.argv[0], self.debugMod.__dict__)
+        except SystemExit as exc:
+            res = exc.code
+            atexit._run_exitfuncs()
+        self.writestream.flush()
+        self.progTerminated(res)
+
+    def __handleRequestCoverage(self, arg):
+        """
+        Private method handling the RequestCoverage command.
+        
+        @param arg argument of the command (string)
+        """
+        from coverage import coverage
+        sys.argv = []
+        wd, fn, args, erase = arg.split('@@')
+        self.__setCoding(fn)
+        try:
+            sys.setappdefaultencoding(self.__coding)
+        except AttributeError:
+            pass
+        sys.argv.append(fn)
+        sys.argv.extend(eval(args))
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if wd == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(wd)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        
+        # generate a coverage object
+        self.cover = coverage(auto_data = True, 
+            data_file = "%s.coverage" % os.path.splitext(sys.argv[0])[0])
+        self.cover.use_cache(True)
+        
+        if int(erase):
+            self.cover.erase()
+        sys.modules['__main__'] = self.debugMod
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        self.running = sys.argv[0]
+        res = 0
+        self.cover.start()
+        try:
+            execfile(sys.argv[0], self.debugMod.__dict__)
+        except SystemExit as exc:
+            res = exc.code
+            atexit._run_exitfuncs()
+        self.cover.stop()
+        self.cover.save()
+        self.writestream.flush()
+        self.progTerminated(res)
+
+    def __handleRequestProfile(self, arg):
+        """
+        Private method handling the RequestProfile command.
+        
+        @param arg argument of the command (string)
+        """
+        sys.setprofile(None)
+        import PyProfile
+        sys.argv = []
+        wd, fn, args, erase = arg.split('|')
+        self.__setCoding(fn)
+        try:
+            sys.setappdefaultencoding(self.__coding)
+        except AttributeError:
+            pass
+        sys.argv.append(fn)
+        sys.argv.extend(eval(args))
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if wd == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(wd)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        
+        # generate a profile object
+        self.prof = PyProfile.PyProfile(sys.argv[0])
+        
+        if int(erase):
+            self.prof.erase()
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        sys.modules['__main__'] = self.debugMod
+        self.running = sys.argv[0]
+        res = 0
+        try:
+            self.prof.run('execfile(%r)' % sys.argv[0])
+        except SystemExit as exc:
+            res = exc.code
+            atexit._run_exitfuncs()
+        self.prof.save()
+        self.writestream.flush()
+        self.progTerminated(res)
+
+    def __handleRequestShutdown(self, arg):
+        """
+        Private method handling the RequestShutdown command.
+        
+        @param arg argument of the command (string)
+        """
+        self.sessionClose()
+
+    def __handleRequestBreak(self, arg):
+        """
+        Private method handling the RequestBreak command.
+        
+        @param arg argument of the command (string)
+        """
+        fn, line, temporary, set, cond = arg.split('@@')
+        line = int(line)
+        set = int(set)
+        temporary = int(temporary)
+        
+        if set:
+            if cond == 'None' or cond == '':
+                cond = None
+            else:
+                try:
+                    compile(cond, '<string>', 'eval')
+                except SyntaxError:
+                    self.write('%s%s,%d\n' % \
+                        (ResponseBPConditionError, fn, line))
+                    return
+            self.mainThread.set_break(fn, line, temporary, cond)
+        else:
+            self.mainThread.clear_break(fn, line)
+
+    def __handleRequestBreakEnable(self, arg):
+        """
+        Private method handling the RequestBreakEnable command.
+        
+        @param arg argument of the command (string)
+        """
+        fn, line, enable = arg.split(',')
+        line = int(line)
+        enable = int(enable)
+        
+        bp = self.mainThread.get_break(fn, line)
+        if bp is not None:
+            if enable:
+                bp.enable()
+            else:
+                bp.disable()
+
+    def __handleRequestBreakIgnore(self, arg):
+        """
+        Private method handling the RequestBreakIgnore command.
+        
+        @param arg argument of the command (string)
+        """
+        fn, line, count = arg.split(',')
+        line = int(line)
+        count = int(count)
+        
+        bp = self.mainThread.get_break(fn, line)
+        if bp is not None:
+            bp.ignore = count
+
+    def __handleRequestWatch(self, arg):
+        """
+        Private method handling the RequestWatch command.
+        
+        @param arg argument of the command (string)
+        """
+        cond, temporary, set = arg.split('@@')
+        set = int(set)
+        temporary = int(temporary)
+        
+        if set:
+            if not cond.endswith('??created??') and \
+               not cond.endswith('??changed??'):
+                try:
+                    compile(cond, '<string>', 'eval')
+                except SyntaxError:
+                    self.write('%s%s\n' % (ResponseWPConditionError, cond))
+                    return
+            self.mainThread.set_watch(cond, temporary)
+        else:
+            self.mainThread.clear_watch(cond)
+
+    def __handleRequestWatchEnable(self, arg):
+        """
+        Private method handling the RequestWatchEnable command.
+        
+        @param arg argument of the command (string)
+        """
+        cond, enable = arg.split(',')
+        enable = int(enable)
+        
+        bp = self.mainThread.get_watch(cond)
+        if bp is not None:
+            if enable:
+                bp.enable()
+            else:
+                bp.disable()
+
+    def __handleRequestWatchIgnore(self, arg):
+        """
+        Private method handling the RequestWatchIgnore command.
+        
+        @param arg argument of the command (string)
+        """
+        cond, count = arg.split(',')
+        count = int(count)
+        
+        bp = self.mainThread.get_watch(cond)
+        if bp is not None:
+            bp.ignore = count
+
+    def __handleRequestEval(self, arg):
+        """
+        Private method handling the RequestEval command.
+        
+        @param arg argument of the command (string)
+        """
+        try:
+            value = eval(arg, self.currentThread.getCurrentFrame().f_globals,
+                              self.currentThread.getCurrentFrameLocals())
+        except:
+            # Report the exception and the traceback
+            try:
+                type, value, tb = sys.exc_info()
+                sys.last_type = type
+                sys.last_value = value
+                sys.last_traceback = tb
+                tblist = traceback.extract_tb(tb)
+                del tblist[:1]
+                list = traceback.format_list(tblist)
+                if list:
+                    list.insert(0, "Traceback (innermost last):\n")
+                    list[len(list):] = \
+                        traceback.format_exception_only(type, value)
+            finally:
+                tblist = tb = None
+        
+            map(self.write,list)
+        
+            self.write(ResponseException + '\n')
+        
+        else:
+            self.write(unicode(value) + '\n')
+            self.write(ResponseOK + '\n')
+
+    def __handleRequestExec(self, arg):
+        """
+        Private method handling the RequestExec command.
+        
+        @param arg argument of the command (string)
+        """
+        _globals = self.currentThread.getCurrentFrame().f_globals
+        _locals = self.currentThread.getCurrentFrameLocals()
+        try:
+            code = compile(arg + '\n', '<stdin>', 'single')
+            exec code in _globals, _locals
+        except:
+            # Report the exception and the traceback
+            try:
+                type, value, tb = sys.exc_info()
+                sys.last_type = type
+                sys.last_value = value
+                sys.last_traceback = tb
+                tblist = traceback.extract_tb(tb)
+                del tblist[:1]
+                list = traceback.format_list(tblist)
+                if list:
+                    list.insert(0, "Traceback (innermost last):\n")
+                    list[len(list):] = \
+                        traceback.format_exception_only(type, value)
+            finally:
+                tblist = tb = None
+        
+            map(self.write, list)
+        
+            self.write(ResponseException + '\n')
+
+    def __handleRequestBanner(self, arg):
+        """
+        Private method handling the RequestBanner command.
+        
+        @param arg argument of the command (string)
+        """
+        self.write('%s%s\n' % (ResponseBanner, 
+            unicode(("Python %s" % sys.version, socket.gethostname(), 
+                     self.variant))))
+
+    def __handleRequestCapabilities(self, arg):
+        """
+        Private method handling the RequestCapabilities command.
+        
+        @param arg argument of the command (string)
+        """
+        self.write('%s%d, "Python"\n' % (ResponseCapabilities, 
+            self.__clientCapabilities()))
+
+    def __handleRequestCompletion(self, arg):
+        """
+        Private method handling the RequestCompletion command.
+        
+        @param arg argument of the command (string)
+        """
+        self.__completionList(arg)
+
+    def __handleRequestSetFilter(self, arg):
+        """
+        Private method handling the RequestSetFilter command.
+        
+        @param arg argument of the command (string)
+        """
+        scope, filterString = eval(arg)
+        self.__generateFilterObjects(int(scope), filterString)
+
+    def __handleRequestUTPrepare(self, arg):
+        """
+        Private method handling the RequestUTPrepare command.
+        
+        @param arg argument of the command (string)
+        """
+        fn, tn, tfn, cov, covname, erase = arg.split('|')
+        sys.path.insert(0, os.path.dirname(os.path.abspath(fn)))
+        os.chdir(sys.path[0])
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        
+        try:
+            import unittest
+            utModule = __import__(tn)
+            try:
+                self.test = unittest.defaultTestLoader\
+                            .loadTestsFromName(tfn, utModule)
+            except AttributeError:
+                self.test = unittest.defaultTestLoader\
+                            .loadTestsFromModule(utModule)
+        except:
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            self.write('%s%s\n' % (ResponseUTPrepared,
+                unicode((0, str(exc_type), str(exc_value)))))
+            self.__exceptionRaised()
+            return
+        
+        # generate a coverage object
+        if int(cov):
+            from coverage import coverage
+            self.cover = coverage(auto_data = True, 
+                data_file = "%s.coverage" % os.path.splitext(covname)[0])
+            self.cover.use_cache(True)
+            if int(erase):
+                self.cover.erase()
+        else:
+            self.cover = None
+        
+        self.write('%s%s\n' % (ResponseUTPrepared,
+            unicode((self.test.countTestCases(), "", ""))))
+
+    def __handleRequestUTRun(self, arg):
+        """
+        Private method handling the RequestUTRun command.
+        
+        @param arg argument of the command (string)
+        """
+        from DCTestResult import DCTestResult
+        self.testResult = DCTestResult(self)
+        if self.cover:
+            self.cover.start()
+        self.test.run(self.testResult)
+        if self.cover:
+            self.cover.stop()
+            self.cover.save()
+        self.write('%s\n' % ResponseUTFinished)
+
+    def __handleRequestUTStop(self, arg):
+        """
+        Private method handling the RequestUTStop command.
+        
+        @param arg argument of the command (string)
+        """
+        self.testResult.stop()
+
+    def __handleResponseForkTo(self, arg):
+        """
+        Private method handling the ResponseForkTo command.
+        
+        @param arg argument of the command (string)
+        """
+        # this results from a separate event loop
+        self.fork_child = (arg == 'child')
+        self.eventExit = 1
+
+    def __handleRequestForkMode(self, arg):
+        """
+        Private method handling the RequestForkMode command.
+        
+        @param arg argument of the command (string)
+        """
+        self.fork_auto, self.fork_child = eval(arg)
+
     def __clientCapabilities(self):
         """
         Private method to determine the clients capabilities.
@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the statistical summaries of numpy arrays shown by the
+debug client.
+
+The summary of an array consists of its minimum, maximum, mean, standard
+deviation, number of NaN values and a histogram. Arrays with more elements
+than the sample threshold are summarized from every n-th element. Summaries
+are cached keyed by the array and its memory, so that expanding an array
+again doesn't compute them again.
+
+numpy is imported only, when an array is summarized, i.e. when it was
+imported by the debugged program already.
+"""
+
+from collections import OrderedDict
+
+# arrays with more elements are summarized from a sample of them
+SampleThreshold = 1024 * 1024
+
+# number of bins of the histogram
+HistogramBins = 10
+
+# number of elements sorted into the histogram at once, the temporary arrays
+# of a chunk fit into the processor cache
+ChunkSize = 32768
+
+# number of summaries kept
+MaxSummaries = 32
+
+
+def summarizeArray(arr, threshold=SampleThreshold):
+    """
+    Function to compute the summary of a numeric array.
+
+    @param arr array to be summarized
+    @type ndarray
+    @keyparam threshold number of elements above which a strided sample of
+        the elements is summarized
+    @type int
+    @return dictionary with the minimum ("min"), maximum ("max"), mean
+        ("mean"), standard deviation ("std") and number of NaN values
+        ("nans") of the elements, the counts ("histogram") and bin edges
+        ("edges") of their histogram and the step between the summarized
+        elements ("sampleStep"). Values, which can't be computed, are missing.
+    @rtype dict
+    """
+    import numpy
+
+    step = -(-arr.size // threshold) if arr.size > threshold else 1
+    if arr.flags.c_contiguous:
+        # a view of the elements, even if sampled
+        flat = arr.reshape(-1)[::step]
+    else:
+        # copies just the sampled elements
+        flat = arr.flat[::step]
+
+    summary = {"sampleStep": step}
+    kind = arr.dtype.kind
+    if kind in "fc":
+        nanMask = numpy.isnan(flat)
+        nans = int(numpy.count_nonzero(nanMask))
+        summary["nans"] = nans
+        if nans:
+            flat = flat[~nanMask]
+    else:
+        summary["nans"] = 0
+
+    if flat.size == 0:
+        return summary
+
+    # infinite values give invalid results without warnings
+    with numpy.errstate(all="ignore"):
+        # the results are converted to Python numbers
+        summary["min"] = flat.min().item()
+        summary["max"] = flat.max().item()
+        if kind == "c":
+            summary["mean"] = flat.mean().item()
+            summary["std"] = flat.std().item()
+        else:
+            # accumulate small integer and float types in double precision
+            summary["mean"] = flat.mean(dtype=numpy.float64).item()
+            summary["std"] = flat.std(dtype=numpy.float64).item()
+
+        if kind in "iuf":
+            low = float(summary["min"])
+            high = float(summary["max"])
+            if numpy.isfinite([low, high]).all():
+                summary["histogram"] = _histogram(numpy, flat, low, high)
+                summary["edges"] = numpy.linspace(
+                    low, high, HistogramBins + 1).tolist()
+
+    return summary
+
+
+def _histogram(numpy, flat, low, high):
+    """
+    Protected function to count the elements in equally sized bins.
+
+    Unlike numpy.histogram() the elements are processed in chunks and the
+    bin of an element is computed instead of searched for.
+
+    @param numpy reference to the numpy module
+    @type module
+    @param flat one-dimensional array of real numbers without NaN values
+    @type ndarray
+    @param low lower bound of the first bin, the minimum of the elements
+    @type float
+    @param high upper bound of the last bin, the maximum of the elements
+    @type float
+    @return number of elements of each bin
+    @rtype list of int
+    """
+    scale = HistogramBins / (high - low) if high > low else 0.0
+    counts = numpy.zeros(HistogramBins, dtype=numpy.intp)
+    for start in range(0, flat.size, ChunkSize):
+        chunk = numpy.subtract(flat[start:start + ChunkSize], low,
+                               dtype=numpy.float64)
+        chunk *= scale
+        bins = chunk.astype(numpy.intp)
+        # the maximum belongs to the last bin
+        numpy.minimum(bins, HistogramBins - 1, out=bins)
+        counts += numpy.bincount(bins, minlength=HistogramBins)
+    return counts.tolist()
+
+
+class ArraySummaries(object):
+    """
+    Class caching the summaries of numeric arrays.
+
+    The key of a summary is made of the id of the array, the address of its
+    data, its shape, strides and type. It doesn't notice changed elements,
+    so the cache should be cleared, whenever the debugged program
+    continues.
+    """
+    def __init__(self, maxSummaries=MaxSummaries):
+        """
+        Constructor
+
+        @keyparam maxSummaries number of summaries to be kept
+        @type int
+        """
+        self.maxSummaries = maxSummaries
+        self.__summaries = OrderedDict()
+
+    def summary(self, arr):
+        """
+        Public method to get the summary of a numeric array.
+
+        @param arr array to be summarized
+        @type ndarray
+        @return summary of the array as returned by summarizeArray()
+        @rtype dict
+        """
+        key = (id(arr), arr.__array_interface__["data"][0], arr.shape,
+               arr.strides, arr.dtype.str)
+        try:
+            return self.__summaries[key]
+        except KeyError:
+            pass
+
+        summary = self.__summaries[key] = summarizeArray(arr)
+        if len(self.__summaries) > self.maxSummaries:
+            self.__summaries.popitem(last=False)
+        return summary
+
+    def clear(self):
+        """
+        Public method to drop all summaries.
+        """
+        self.__summaries.clear()
+
+#
+# eflag: noqa = M702
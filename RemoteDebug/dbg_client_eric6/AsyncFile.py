@@ -8,9 +8,21 @@ Module implementing an asynchronous file like socket interface for the
 debugger.
 """
 
+import sys
+import time
 import socket
+import threading
+from collections import deque
 
-from .DebugUtilities import prepareJsonCommand
+if sys.version_info[0] == 2:
+    import thread as _thread
+else:
+    import _thread
+
+from .DebugUtilities import (
+    prepareJsonCommand, prepareBinaryCommand, compressCommand,
+    decompressCommand
+)
 
 try:
     unicode
@@ -18,11 +30,48 @@ except NameError:
     unicode = str
     raw_input = input
 
+CommandHeaderLength = 9
+ReceiveBufferSize = 64 * 1024
+
+# output is sent, when it is older than the interval (in seconds) or larger
+# than the size
+OutputFlushInterval = 0.05
+OutputFlushSize = 16 * 1024
+
+# overflow policies of the outgoing messages
+NeverDrop = 0
+DropOldest = 1
+
+# overflow policies indexed by the message name, all other messages are
+# never dropped
+OverflowPolicies = {
+    "CallTrace": DropOldest,
+    "CallTraceBatch": DropOldest,
+    "CallTraceSamples": DropOldest,
+    "ClientOutput": DropOldest,
+}
+# maximum number of queued messages, which may be dropped
+SendQueueSize = 1000
+# time to wait for the sender to send the last messages (in seconds)
+CloseTimeout = 5.0
+
+# default zlib compression level and minimum size (in bytes) of the messages
+# to be compressed, if the IDE asked for compression
+CompressionLevel = 6
+CompressionThreshold = 4096
+
+# the thread hooks replace start_new_thread, but the sender must not be
+# debugged
+StartNewThread = _thread.start_new_thread
+
+# Python 2 has no sys.is_finalizing()
+IsFinalizing = getattr(sys, "is_finalizing", lambda: False)
+
 
 def AsyncPendingWrite(file):
     """
     Module function to check for data to be written.
-    
+
     @param file The file object to be checked
     @type file
     @return Flag indicating if there is data waiting
@@ -36,13 +85,454 @@ def AsyncPendingWrite(file):
     return pending
 
 
+class AsyncWriter(object):
+    """
+    Class implementing the sender of all messages to the IDE shared by the
+    writing file objects of a socket.
+
+    The messages are put into a queue and sent by a sender thread, so that
+    no thread being debugged ever waits for the socket. Consecutive output
+    is coalesced into one ClientOutput message, which is queued, when it is
+    larger than OutputFlushSize or older than OutputFlushInterval. All
+    queued messages are sent in one batch.
+
+    If more than SendQueueSize messages with the DropOldest policy of
+    OverflowPolicies are queued, the oldest of them is dropped. All other
+    messages are never dropped.
+
+    With compression enabled, the sender compresses each message of at
+    least compressionThreshold bytes, unless it doesn't get smaller.
+
+    A message given as a list of parts is sent part by part and never
+    compressed, so that parts referring to the memory of the debugged
+    program are sent without copying them.
+    """
+    maxtries = 10
+
+    def __init__(self, sock):
+        """
+        Constructor
+
+        @param sock the socket object to write to
+        @type socket
+        """
+        self.sock = sock
+        self.nWriteErrors = 0
+        self.droppedMessages = 0
+        self.closed = False
+        self.senderId = None
+        # set, when the IDE negotiated the binary encoding
+        self.binary = False
+        # compression level or None, if compression is off
+        self.compressionLevel = None
+        self.compressionThreshold = CompressionThreshold
+
+        self.sentMessages = 0
+        self.sentBytes = 0
+        self.compressedMessages = 0
+        # sizes of the compressed messages before and after compression
+        self.uncompressedBytes = 0
+        self.compressedBytes = 0
+
+        self.__reset()
+
+    def __reset(self):
+        """
+        Private method to initialize the queue.
+        """
+        # the trace function of a debugged thread may handle commands,
+        # which send messages, while the thread holds the lock
+        self.__condition = threading.Condition(threading.RLock())
+        self.__queue = deque()
+        self.__droppable = 0
+        self.__sending = False
+        self.__text = []
+        self.__textSize = 0
+        self.__textTime = 0.0
+
+    def setCompression(self, level=CompressionLevel,
+                       threshold=CompressionThreshold):
+        """
+        Public method to switch on the compression of large messages.
+
+        @keyparam level zlib compression level or None to switch compression
+            off
+        @type int
+        @keyparam threshold minimum size of the messages to be compressed
+            (in bytes)
+        @type int
+        """
+        self.compressionLevel = level
+        self.compressionThreshold = threshold
+
+    @property
+    def bytesSaved(self):
+        """
+        Public property of the number of bytes saved by the compression.
+
+        @return number of bytes saved
+        @rtype int
+        """
+        return self.uncompressedBytes - self.compressedBytes
+
+    def statistics(self):
+        """
+        Public method to get the counters of the sent messages.
+
+        @return dictionary of the counters
+        @rtype dict
+        """
+        return {
+            "sentMessages": self.sentMessages,
+            "sentBytes": self.sentBytes,
+            "droppedMessages": self.droppedMessages,
+            "compressedMessages": self.compressedMessages,
+            "uncompressedBytes": self.uncompressedBytes,
+            "compressedBytes": self.compressedBytes,
+            "bytesSaved": self.bytesSaved,
+        }
+
+    def pending(self):
+        """
+        Public method to get the number of messages waiting to be sent.
+
+        @return number of pending messages
+        @rtype int
+        """
+        return (len(self.__queue) + (1 if self.__text else 0) +
+                (1 if self.__sending else 0))
+
+    def writeText(self, text):
+        """
+        Public method to write output text.
+
+        @param text text to be written
+        @type str
+        """
+        with self.__condition:
+            # the sender has to know about new text only, when it starts
+            # waiting for it to be due or when it was queued
+            wake = not self.__text
+            if wake:
+                self.__textTime = time.time()
+            self.__text.append(text)
+            self.__textSize += len(text)
+            if self.__textSize >= OutputFlushSize:
+                self.__queueText()
+                wake = True
+            if wake:
+                self.__wakeSender()
+
+    def writeMessage(self, message, method=None):
+        """
+        Public method to send a message of the debugger.
+
+        @param message JSON-RPC message, binary encoded message or list of
+            the parts of a binary encoded message
+        @type str, bytes or list of bytes, bytearray or memoryview
+        @param method name of the message determining its overflow policy
+        @type str
+        """
+        with self.__condition:
+            self.__queueText()
+            self.__queueMessage(
+                message, OverflowPolicies.get(method, NeverDrop))
+            self.__wakeSender()
+
+    def poll(self):
+        """
+        Public method to send the due output.
+
+        The sender thread sends output becoming due by itself, it is woken
+        up only for output being overdue. Nothing is done while the
+        interpreter finalizes, because a daemon thread waiting for the lock
+        may have got it and may be blocked forever.
+        """
+        if IsFinalizing():
+            return
+
+        with self.__condition:
+            if (self.__text and
+                    time.time() - self.__textTime >= OutputFlushInterval):
+                self.__queueText()
+                self.__wakeSender()
+
+    def flush(self, timeout=CloseTimeout):
+        """
+        Public method to wait until all pending messages were sent.
+
+        The trace function of the calling thread is suspended meanwhile, a
+        command handled by it could end the thread inside the lock handling.
+
+        @param timeout maximum time to wait (in seconds) or None to wait
+            until everything was sent
+        @type float
+        """
+        trace = sys.gettrace()
+        sys.settrace(None)
+        try:
+            if timeout is not None:
+                deadline = time.time() + timeout
+            with self.__condition:
+                self.__queueText()
+                self.__wakeSender()
+                while self.senderId is not None and self.pending():
+                    if timeout is None:
+                        self.__condition.wait()
+                        continue
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+        finally:
+            sys.settrace(trace)
+
+    def close(self):
+        """
+        Public method to send everything pending and stop the sender.
+        """
+        if self.closed:
+            return
+
+        self.flush()
+        trace = sys.gettrace()
+        sys.settrace(None)
+        try:
+            deadline = time.time() + CloseTimeout
+            with self.__condition:
+                self.closed = True
+                self.__condition.notify_all()
+                while self.senderId is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        break
+                    self.__condition.wait(remaining)
+        finally:
+            sys.settrace(trace)
+
+    def forked(self):
+        """
+        Public method to reset the writer in a forked child process.
+
+        The sender thread doesn't survive a fork and the pending messages
+        are sent by the parent process.
+        """
+        self.senderId = None
+        self.__reset()
+
+    def __wakeSender(self):
+        """
+        Private method to start or notify the sender thread.
+
+        The lock must be held by the caller.
+        """
+        if self.closed:
+            return
+        if self.senderId is None:
+            self.senderId = StartNewThread(self.__sender, ())
+        else:
+            self.__condition.notify_all()
+
+    def __sender(self):
+        """
+        Private method implementing the sender thread.
+        """
+        # Python 2 runs the thread on, while it clears the modules at exit,
+        # even the builtins may be gone then, so the exception class is
+        # looked up in advance
+        error = Exception
+        try:
+            self.__sendLoop()
+        except error:
+            if time is None:
+                return
+            raise
+
+    def __sendLoop(self):
+        """
+        Private method implementing the loop of the sender thread.
+        """
+        condition = self.__condition
+        while True:
+            with condition:
+                while not self.__queue and not self.closed:
+                    if self.__text:
+                        due = (self.__textTime + OutputFlushInterval -
+                               time.time())
+                        if due <= 0:
+                            self.__queueText()
+                            break
+                        condition.wait(due)
+                    else:
+                        condition.wait()
+
+                if self.closed and not self.__queue:
+                    self.senderId = None
+                    condition.notify_all()
+                    return
+
+                batch = list(self.__queue)
+                self.__queue.clear()
+                self.__droppable = 0
+                self.__sending = True
+
+            chunks = []
+            for data, _policy in batch:
+                if isinstance(data, list):
+                    chunks.extend(data)
+                else:
+                    chunks.append(self.__compress(data))
+            count = len(batch)
+            # the locals live on, while the sender waits for the next batch,
+            # the memory of a variable sent as raw data must be released
+            data = None
+            del batch
+            try:
+                self.__send(chunks)
+            finally:
+                self.__release(chunks)
+                del chunks
+            self.sentMessages += count
+
+            with condition:
+                self.__sending = False
+                # wake up waiting flushes
+                condition.notify_all()
+
+    def __queueText(self):
+        """
+        Private method to queue the pending output text as one message.
+        """
+        if self.__text:
+            text = "".join(self.__text)
+            self.__text = []
+            self.__textSize = 0
+            if self.binary:
+                prepareCommand = prepareBinaryCommand
+            else:
+                prepareCommand = prepareJsonCommand
+            self.__queueMessage(prepareCommand("ClientOutput", {
+                "text": text,
+            }), OverflowPolicies.get("ClientOutput", NeverDrop))
+
+    def __queueMessage(self, message, policy):
+        """
+        Private method to queue a message.
+
+        @param message message to be queued
+        @type str, bytes or list of bytes, bytearray or memoryview
+        @param policy overflow policy of the message
+        @type int
+        """
+        if isinstance(message, (bytes, list)):
+            data = message
+        else:
+            data = message.encode('utf-8', 'backslashreplace')
+
+        if policy == DropOldest:
+            if self.__droppable >= SendQueueSize:
+                for index, (_data, queuedPolicy) in enumerate(self.__queue):
+                    if queuedPolicy == DropOldest:
+                        del self.__queue[index]
+                        break
+                self.droppedMessages += 1
+            else:
+                self.__droppable += 1
+        self.__queue.append((data, policy))
+
+    def __compress(self, data):
+        """
+        Private method to compress a message, if it is large enough.
+
+        @param data message to be sent
+        @type bytes
+        @return message to be sent
+        @rtype bytes
+        """
+        level = self.compressionLevel
+        if level is None or len(data) < self.compressionThreshold:
+            return data
+
+        try:
+            compressed = compressCommand(data, level)
+        except Exception:
+            # e.g. zlib.error or MemoryError, send it uncompressed
+            return data
+        if len(compressed) >= len(data):
+            return data
+
+        self.compressedMessages += 1
+        self.uncompressedBytes += len(data)
+        self.compressedBytes += len(compressed)
+        return compressed
+
+    def __send(self, chunks):
+        """
+        Private method to send a batch of messages.
+
+        Consecutive bytes chunks are joined, other chunks are sent by
+        themselves.
+
+        @param chunks chunks of the data to be sent
+        @type list of bytes, bytearray or memoryview
+        """
+        try:
+            joined = []
+            for chunk in chunks:
+                if type(chunk) is bytes:
+                    joined.append(chunk)
+                    continue
+                if joined:
+                    self.__sendData(b"".join(joined))
+                    joined = []
+                self.__sendData(chunk)
+            if joined:
+                self.__sendData(b"".join(joined))
+            self.nWriteErrors = 0
+        except socket.error:
+            # the batch is lost
+            self.nWriteErrors += 1
+            if self.nWriteErrors > self.maxtries:
+                # delete all output
+                with self.__condition:
+                    self.__queue.clear()
+                    self.__droppable = 0
+                    self.__text = []
+                    self.__textSize = 0
+
+    def __release(self, chunks):
+        """
+        Private method to release the memoryviews of a sent batch.
+
+        A memoryview keeps the memory of its object exported, e.g. a
+        bytearray or an array can't be resized before it is released.
+
+        @param chunks chunks of the data sent
+        @type list of bytes, bytearray or memoryview
+        """
+        for chunk in chunks:
+            # Python 2 can't release a memoryview
+            if type(chunk) is memoryview and hasattr(chunk, "release"):
+                chunk.release()
+
+    def __sendData(self, data):
+        """
+        Private method to send a chunk of data.
+
+        @param data data to be sent
+        @type bytes, bytearray or memoryview
+        """
+        self.sock.sendall(data)
+        self.sentBytes += len(data)
+
+
 class AsyncFile(object):
     """
     Class wrapping a socket object with a file interface.
     """
     maxtries = 10
     
-    def __init__(self, sock, mode, name):
+    def __init__(self, sock, mode, name, writer=None):
         """
         Constructor
         
@@ -52,19 +542,29 @@ class AsyncFile(object):
         @type str
         @param name name of this file
         @type str
+        @param writer output pipeline to be shared with another file object
+            of the socket
+        @type AsyncWriter
         """
         # Initialise the attributes.
         self.closed = False
         self.sock = sock
         self.mode = mode
         self.name = name
-        self.nWriteErrors = 0
         self.encoding = "utf-8"
         self.errors = None
         self.newlines = None
         self.line_buffering = False
         
-        self.wpending = []
+        if writer is None and mode == "w":
+            writer = AsyncWriter(sock)
+        self.writer = writer
+        
+        # receive buffer of the commands, data between __rstart and __rend
+        # wasn't processed yet
+        self.__rbuf = bytearray(ReceiveBufferSize)
+        self.__rstart = 0
+        self.__rend = 0
 
     def __checkMode(self, mode):
         """
@@ -80,14 +580,25 @@ class AsyncFile(object):
         if mode != self.mode:
             raise IOError((9, '[Errno 9] Bad file descriptor'))
 
+    @property
+    def nWriteErrors(self):
+        """
+        Public property of the number of consecutive write errors.
+        
+        @return number of write errors
+        @rtype int
+        """
+        return self.writer.nWriteErrors if self.writer is not None else 0
+    
     def pendingWrite(self):
         """
-        Public method that returns the number of strings waiting to be written.
+        Public method that returns the number of messages waiting to be
+        written.
         
-        @return the number of strings to be written
+        @return the number of messages to be written
         @rtype int
         """
-        return len(self.wpending)
+        return self.writer.pending() if self.writer is not None else 0
 
     def close(self, closeit=False):
         """
@@ -97,31 +608,20 @@ class AsyncFile(object):
         @type bool
         """
         if closeit and not self.closed:
-            self.flush()
+            if self.writer is not None:
+                self.writer.close()
             self.sock.close()
             self.closed = True
 
     def flush(self):
         """
-        Public method to write all pending entries.
+        Public method to write the due output.
+        
+        Output is coalesced and sent by the sender thread as soon as it is
+        due, the caller never waits for the IDE.
         """
-        while self.wpending:
-            try:
-                buf = self.wpending.pop(0)
-            except IndexError:
-                break
-            
-            try:
-                try:
-                    buf = buf.encode('utf-8', 'backslashreplace')
-                except (UnicodeEncodeError, UnicodeDecodeError):
-                    pass
-                self.sock.sendall(buf)
-                self.nWriteErrors = 0
-            except socket.error:
-                self.nWriteErrors += 1
-                if self.nWriteErrors > self.maxtries:
-                    self.wpending = []    # delete all output
+        if self.writer is not None:
+            self.writer.poll()
 
     def isatty(self):
         """
@@ -189,19 +689,97 @@ class AsyncFile(object):
         """
         Public method to read a length prefixed command string.
         
-        @return command string
-        @rtype str
+        @return command string, binary encoded command or an empty string
+            for a closed connection
+        @rtype str or bytes
+        @exception ValueError raised to indicate an invalid length field, the
+            data received so far was dropped
+        """
+        command = self.__nextCommand()
+        while command is None:
+            if not self.__receive():
+                return ""
+            command = self.__nextCommand()
+        return command
+    
+    def readCommands(self):
+        """
+        Public method to iterate over the received command strings.
+        
+        The iterator blocks until a command was received and ends, when no
+        further complete command is buffered. It is empty for a closed
+        connection.
+        
+        @return iterator over the command strings
+        @rtype iterator of str
+        @exception ValueError raised to indicate an invalid length field, the
+            data received so far was dropped
+        """
+        command = self.readCommand()
+        while command:
+            yield command
+            command = self.__nextCommand()
+    
+    def __nextCommand(self):
+        """
+        Private method to take the next complete command out of the receive
+        buffer.
+        
+        @return command string, binary encoded command or None, if there is
+            no complete command
+        @rtype str, bytes or None
+        @exception ValueError raised to indicate an invalid length field
         """
         # The command string is prefixed by a 9 character long length field.
-        length = self.sock.recv(9)
-        length = int(length)
-        data = b''
-        while len(data) < length:
-            newData = self.sock.recv(length - len(data))
-            data += newData
-        
-        # step 2: convert the data
-        return data.decode('utf8', 'backslashreplace')
+        # Compressed commands are decompressed here.
+        start = self.__rstart
+        available = self.__rend - start
+        needed = CommandHeaderLength
+        if available >= needed:
+            header = bytes(self.__rbuf[start:start + needed])
+            if not header.isdigit():
+                # the end of the command is unknown, the data received so
+                # far is dropped
+                self.__rstart = self.__rend = 0
+                raise ValueError(
+                    "invalid length field {0!r}".format(header))
+            needed += int(header)
+            if available >= needed:
+                self.__rstart = start + needed
+                command = decompressCommand(bytes(
+                    self.__rbuf[start + CommandHeaderLength:start + needed]))
+                if command and command[:1] != b"{":
+                    # binary encoded commands never start like a JSON object
+                    return command
+                return command.decode('utf8', 'backslashreplace')
+        
+        if start + needed > len(self.__rbuf):
+            # make room for the incomplete command
+            self.__rbuf[:available] = self.__rbuf[start:self.__rend]
+            self.__rstart = 0
+            self.__rend = available
+            if needed > len(self.__rbuf):
+                self.__rbuf.extend(bytearray(needed - len(self.__rbuf)))
+        return None
+    
+    def __receive(self):
+        """
+        Private method to receive data into the free part of the receive
+        buffer.
+        
+        @return number of bytes received, 0 for a closed connection
+        @rtype int
+        """
+        if self.__rstart == self.__rend:
+            self.__rstart = self.__rend = 0
+        view = memoryview(self.__rbuf)
+        try:
+            received = self.sock.recv_into(view[self.__rend:])
+        finally:
+            # a buffer with exported views can't be resized
+            view = None
+        self.__rend += received
+        return received
     
     def readline_p(self, size=-1):
         """
@@ -343,23 +921,21 @@ class AsyncFile(object):
         """
         self.__checkMode('w')
         
-        cmd = prepareJsonCommand("ClientOutput", {
-            "text": s,
-        })
-        self.wpending.append(cmd)
-        self.flush()
+        self.writer.writeText(s)
     
-    def write_p(self, s):
+    def write_p(self, s, method=None):
         """
         Public method to write a json-rpc 2.0 coded string to the file.
         
-        @param s text to be written
+        @param s text to be written, binary encoded message or list of the
+            parts of a binary encoded message
+        @type str, bytes or list of bytes, bytearray or memoryview
+        @param method name of the message determining its overflow policy
         @type str
         """
         self.__checkMode('w')
 
-        self.wpending.append(s)
-        self.flush()
+        self.writer.writeMessage(s, method)
 
     def writelines(self, lines):
         """
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the compact binary encoding of the debugger messages.
+
+The encoding is the MessagePack format for the JSON data types. The msgpack
+package is used, if it is installed. Otherwise a pure Python implementation
+is used. Integers not fitting into 64 bits are encoded as strings.
+
+Byte arrays and memoryviews of bytes are encoded as binary data. The
+encoding of a message made by packMessageParts() keeps them as separate
+parts, so that their memory isn't copied into the message.
+"""
+
+import sys
+import struct
+
+try:
+    import msgpack
+    if msgpack.version < (0, 5, 2):
+        raise ImportError
+except ImportError:
+    msgpack = None
+
+if sys.version_info[0] == 2:
+    TextType = unicode          # __IGNORE_WARNING__
+    IntegerTypes = (int, long)  # __IGNORE_WARNING__
+else:
+    TextType = str
+    IntegerTypes = (int, )
+
+# single bytes indexed by their value
+_Bytes = [struct.pack(">B", value) for value in range(256)]
+_Float = struct.Struct(">d")
+_Formats = {
+    0xcc: struct.Struct(">B"), 0xcd: struct.Struct(">H"),
+    0xce: struct.Struct(">I"), 0xcf: struct.Struct(">Q"),
+    0xd0: struct.Struct(">b"), 0xd1: struct.Struct(">h"),
+    0xd2: struct.Struct(">i"), 0xd3: struct.Struct(">q"),
+    0xd9: struct.Struct(">B"), 0xda: struct.Struct(">H"),
+    0xdb: struct.Struct(">I"), 0xc4: struct.Struct(">B"),
+    0xc5: struct.Struct(">H"), 0xc6: struct.Struct(">I"),
+    0xdc: struct.Struct(">H"), 0xdd: struct.Struct(">I"),
+    0xde: struct.Struct(">H"), 0xdf: struct.Struct(">I"),
+}
+_Header = {
+    # type: (fixed type byte or None, 8 bit, 16 bit and 32 bit type bytes)
+    "str": (0xa0, 0xd9, 0xda, 0xdb),
+    "bin": (None, 0xc4, 0xc5, 0xc6),
+    "array": (0x90, None, 0xdc, 0xdd),
+    "map": (0x80, None, 0xde, 0xdf),
+}
+
+
+def _header(kind, length):
+    """
+    Function to create the header of a string, binary, array or map.
+
+    @param kind kind of the header
+    @type str
+    @param length length of the object
+    @type int
+    @return encoded header
+    @rtype bytes
+    """
+    fixed, type8, type16, type32 = _Header[kind]
+    if fixed is not None and length < (32 if kind == "str" else 16):
+        return _Bytes[fixed | length]
+    elif type8 is not None and length < 0x100:
+        return _Bytes[type8] + _Bytes[length]
+    elif length < 0x10000:
+        return _Bytes[type16] + _Formats[type16].pack(length)
+    else:
+        return _Bytes[type32] + _Formats[type32].pack(length)
+
+
+def _packInteger(value, append):
+    """
+    Function to encode an integer.
+
+    @param value integer to be encoded
+    @type int
+    @param append function appending a part of the encoding
+    @type function
+    """
+    if 0 <= value < 0x80:
+        append(_Bytes[value])
+    elif -0x20 <= value < 0:
+        append(_Bytes[value + 0x100])
+    elif 0 <= value < 0x10000000000000000:
+        for typeByte, limit in ((0xcc, 0x100), (0xcd, 0x10000),
+                                (0xce, 0x100000000)):
+            if value < limit:
+                break
+        else:
+            typeByte = 0xcf
+        append(_Bytes[typeByte] + _Formats[typeByte].pack(value))
+    elif -0x8000000000000000 <= value < 0:
+        for typeByte, limit in ((0xd0, -0x80), (0xd1, -0x8000),
+                                (0xd2, -0x80000000)):
+            if value >= limit:
+                break
+        else:
+            typeByte = 0xd3
+        append(_Bytes[typeByte] + _Formats[typeByte].pack(value))
+    else:
+        _pack(str(value), append)
+
+
+def _pack(obj, append):
+    """
+    Function to encode an object.
+
+    @param obj object to be encoded
+    @type None, bool, int, float, str, bytes, bytearray, memoryview, list,
+        tuple or dict
+    @param append function appending a part of the encoding
+    @type function
+    @exception TypeError raised to indicate an object of an unsupported type
+    """
+    objType = type(obj)
+    if objType is TextType:
+        data = obj.encode("utf-8", "backslashreplace")
+        append(_header("str", len(data)))
+        append(data)
+    elif objType is bytes:
+        if TextType is str:
+            append(_header("bin", len(obj)))
+            append(obj)
+        else:
+            # Python 2 str objects are text as with json
+            _pack(obj.decode("utf-8", "replace"), append)
+    elif objType is bytearray or objType is memoryview:
+        # the object itself is appended, a memoryview must be one of bytes
+        append(_header("bin", len(obj)))
+        append(obj)
+    elif obj is None:
+        append(b"\xc0")
+    elif obj is True:
+        append(b"\xc3")
+    elif obj is False:
+        append(b"\xc2")
+    elif objType in IntegerTypes:
+        _packInteger(obj, append)
+    elif objType is float:
+        append(b"\xcb" + _Float.pack(obj))
+    elif objType is list or objType is tuple:
+        append(_header("array", len(obj)))
+        for item in obj:
+            _pack(item, append)
+    elif objType is dict:
+        append(_header("map", len(obj)))
+        for key, value in obj.items():
+            _pack(key, append)
+            _pack(value, append)
+    else:
+        # subclasses of the supported types
+        for baseType in (bool, float, TextType, bytes, list, tuple, dict) + \
+                IntegerTypes:
+            if isinstance(obj, baseType):
+                _pack(baseType(obj), append)
+                return
+
+        raise TypeError("Object of type {0} can't be encoded".format(
+            objType.__name__))
+
+
+def packMessage(obj):
+    """
+    Function to encode a message.
+
+    @param obj message to be encoded
+    @type dict
+    @return encoded message
+    @rtype bytes
+    """
+    if msgpack is not None:
+        # Python 2 str objects are text as with json
+        return msgpack.packb(obj, use_bin_type=TextType is str,
+                             unicode_errors="backslashreplace")
+
+    parts = []
+    _pack(obj, parts.append)
+    return b"".join(parts)
+
+
+def packMessageParts(obj):
+    """
+    Function to encode a message as a list of parts.
+
+    The parts are the byte arrays and memoryviews contained in the message
+    and the encodings of the data between them. The message is encoded by
+    the pure Python implementation.
+
+    @param obj message to be encoded
+    @type dict
+    @return encoded parts of the message
+    @rtype list of bytes, bytearray or memoryview
+    """
+    parts = []
+    encoded = []
+
+    def append(part):
+        """
+        Function appending a part of the encoding.
+
+        @param part part of the encoding
+        @type bytes, bytearray or memoryview
+        """
+        if type(part) is bytes:
+            encoded.append(part)
+        else:
+            if encoded:
+                parts.append(b"".join(encoded))
+                del encoded[:]
+            parts.append(part)
+
+    _pack(obj, append)
+    if encoded:
+        parts.append(b"".join(encoded))
+    return parts
+
+
+class _Unpacker(object):
+    """
+    Class implementing the pure Python decoder.
+    """
+    def __init__(self, data):
+        """
+        Constructor
+
+        @param data encoded message
+        @type bytes
+        """
+        self.data = data
+        self.bytes = bytearray(data)
+        self.pos = 0
+
+    def __read(self, typeByte):
+        """
+        Private method to read a number of a given type.
+
+        @param typeByte type byte of the number
+        @type int
+        @return number read
+        @rtype int
+        """
+        fmt = _Formats[typeByte]
+        value = fmt.unpack_from(self.data, self.pos)[0]
+        self.pos += fmt.size
+        return value
+
+    def __raw(self, length):
+        """
+        Private method to read a number of bytes.
+
+        @param length number of bytes
+        @type int
+        @return bytes read
+        @rtype bytes
+        @exception ValueError raised to indicate a truncated message
+        """
+        start = self.pos
+        self.pos += length
+        if self.pos > len(self.bytes):
+            raise ValueError("truncated message")
+        return bytes(self.data[start:self.pos])
+
+    def unpack(self):
+        """
+        Public method to decode the next object.
+
+        @return decoded object
+        @rtype None, bool, int, float, str, bytes, list or dict
+        @exception ValueError raised to indicate an invalid message
+        """
+        try:
+            typeByte = self.bytes[self.pos]
+        except IndexError:
+            raise ValueError("truncated message")
+        self.pos += 1
+
+        if typeByte < 0x80:
+            return typeByte
+        elif typeByte >= 0xe0:
+            return typeByte - 0x100
+        elif 0xa0 <= typeByte <= 0xbf:
+            return self.__raw(typeByte & 0x1f).decode("utf-8", "replace")
+        elif 0x90 <= typeByte <= 0x9f:
+            return [self.unpack() for _ in range(typeByte & 0x0f)]
+        elif 0x80 <= typeByte <= 0x8f:
+            return self.__map(typeByte & 0x0f)
+        elif typeByte == 0xc0:
+            return None
+        elif typeByte == 0xc2:
+            return False
+        elif typeByte == 0xc3:
+            return True
+        elif typeByte == 0xcb:
+            value = _Float.unpack_from(self.data, self.pos)[0]
+            self.pos += _Float.size
+            return value
+        elif typeByte in (0xd9, 0xda, 0xdb):
+            return self.__raw(self.__read(typeByte)).decode(
+                "utf-8", "replace")
+        elif typeByte in (0xc4, 0xc5, 0xc6):
+            return self.__raw(self.__read(typeByte))
+        elif typeByte in (0xdc, 0xdd):
+            return [self.unpack() for _ in range(self.__read(typeByte))]
+        elif typeByte in (0xde, 0xdf):
+            return self.__map(self.__read(typeByte))
+        elif 0xcc <= typeByte <= 0xd3:
+            return self.__read(typeByte)
+        else:
+            raise ValueError("unsupported type 0x{0:02x}".format(typeByte))
+
+    def __map(self, length):
+        """
+        Private method to decode a map.
+
+        @param length number of entries
+        @type int
+        @return decoded map
+        @rtype dict
+        """
+        result = {}
+        for _ in range(length):
+            key = self.unpack()
+            result[key] = self.unpack()
+        return result
+
+
+def unpackMessage(data):
+    """
+    Function to decode a message.
+
+    @param data encoded message
+    @type bytes
+    @return decoded message
+    @rtype dict
+    @exception ValueError raised to indicate an invalid message
+    """
+    if msgpack is not None:
+        try:
+            return msgpack.unpackb(data, raw=False,
+                                   unicode_errors="replace")
+        except Exception as err:
+            raise ValueError(str(err))
+
+    unpacker = _Unpacker(data)
+    try:
+        obj = unpacker.unpack()
+    except struct.error:
+        raise ValueError("truncated message")
+    if unpacker.pos != len(unpacker.bytes):
+        raise ValueError("extra data after the message")
+    return obj
+
+#
+# eflag: noqa = M702
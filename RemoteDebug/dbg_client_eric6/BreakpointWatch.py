@@ -8,6 +8,15 @@ Module implementing the breakpoint and watch class.
 """
 
 import os
+import sys
+import types
+import weakref
+
+try:
+    from collections import OrderedDict
+except ImportError:
+    # Python 2.6
+    OrderedDict = dict
 
 
 class Breakpoint:
@@ -24,12 +33,33 @@ class Breakpoint:
     To test for a specific line in a file there is another dict breakInFile,
     which is indexed only by filename and holds all line numbers where
     breakpoints are.
+    
+    The trace function works on code objects. Therefore breakInCode maps
+    the id of every live code object seen so far to a frozenset of the
+    breakpoint lines it contains. codeInFile holds weak references to these
+    code objects indexed by filename, so the index can be updated for a
+    single file whenever a breakpoint is added or removed. The entries of a
+    code object are removed, when it is destroyed, so dynamically compiled
+    code isn't kept alive. The line numbers of the code objects of files
+    with breakpoints are computed only once and kept in linesInCode. They
+    are dropped, when the last breakpoint of the file is cleared.
+    
+    Conditions are compiled once, when the breakpoint is set. If a condition
+    doesn't refer to any local variable of the function being executed, it is
+    evaluated in the global namespace only, which saves building the locals
+    dictionary of the frame on every hit.
     """
+    # names giving a condition access to the local namespace
+    LocalsNames = frozenset(["locals", "vars", "dir", "eval", "exec"])
+    
     breaks = {}     # indexed by (filename, lineno) tuple: Breakpoint
-    breakInFile = {}  # indexed by filename: [lineno]
-    breakInFrameCache = {}
+    breakInFile = {}  # indexed by filename: {lineno}
+    breakInCode = {}  # indexed by id(code object): frozenset of lineno
+    codeInFile = {}   # indexed by filename: {id(code object): weakref}
+    linesInCode = {}  # indexed by id(code object): frozenset of lineno
     
-    def __init__(self, filename, lineno, temporary=False, cond=None):
+    def __init__(self, filename, lineno, temporary=False, cond=None,
+                 updateIndex=True, compiledCond=None):
         """
         Constructor
         
@@ -40,33 +70,60 @@ class Breakpoint:
         @keyparam temporary flag to indicate a temporary breakpoint
         @type bool
         @keyparam cond Python expression which dynamically enables this bp
-        @type str
+        @type str or code object
+        @keyparam updateIndex flag indicating to update the code index (the
+            caller has to call reindexFile otherwise)
+        @type bool
+        @keyparam compiledCond condition compiled by compileCondition already
+        @type code object
+        @exception SyntaxError raised to indicate an invalid condition
         """
+        if compiledCond is not None:
+            pass
+        elif cond is None or isinstance(cond, types.CodeType):
+            compiledCond = cond
+        else:
+            compiledCond = Breakpoint.compileCondition(cond)
+        
         filename = os.path.abspath(filename)
         self.file = filename
         self.line = lineno
         self.temporary = temporary
         self.cond = cond
+        self.compiledCond = compiledCond
+        if compiledCond is not None:
+            self.condNames = Breakpoint.getCodeNames(compiledCond)
+        else:
+            self.condNames = frozenset()
         self.enabled = True
         self.ignore = 0
+        self.ignorePrecheck = False
         self.hits = 0
+        # flags telling whether the condition needs the locals of a code
+        # object, indexed by id(code object)
+        self.localsNeeded = {}
         Breakpoint.breaks[(filename, lineno)] = self
-        lines = Breakpoint.breakInFile.setdefault(filename, [])
-        if lineno not in lines:
-            lines.append(lineno)
-        Breakpoint.breakInFrameCache.clear()
+        Breakpoint.breakInFile.setdefault(filename, set()).add(lineno)
+        if updateIndex:
+            Breakpoint.__updateCodeIndex(filename, lineno, True)
 
-    def deleteMe(self):
+    def deleteMe(self, updateIndex=True):
         """
         Public method to clear this breakpoint.
+        
+        @keyparam updateIndex flag indicating to update the code index (the
+            caller has to call reindexFile otherwise)
+        @type bool
         """
         try:
             del Breakpoint.breaks[(self.file, self.line)]
-            Breakpoint.breakInFile[self.file].remove(self.line)
+            Breakpoint.breakInFile[self.file].discard(self.line)
             if not Breakpoint.breakInFile[self.file]:
                 del Breakpoint.breakInFile[self.file]
         except KeyError:
             pass
+        if updateIndex:
+            Breakpoint.__updateCodeIndex(self.file, self.line, False)
 
     def enable(self):
         """
@@ -80,6 +137,64 @@ class Breakpoint:
         """
         self.enabled = False
 
+    @staticmethod
+    def compileCondition(cond):
+        """
+        Static method to compile a breakpoint condition.
+        
+        @param cond Python expression of the condition
+        @type str
+        @return compiled condition
+        @rtype code object
+        @exception SyntaxError raised to indicate an invalid condition
+        """
+        return compile(cond, '<string>', 'eval')
+    
+    @staticmethod
+    def getCodeNames(code):
+        """
+        Static method to get all names used by a code object and the code
+        objects nested in it.
+        
+        @param code code object to be inspected
+        @type code object
+        @return names used by the code object
+        @rtype frozenset of str
+        """
+        names = set(code.co_names)
+        names.update(code.co_varnames, code.co_freevars)
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                names.update(Breakpoint.getCodeNames(const))
+        return frozenset(names)
+    
+    def needsLocals(self, code):
+        """
+        Public method to check, if the condition has to be evaluated with the
+        local namespace of a code object.
+        
+        Only functions have a fixed set of local names, so the condition of
+        a module or class body is always evaluated with its namespace.
+        
+        @param code code object of the frame hitting the breakpoint
+        @type code object
+        @return flag indicating to pass the locals of the frame
+        @rtype bool
+        """
+        try:
+            return self.localsNeeded[id(code)]
+        except KeyError:
+            if code.co_flags & 0x0001:     # CO_OPTIMIZED
+                localNames = set(code.co_varnames)
+                localNames.update(code.co_cellvars, code.co_freevars)
+                needed = bool(
+                    self.condNames & Breakpoint.LocalsNames or
+                    not self.condNames.isdisjoint(localNames))
+            else:
+                needed = True
+            self.localsNeeded[id(code)] = needed
+            return needed
+    
     @staticmethod
     def clear_break(filename, lineno):
         """
@@ -93,7 +208,6 @@ class Breakpoint:
         bp = Breakpoint.breaks.get((filename, lineno))
         if bp:
             bp.deleteMe()
-        Breakpoint.breakInFrameCache.clear()
     
     @staticmethod
     def clear_all_breaks():
@@ -102,7 +216,174 @@ class Breakpoint:
         """
         Breakpoint.breaks.clear()
         Breakpoint.breakInFile.clear()
-        Breakpoint.breakInFrameCache.clear()
+        Breakpoint.breakInCode.clear()
+        Breakpoint.codeInFile.clear()
+        Breakpoint.linesInCode.clear()
+    
+    @staticmethod
+    def getCodeLines(code):
+        """
+        Static method to get the line numbers belonging to a code object.
+        
+        @param code code object to be inspected
+        @type code object
+        @return line numbers of the code object
+        @rtype frozenset of int
+        """
+        if sys.version_info >= (3, 10):
+            return frozenset(
+                [lineNo for _, _, lineNo in code.co_lines()
+                 if lineNo is not None] + [code.co_firstlineno])
+        
+        lineNo = code.co_firstlineno
+        lineNumbers = [lineNo]
+        
+        if sys.version_info[0] == 2:
+            co_lnotab = map(ord, code.co_lnotab[1::2])
+        else:
+            co_lnotab = code.co_lnotab[1::2]
+        
+        # No need to handle special case if a lot of lines between
+        # (e.g. closure), because the additional lines won't cause a bp
+        for co_lno in co_lnotab:
+            lineNo += co_lno
+            lineNumbers.append(lineNo)
+        
+        return frozenset(lineNumbers)
+    
+    @staticmethod
+    def indexCode(code, filename):
+        """
+        Static method to add a code object to the breakpoint index.
+        
+        @param code code object to be indexed
+        @type code object
+        @param filename fixed up file name the code object belongs to
+        @type str
+        @return line numbers of the breakpoints inside the code object
+        @rtype frozenset of int
+        """
+        codeId = id(code)
+        codes = Breakpoint.codeInFile.setdefault(filename, {})
+        if codeId not in codes:
+            # the module globals may be gone already, when the callback is
+            # called at interpreter exit
+            breakpointClass = Breakpoint
+            codes[codeId] = weakref.ref(
+                code, lambda ref: breakpointClass._forgetCode(
+                    breakpointClass, filename, codeId, ref))
+        
+        breakLines = Breakpoint.breakInFile.get(filename)
+        if breakLines:
+            try:
+                codeLines = Breakpoint.linesInCode[codeId]
+            except KeyError:
+                codeLines = Breakpoint.getCodeLines(code)
+                Breakpoint.linesInCode[codeId] = codeLines
+            lines = codeLines.intersection(breakLines)
+        else:
+            lines = frozenset()
+        
+        Breakpoint.breakInCode[codeId] = lines
+        return lines
+    
+    @staticmethod
+    def _forgetCode(breakpointClass, filename, codeId, ref):
+        """
+        Protected static method to remove the index entries of a destroyed
+        code object.
+        
+        @param breakpointClass the Breakpoint class holding the index
+        @type class
+        @param filename file name the code object belonged to
+        @type str
+        @param codeId id of the destroyed code object
+        @type int
+        @param ref weak reference to the destroyed code object
+        @type weakref
+        """
+        codes = breakpointClass.codeInFile.get(filename)
+        if codes is None or codes.get(codeId) is not ref:
+            # the index was cleared meanwhile
+            return
+        
+        del codes[codeId]
+        if not codes:
+            del breakpointClass.codeInFile[filename]
+        breakpointClass.breakInCode.pop(codeId, None)
+        breakpointClass.linesInCode.pop(codeId, None)
+    
+    @staticmethod
+    def reindexFile(filename):
+        """
+        Static method to rebuild the index entries of the code objects of a
+        file after a bulk change of its breakpoints.
+        
+        @param filename file name of the changed breakpoints
+        @type str
+        """
+        codes = Breakpoint.codeInFile.get(filename)
+        if not codes:
+            return
+        
+        if filename not in Breakpoint.breakInFile:
+            Breakpoint.__dropFile(filename)
+            return
+        
+        for ref in list(codes.values()):
+            code = ref()
+            if code is not None:
+                Breakpoint.indexCode(code, filename)
+    
+    @staticmethod
+    def __dropFile(filename):
+        """
+        Private static method to drop the line numbers of the code objects of
+        a file without breakpoints.
+        
+        @param filename file name of the code objects
+        @type str
+        """
+        for codeId in list(Breakpoint.codeInFile.get(filename, {}).keys()):
+            Breakpoint.breakInCode[codeId] = frozenset()
+            Breakpoint.linesInCode.pop(codeId, None)
+    
+    @staticmethod
+    def __updateCodeIndex(filename, lineno, add):
+        """
+        Private static method to update the index entries of the code objects
+        of a file after a breakpoint was added or removed.
+        
+        @param filename file name of the changed breakpoint
+        @type str
+        @param lineno line number of the changed breakpoint
+        @type int
+        @param add flag indicating an added breakpoint
+        @type bool
+        """
+        codes = Breakpoint.codeInFile.get(filename)
+        if not codes:
+            return
+        
+        if not add and filename not in Breakpoint.breakInFile:
+            Breakpoint.__dropFile(filename)
+            return
+        
+        for codeId, ref in list(codes.items()):
+            if add and codeId not in Breakpoint.linesInCode:
+                # the first breakpoint of the file
+                code = ref()
+                if code is not None:
+                    Breakpoint.indexCode(code, filename)
+                continue
+            
+            lines = Breakpoint.breakInCode.get(codeId, frozenset())
+            if add:
+                if (lineno not in lines and
+                        lineno in Breakpoint.linesInCode[codeId]):
+                    Breakpoint.breakInCode[codeId] = lines.union((lineno,))
+            elif lineno in lines:
+                Breakpoint.breakInCode[codeId] = lines.difference((lineno,))
 
     @staticmethod
     def get_break(filename, lineno):
@@ -147,7 +428,12 @@ class Breakpoint:
         
         # Count every hit when bp is enabled
         b.hits += 1
-        if not b.cond:
+        if b.ignorePrecheck and b.ignore > 0:
+            # the ignore count applies to all hits, don't evaluate at all
+            b.ignore -= 1
+            return (None, False)
+        
+        if b.compiledCond is None:
             # If unconditional, and ignoring,
             # go on to next, else break
             if b.ignore > 0:
@@ -162,7 +448,10 @@ class Breakpoint:
             # Ignore count applies only to those bpt hits where the
             # condition evaluates to true.
             try:
-                val = eval(b.cond, frame.f_globals, frame.f_locals)
+                if b.needsLocals(frame.f_code):
+                    val = eval(b.compiledCond, frame.f_globals, frame.f_locals)
+                else:
+                    val = eval(b.compiledCond, frame.f_globals)
                 if val:
                     if b.ignore > 0:
                         b.ignore -= 1
@@ -187,8 +476,25 @@ class Watch:
 
     Implements temporary watches, ignore counts, disabling and
     (re)-enabling, and conditionals.
+    
+    A watch expression is evaluated only in frames of functions using at least
+    one of its names, either as a local or a global name or as an attribute.
+    The watches relevant for a code object are cached in watchesInCode as
+    long as the code object is alive. The cache is invalidated whenever a
+    watch expression is added or removed.
+    
+    The values of created and changed watches are stored per frame, indexed
+    by the id of the frame, so that they don't keep the frame and its locals
+    alive, when no return event is seen for it. They are released, when the
+    frame returns or the trace function is removed, and their number is
+    limited by MaxFrameValues. An entry whose code object differs from the
+    one of the frame belongs to a deleted frame and is replaced.
     """
+    MaxFrameValues = 1000
+    
     watches = []
+    # indexed by id(code object): (weak reference to code object, [Watch])
+    watchesInCode = {}
 
     def __init__(self, cond, compiledCond, flag, temporary=False):
         """
@@ -221,17 +527,27 @@ class Watch:
         elif flag == '??changed??':
             self.changed = True
         
-        self.values = {}
+        names = Breakpoint.getCodeNames(compiledCond)
+        if not names or names & Breakpoint.LocalsNames:
+            # relevant for every frame
+            self.names = None
+        else:
+            self.names = names
+        
+        # indexed by id(frame): [value, ignore count, code object]
+        self.values = OrderedDict()
         Watch.watches.append(self)
+        Watch.watchesInCode.clear()
 
     def deleteMe(self):
         """
         Public method to clear this watch expression.
         """
         try:
-            del Watch.watches[self]
+            Watch.watches.remove(self)
         except ValueError:
             pass
+        Watch.watchesInCode.clear()
 
     def enable(self):
         """
@@ -245,6 +561,25 @@ class Watch:
         """
         self.enabled = False
 
+    @staticmethod
+    def compileCondition(cond):
+        """
+        Static method to compile the expression of a watch expression.
+        
+        @param cond condition as string with flag
+        @type str
+        @return tuple of compiled condition and flag
+        @rtype tuple of (code object, str)
+        @exception SyntaxError raised to indicate an invalid condition
+        """
+        if cond.endswith(('??created??', '??changed??')):
+            expression, flag = cond.split()
+        else:
+            expression = cond
+            flag = ''
+        
+        return compile(expression, '<string>', 'eval'), flag
+
     @staticmethod
     def clear_watch(cond):
         """
@@ -257,6 +592,7 @@ class Watch:
             Watch.watches.remove(Watch.get_watch(cond))
         except ValueError:
             pass
+        Watch.watchesInCode.clear()
 
     @staticmethod
     def clear_all_watches():
@@ -264,6 +600,7 @@ class Watch:
         Static method to clear all watch expressions.
         """
         del Watch.watches[:]
+        Watch.watchesInCode.clear()
 
     @staticmethod
     def get_watch(cond):
@@ -282,39 +619,143 @@ class Watch:
         return None
 
     @staticmethod
-    def effectiveWatch(frame):
+    def getWatches(code):
+        """
+        Static method to get the watch expressions relevant for a code object.
+        
+        @param code code object to get the watch expressions for
+        @type code object
+        @return list of relevant watch expressions
+        @rtype list of Watch
+        """
+        try:
+            return Watch.watchesInCode[id(code)][1]
+        except KeyError:
+            pass
+        
+        if code.co_flags & 0x0001:     # CO_OPTIMIZED
+            codeNames = set(code.co_names)
+            codeNames.update(
+                code.co_varnames, code.co_cellvars, code.co_freevars)
+            watches = [b for b in Watch.watches
+                       if b.names is None or not b.names.isdisjoint(codeNames)]
+        else:
+            # module and class bodies may access any name
+            watches = Watch.watches[:]
+        
+        codeId = id(code)
+        # the module globals may be gone already, when the callback is
+        # called at interpreter exit
+        forgetCode, watchesInCode = Watch._forgetCode, Watch.watchesInCode
+        watchesInCode[codeId] = (
+            weakref.ref(code,
+                        lambda ref: forgetCode(watchesInCode, codeId, ref)),
+            watches)
+        return watches
+
+    @staticmethod
+    def _forgetCode(watchesInCode, codeId, ref):
+        """
+        Protected static method to remove a deleted code object from the
+        cache of relevant watch expressions.
+        
+        @param watchesInCode cache of the relevant watch expressions
+        @type dict
+        @param codeId id of the deleted code object
+        @type int
+        @param ref weak reference to the deleted code object
+        @type weakref.ref
+        """
+        entry = watchesInCode.get(codeId)
+        if entry is not None and entry[0] is ref:
+            del watchesInCode[codeId]
+
+    @staticmethod
+    def releaseFrame(frame):
+        """
+        Static method to release the values stored for a frame.
+        
+        @param frame the frame being left
+        @type frame object
+        """
+        frameId = id(frame)
+        for b in Watch.watches:
+            b.values.pop(frameId, None)
+
+    @staticmethod
+    def releaseFrames():
+        """
+        Static method to release the values stored for all frames.
+        
+        It is called, when the trace function is removed and the frames
+        being left aren't seen anymore.
+        """
+        for b in Watch.watches:
+            b.values.clear()
+
+    def __frameValues(self, frame, val):
+        """
+        Private method to get the values stored for a frame.
+        
+        @param frame the current execution frame
+        @type frame object
+        @param val current value of the watch expression
+        @type any
+        @return list of the frame's value and remaining ignore count or
+            None, if the frame wasn't seen before
+        @rtype list or None
+        """
+        frameId = id(frame)
+        values = self.values.get(frameId)
+        if values is not None:
+            if values[2] is frame.f_code:
+                return values
+        elif len(self.values) >= Watch.MaxFrameValues:
+            if OrderedDict is dict:
+                self.values.clear()
+            else:
+                self.values.popitem(last=False)
+        self.values[frameId] = [val, self.ignore, frame.f_code]
+        return None
+
+    @staticmethod
+    def effectiveWatch(frame, watches=None):
         """
         Static method to determine, if a watch expression is effective.
         
         @param frame the current execution frame
         @type frame object
+        @keyparam watches watch expressions to be checked (defaults to all)
+        @type list of Watch
         @return tuple of watch expression and a flag to indicate, that a
             temporary watch expression may be deleted
         @rtype tuple of Watch, int
         """
-        for b in Watch.watches:
+        if watches is None:
+            watches = Watch.watches
+        
+        for b in watches:
             if not b.enabled:
                 continue
             try:
                 val = eval(b.compiledCond, frame.f_globals, frame.f_locals)
                 if b.created:
-                    if frame in b.values:
+                    if b.__frameValues(frame, val) is not None:
                         continue
                     else:
-                        b.values[frame] = [1, val, b.ignore]
                         return (b, True)
                     
                 elif b.changed:
-                    try:
-                        if b.values[frame][1] != val:
-                            b.values[frame][1] = val
-                        else:
-                            continue
-                    except KeyError:
-                        b.values[frame] = [1, val, b.ignore]
+                    values = b.__frameValues(frame, val)
+                    if values is None:
+                        values = b.values[id(frame)]
+                    elif values[0] != val:
+                        values[0] = val
+                    else:
+                        continue
                     
-                    if b.values[frame][2] > 0:
-                        b.values[frame][2] -= 1
+                    if values[1] > 0:
+                        values[1] -= 1
                         continue
                     else:
                         return (b, True)
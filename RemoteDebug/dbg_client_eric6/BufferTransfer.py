@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the access to the raw data of variables sent to the IDE
+by RequestBuffer.
+
+Objects supporting the buffer protocol, e.g. bytes, bytearray, array.array
+and memoryview objects, numpy arrays and QByteArray objects provide their
+raw data. A window of their items is taken from their memory without
+copying it, if the memory is contiguous. Otherwise just the items of the
+window are copied. Python 2 always copies the window.
+"""
+
+import sys
+
+# maximum number of bytes of a window
+MaxBufferSize = 64 * 1024 * 1024
+
+# numpy type kinds indexed by the struct format characters
+_FormatKinds = {
+    "b": "i", "h": "i", "i": "i", "l": "i", "q": "i", "n": "i",
+    "B": "u", "H": "u", "I": "u", "L": "u", "Q": "u", "N": "u",
+    "e": "f", "f": "f", "d": "f", "?": "b", "c": "S",
+}
+
+
+def _dtype(fmt, itemsize):
+    """
+    Function to convert a struct format of a buffer into a numpy type string.
+
+    @param fmt struct format of the items
+    @type str
+    @param itemsize size of an item in bytes
+    @type int
+    @return numpy type string or None, if the format has no numpy
+        equivalent
+    @rtype str
+    """
+    byteorder = "<" if sys.byteorder == "little" else ">"
+    if fmt[:1] in "@=<>!":
+        if fmt[0] in "<>":
+            byteorder = fmt[0]
+        elif fmt[0] == "!":
+            byteorder = ">"
+        fmt = fmt[1:]
+    kind = _FormatKinds.get(fmt)
+    if kind is None:
+        return None
+    elif itemsize == 1:
+        return "|{0}1".format(kind)
+    else:
+        return "{0}{1}{2}".format(byteorder, kind, itemsize)
+
+
+def _window(length, itemsize, start, count):
+    """
+    Function to clip a window of items to the items of a buffer.
+
+    A window contains at most MaxBufferSize bytes.
+
+    @param length number of items of the buffer
+    @type int
+    @param itemsize size of an item in bytes
+    @type int
+    @param start index of the first item of the window
+    @type int
+    @param count number of items of the window or None for all items
+    @type int
+    @return tuple of the index of the first item and the index after the
+        last item
+    @rtype tuple of (int, int)
+    """
+    start = min(max(start, 0), length)
+    maxCount = MaxBufferSize // max(itemsize, 1)
+    count = maxCount if count is None else min(max(count, 0), maxCount)
+    return start, min(start + count, length)
+
+
+def _ndarrayWindow(arr, start, count):
+    """
+    Function to get a window of the items of a numpy array.
+
+    @param arr array to get the items from
+    @type ndarray
+    @param start index of the first item in C order
+    @type int
+    @param count number of items or None for all items
+    @type int
+    @return tuple of the raw data and the description of the window
+    @rtype tuple of (memoryview or bytearray, dict)
+    @exception TypeError raised to indicate an array of Python objects
+    """
+    import numpy
+
+    if arr.dtype.hasobject:
+        raise TypeError("an array of Python objects has no raw data")
+
+    start, stop = _window(arr.size, arr.dtype.itemsize, start, count)
+    if arr.flags.c_contiguous:
+        # a view of the items
+        items = arr.reshape(-1)[start:stop]
+    else:
+        # copies just the items of the window
+        items = arr.flat[start:stop]
+
+    if sys.version_info[0] == 2:
+        data = bytearray(items.tostring())
+    else:
+        data = memoryview(items.view(numpy.uint8))
+    return data, {
+        "dtype": arr.dtype.str,
+        "format": None,
+        "itemsize": arr.dtype.itemsize,
+        "shape": list(arr.shape),
+        "length": arr.size,
+        "start": start,
+        "count": stop - start,
+    }
+
+
+def _bufferWindow(obj, start, count):
+    """
+    Function to get a window of the items of an object supporting the
+    buffer protocol.
+
+    @param obj object to get the items from
+    @type bytes, bytearray, array.array, memoryview or QByteArray
+    @param start index of the first item
+    @type int
+    @param count number of items or None for all items
+    @type int
+    @return tuple of the raw data and the description of the window
+    @rtype tuple of (memoryview or bytearray, dict)
+    @exception TypeError raised to indicate an object without raw data
+    """
+    try:
+        view = memoryview(obj)
+    except TypeError:
+        if sys.version_info[0] == 2 and hasattr(obj, "typecode"):
+            # array.array doesn't support memoryview with Python 2
+            view = None
+        elif callable(getattr(obj, "data", None)):
+            # QByteArray
+            view = memoryview(obj.data())
+        else:
+            raise TypeError("'{0}' object has no raw data".format(
+                type(obj).__name__))
+
+    if sys.version_info[0] == 2:
+        if view is None:
+            fmt, itemsize, shape = obj.typecode, obj.itemsize, [len(obj)]
+        else:
+            fmt, itemsize = view.format, view.itemsize
+            shape = list(view.shape)
+        length = 1
+        for dimension in shape:
+            length *= dimension
+        start, stop = _window(length, itemsize, start, count)
+        data = _copyWindow(obj, view, start * itemsize,
+                           (stop - start) * itemsize)
+    else:
+        fmt, itemsize, shape = view.format, view.itemsize, list(view.shape)
+        length = view.nbytes // itemsize
+        start, stop = _window(length, itemsize, start, count)
+        if view.c_contiguous:
+            # a view of the items
+            data = view.cast("B")[start * itemsize:stop * itemsize]
+        else:
+            data = memoryview(view.tobytes()[start * itemsize:
+                                             stop * itemsize])
+
+    return data, {
+        "dtype": _dtype(fmt, itemsize),
+        "format": fmt,
+        "itemsize": itemsize,
+        "shape": shape,
+        "length": length,
+        "start": start,
+        "count": stop - start,
+    }
+
+
+def _copyWindow(obj, view, offset, size):
+    """
+    Function to copy a window of the raw data of an object with Python 2.
+
+    @param obj object to copy the data from
+    @type str, bytearray, array.array, memoryview or QByteArray
+    @param view memoryview of the object or None for an array.array
+    @type memoryview
+    @param offset offset of the window in bytes
+    @type int
+    @param size size of the window in bytes
+    @type int
+    @return copy of the window
+    @rtype bytearray
+    """
+    try:
+        return bytearray(buffer(obj, offset, size))  # __IGNORE_WARNING__
+    except TypeError:
+        # memoryview and QByteArray objects have no old style buffer
+        pass
+
+    if view.ndim == 1 and view.itemsize == 1:
+        return bytearray(view[offset:offset + size].tobytes())
+    else:
+        return bytearray(view.tobytes()[offset:offset + size])
+
+
+def bufferWindow(obj, start=0, count=None):
+    """
+    Function to get a window of the raw data of an object.
+
+    The items are counted in C order, i.e. a multi-dimensional array is
+    treated like the one-dimensional array of all its items.
+
+    @param obj object to get the raw data from
+    @type any
+    @keyparam start index of the first item
+    @type int
+    @keyparam count number of items or None for all items, a window is cut
+        off at MaxBufferSize bytes
+    @type int
+    @return tuple of the raw data and a dictionary describing the window
+        with the numpy type ("dtype") or None, the struct format of the
+        buffer ("format") or None, the size of an item in bytes
+        ("itemsize"), the shape of the object ("shape"), its number of items
+        ("length"), the index of the first item ("start") and the number of
+        items of the window ("count")
+    @rtype tuple of (memoryview or bytearray, dict)
+    @exception TypeError raised to indicate an object without raw data
+    """
+    if hasattr(obj, "__array_interface__") and hasattr(obj, "dtype"):
+        return _ndarrayWindow(obj, start, count)
+    else:
+        return _bufferWindow(obj, start, count)
+
+#
+# eflag: noqa = M702
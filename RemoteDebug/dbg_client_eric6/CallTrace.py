@@ -0,0 +1,293 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the compact call trace modes of the debug client.
+
+Instead of one CallTrace message per call and return, the recorder sends
+each file name and function name once in a CallTraceStrings message and
+refers to it by its index afterwards. In batched mode the events are
+buffered and sent as CallTraceBatch messages. In aggregated mode the
+number of calls of each caller and callee pair is counted and sent as
+CallTraceEdges messages. In sampled mode no profile function is used at
+all, the stacks of all threads are sampled periodically and sent as
+CallTraceSamples messages.
+
+In batched and aggregated mode only every Nth call may be recorded.
+"""
+
+import sys
+import time
+
+if sys.version_info[0] == 2:
+    import thread as _thread
+else:
+    import _thread
+
+from .AsyncFile import StartNewThread
+
+# event codes of CallTraceBatch
+CallEvent = 0
+ReturnEvent = 1
+# number of values per event of CallTraceBatch
+EventSize = 7
+
+# events per CallTraceBatch message
+BatchSize = 1000
+# maximum age (in seconds) of a recorded event before it is sent
+FlushInterval = 0.1
+# time between two stack samples (in seconds)
+SampleInterval = 0.01
+
+
+class CallTraceRecorder(object):
+    """
+    Class implementing the recorder of the batched, aggregated and sampled
+    call trace modes.
+
+    The recorded data is sent, when a batch is full, and by a thread of the
+    recorder, which sends it at least every flushInterval seconds. In
+    sampled mode this thread also takes the stack samples.
+
+    A CallTraceBatch message contains a flat list with seven values per
+    event: the event code, the file name, function name and line number of
+    the caller and the same for the callee. A CallTraceEdges message
+    contains a flat list with five values per edge: the file name and
+    function name of the caller and of the callee and the number of calls.
+    Each sample of a CallTraceSamples message is a list of the thread id
+    followed by the file name, function name and line number of each frame,
+    innermost first.
+    """
+    def __init__(self, dbgClient, mode, every=1, batchSize=BatchSize,
+                 flushInterval=FlushInterval, sampleInterval=SampleInterval):
+        """
+        Constructor
+
+        @param dbgClient reference to the debug client object
+        @type DebugClient
+        @param mode call trace mode (batched, aggregated or sampled)
+        @type str
+        @keyparam every record every Nth call only (batched and aggregated
+            mode), returns aren't recorded for N > 1
+        @type int
+        @keyparam batchSize number of events per CallTraceBatch message
+        @type int
+        @keyparam flushInterval maximum age of recorded data before it is
+            sent (in seconds)
+        @type float
+        @keyparam sampleInterval time between two stack samples (in seconds)
+        @type float
+        """
+        self.__dbgClient = dbgClient
+        self.mode = mode
+        self.every = max(1, every)
+        self.batchSize = max(1, batchSize)
+        self.flushInterval = flushInterval
+        self.sampleInterval = sampleInterval
+
+        self.__lock = _thread.allocate_lock()
+        self.__strings = {}
+        self.__newStrings = []
+        # file name and function name indices indexed by the code object
+        self.__locations = {}
+        self.__countdown = self.every
+        self.__events = []
+        self.__edges = {}
+        self.__samples = []
+
+        self.__running = True
+        self.threadId = StartNewThread(self.__thread, ())
+
+    def record(self, event, fromFrame, toFrame):
+        """
+        Public method to record a call or return.
+
+        @param event trace event (call or return)
+        @type str
+        @param fromFrame originating frame
+        @type frame object
+        @param toFrame destination frame
+        @type frame object
+        """
+        isCall = event == "call"
+        if not isCall and (self.every > 1 or self.mode == "aggregated"):
+            return
+
+        with self.__lock:
+            if self.every > 1:
+                self.__countdown -= 1
+                if self.__countdown > 0:
+                    return
+                self.__countdown = self.every
+
+            fromFile, fromName = self.__location(fromFrame)
+            toFile, toName = self.__location(toFrame)
+            if self.mode == "aggregated":
+                edge = (fromFile, fromName, toFile, toName)
+                self.__edges[edge] = self.__edges.get(edge, 0) + 1
+            else:
+                self.__events.extend((
+                    CallEvent if isCall else ReturnEvent,
+                    fromFile, fromName, fromFrame.f_lineno,
+                    toFile, toName, toFrame.f_lineno))
+                if len(self.__events) >= self.batchSize * EventSize:
+                    self.__send()
+
+    def flush(self):
+        """
+        Public method to send the recorded data.
+        """
+        with self.__lock:
+            self.__send()
+
+    def stop(self):
+        """
+        Public method to send the recorded data and to stop the recorder.
+        """
+        with self.__lock:
+            self.__running = False
+            self.__send()
+
+    def __location(self, frame):
+        """
+        Private method to get the file name and function name indices of a
+        frame.
+
+        The lock must be held by the caller.
+
+        @param frame frame to get the indices for
+        @type frame object
+        @return file name index and function name index
+        @rtype tuple of (int, int)
+        """
+        code = frame.f_code
+        try:
+            return self.__locations[code]
+        except KeyError:
+            dbgClient = self.__dbgClient
+            location = (
+                self.__intern(dbgClient.absPath(
+                    dbgClient.fix_frame_filename(frame))),
+                self.__intern(code.co_name),
+            )
+            self.__locations[code] = location
+            return location
+
+    def __intern(self, string):
+        """
+        Private method to get the index of a string.
+
+        The lock must be held by the caller.
+
+        @param string file name or function name
+        @type str
+        @return index of the string
+        @rtype int
+        """
+        try:
+            return self.__strings[string]
+        except KeyError:
+            index = len(self.__strings)
+            self.__strings[string] = index
+            self.__newStrings.append(string)
+            return index
+
+    def __send(self):
+        """
+        Private method to send the recorded data.
+
+        The lock must be held by the caller. New strings are sent first,
+        because the other messages may refer to them.
+        """
+        dbgClient = self.__dbgClient
+        if self.__newStrings:
+            dbgClient.sendJsonCommand("CallTraceStrings", {
+                "first": len(self.__strings) - len(self.__newStrings),
+                "strings": self.__newStrings,
+            })
+            self.__newStrings = []
+
+        if self.__events:
+            dbgClient.sendJsonCommand("CallTraceBatch", {
+                "events": self.__events,
+                "every": self.every,
+            })
+            self.__events = []
+
+        if self.__edges:
+            edges = []
+            for edge, count in self.__edges.items():
+                edges.extend(edge)
+                edges.append(count)
+            dbgClient.sendJsonCommand("CallTraceEdges", {
+                "edges": edges,
+                "every": self.every,
+            })
+            self.__edges = {}
+
+        if self.__samples:
+            dbgClient.sendJsonCommand("CallTraceSamples", {
+                "samples": self.__samples,
+                "interval": self.sampleInterval,
+            })
+            self.__samples = []
+
+    def __sample(self):
+        """
+        Private method to take a sample of the stacks of all threads.
+        """
+        frames = sys._current_frames()
+        ownId = _thread.get_ident()
+        skipFrame = self.__dbgClient.skipFrame
+        with self.__lock:
+            if not self.__running:
+                return
+
+            for threadId, frame in frames.items():
+                if threadId == ownId:
+                    continue
+
+                sample = [threadId]
+                while frame is not None:
+                    if not skipFrame(frame):
+                        fileIndex, nameIndex = self.__location(frame)
+                        sample.extend((fileIndex, nameIndex, frame.f_lineno))
+                    frame = frame.f_back
+                # the threads of the debugger have no frames of the program
+                if len(sample) > 1:
+                    self.__samples.append(sample)
+
+    def __thread(self):
+        """
+        Private method implementing the thread of the recorder.
+        """
+        try:
+            self.__threadLoop()
+        except:     # __IGNORE_WARNING__
+            # Python 2 runs the thread on, while it clears the modules at
+            # exit, even the builtins may be gone
+            if time is None:
+                return
+            raise
+
+    def __threadLoop(self):
+        """
+        Private method implementing the loop of the thread of the recorder.
+        """
+        sampled = self.mode == "sampled"
+        interval = self.sampleInterval if sampled else self.flushInterval
+        nextFlush = time.time() + self.flushInterval
+        while self.__running:
+            time.sleep(interval)
+            if sampled:
+                self.__sample()
+            if time.time() >= nextFlush:
+                with self.__lock:
+                    if self.__running:
+                        self.__send()
+                nextFlush = time.time() + self.flushInterval
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,321 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing breakpoints by patching the code of live functions.
+"""
+
+import os
+import sys
+import ast
+import types
+import linecache
+import weakref
+
+HookName = "_ericBreakpointHook"
+HookStatement = "__import__('sys').{0}()".format(HookName)
+
+# old style classes of Python 2 aren't types
+ClassTypes = (type, getattr(types, 'ClassType', type))
+
+
+class CodePatcher(object):
+    """
+    Class implementing breakpoints without a trace function.
+
+    The source of a file is compiled again with a call of the breakpoint hook
+    installed in the sys module inserted in front of every statement carrying
+    a breakpoint. The code objects of the live functions of that file are
+    swapped with the patched ones. A function is only patched, if the
+    unpatched source compiles to exactly its current code object, i.e. the
+    file wasn't changed after it was imported.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        # original code objects of the patched functions
+        self.__originalCode = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def fixupFilename(fn):
+        """
+        Static method to fix up the file name of a module.
+
+        See DebugBase.fix_frame_filename for details.
+
+        @param fn file name to be fixed up
+        @type str
+        @return fixed up file name
+        @rtype str
+        """
+        fn = os.path.abspath(fn)
+        if fn.endswith(('.pyc', '.pyo', '.pyd')) and os.path.exists(fn[:-1]):
+            fn = fn[:-1]
+        return fn
+
+    @staticmethod
+    def functionFile(func):
+        """
+        Static method to get the fixed up file name of a function.
+
+        @param func function to get the file name for
+        @type function
+        @return fixed up file name
+        @rtype str
+        """
+        fn = func.__globals__.get('__file__')
+        if fn is None:
+            return func.__code__.co_filename
+
+        return CodePatcher.fixupFilename(fn)
+
+    @staticmethod
+    def liveFunctions(filename):
+        """
+        Static method to get the function objects defined in a file.
+
+        The functions are looked up in the namespaces of the modules loaded
+        from the file and of the classes defined in them. Closures created
+        already aren't found, but their code objects are nested in the ones
+        of the functions creating them.
+
+        @param filename fixed up file name
+        @type str
+        @return list of functions
+        @rtype list of function
+        """
+        functions = []
+        seen = set()
+        for module in list(sys.modules.values()):
+            fn = getattr(module, '__file__', None)
+            if fn and CodePatcher.fixupFilename(fn) == filename:
+                CodePatcher.__collectFunctions(
+                    vars(module), module.__name__, filename, functions, seen)
+        return functions
+
+    @staticmethod
+    def __collectFunctions(namespace, moduleName, filename, functions, seen):
+        """
+        Private static method to collect the functions of a namespace.
+
+        @param namespace namespace to be searched
+        @type dict
+        @param moduleName name of the module the namespace belongs to
+        @type str
+        @param filename fixed up file name
+        @type str
+        @param functions list to store the functions into
+        @type list of function
+        @param seen set of ids of the objects visited already
+        @type set of int
+        """
+        objects = list(namespace.values())
+        while objects:
+            obj = objects.pop()
+            if id(obj) in seen:
+                continue
+
+            if isinstance(obj, (staticmethod, classmethod)):
+                objects.append(obj.__func__)
+            elif isinstance(obj, property):
+                objects.extend(accessor for accessor in
+                               (obj.fget, obj.fset, obj.fdel)
+                               if accessor is not None)
+            elif type(obj) is types.FunctionType:
+                seen.add(id(obj))
+                if CodePatcher.functionFile(obj) == filename:
+                    functions.append(obj)
+                # follow the functions wrapped by decorators
+                wrapped = getattr(obj, '__wrapped__', None)
+                if wrapped is not None:
+                    objects.append(wrapped)
+            elif (isinstance(obj, ClassTypes) and
+                    getattr(obj, '__module__', None) == moduleName):
+                seen.add(id(obj))
+                objects.extend(vars(obj).values())
+
+    @staticmethod
+    def codeObjects(code):
+        """
+        Static method to get a code object and all code objects nested in it.
+
+        @param code code object to be inspected
+        @type code object
+        @return list of code objects
+        @rtype list of code object
+        """
+        codes = [code]
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                codes.extend(CodePatcher.codeObjects(const))
+        return codes
+
+    def patchFile(self, filename, lines):
+        """
+        Public method to patch the live functions of a file.
+
+        Functions of the file not containing a breakpoint line get their
+        original code object back.
+
+        @param filename fixed up file name
+        @type str
+        @param lines line numbers of the breakpoints of the file
+        @type set of int
+        @return flag indicating, that the source of the file was available
+        @rtype bool
+        """
+        functions = CodePatcher.liveFunctions(filename)
+        if not functions:
+            return True
+
+        originalCodes = {}
+        patchedCodes = {}
+        if lines:
+            source = "".join(linecache.getlines(filename))
+            if not source:
+                self.unpatchFunctions(functions)
+                return False
+
+            try:
+                tree = ast.parse(source, filename)
+                self.__collectCodes(
+                    compile(tree, filename, 'exec', 0, True), originalCodes)
+                self.__insertHooks(tree, set(lines))
+                self.__collectCodes(
+                    compile(tree, filename, 'exec', 0, True), patchedCodes)
+            except (SyntaxError, ValueError, TypeError):
+                self.unpatchFunctions(functions)
+                return False
+
+        for func in functions:
+            code = self.__originalCode.get(func, func.__code__)
+            patchedCode = self.__matchCode(code, originalCodes, patchedCodes)
+            if patchedCode is None or patchedCode == code:
+                # no breakpoint in it or the source was changed
+                self.unpatchFunctions([func])
+            elif func.__code__ is not patchedCode:
+                self.__originalCode[func] = code
+                func.__code__ = patchedCode
+
+        return True
+
+    def unpatchFunctions(self, functions=None):
+        """
+        Public method to restore the original code of patched functions.
+
+        @param functions list of functions to be restored or None for all
+        @type list of function
+        """
+        if functions is None:
+            functions = list(self.__originalCode.keys())
+
+        for func in functions:
+            code = self.__originalCode.pop(func, None)
+            if code is not None:
+                func.__code__ = code
+
+    def __collectCodes(self, code, codes):
+        """
+        Private method to collect the code objects of a compiled module.
+
+        @param code code object of the module
+        @type code object
+        @param codes dictionary to store the code objects into, indexed by
+            qualified name and first line number, code objects with the same
+            key are kept in the order they are found in
+        @type dict
+        """
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                codes.setdefault(self.__codeKey(const), []).append(const)
+                self.__collectCodes(const, codes)
+
+    def __codeKey(self, code):
+        """
+        Private method to get the key of a code object.
+
+        Lambdas and comprehensions of the same line and functions defined
+        again share their key, they are told apart by comparing the code
+        objects.
+
+        @param code code object
+        @type code object
+        @return qualified name (name before Python 3.11) and first line number
+        @rtype tuple of (str, int)
+        """
+        return (getattr(code, 'co_qualname', code.co_name),
+                code.co_firstlineno)
+
+    def __matchCode(self, code, originalCodes, patchedCodes):
+        """
+        Private method to get the patched code object belonging to a live one.
+
+        @param code original code object of a live function
+        @type code object
+        @param originalCodes code objects of the unpatched source as
+            collected by __collectCodes
+        @type dict
+        @param patchedCodes code objects of the patched source as
+            collected by __collectCodes
+        @type dict
+        @return patched code object or None, if the source of the code object
+            was changed or it doesn't contain a breakpoint
+        @rtype code object
+        """
+        key = self.__codeKey(code)
+        for index, originalCode in enumerate(originalCodes.get(key, [])):
+            if originalCode == code:
+                # inserting hook statements doesn't change the nesting of
+                # the code objects
+                return patchedCodes[key][index]
+
+        return None
+
+    def __insertHooks(self, tree, lines):
+        """
+        Private method to insert the hook call in front of the statements
+        carrying a breakpoint.
+
+        @param tree syntax tree of the module
+        @type ast.Module
+        @param lines line numbers of the breakpoints
+        @type set of int
+        """
+        for node in ast.walk(tree):
+            for field in ('body', 'orelse', 'finalbody'):
+                statements = getattr(node, field, None)
+                if not isinstance(statements, list):
+                    continue
+
+                patchedStatements = []
+                for statement in statements:
+                    lineno = getattr(statement, 'lineno', None)
+                    if lineno in lines:
+                        # only the first statement of a line gets a hook
+                        lines.discard(lineno)
+                        patchedStatements.append(self.__hookNode(statement))
+                    patchedStatements.append(statement)
+                setattr(node, field, patchedStatements)
+
+    def __hookNode(self, statement):
+        """
+        Private method to create the hook call statement.
+
+        @param statement statement the hook is inserted in front of
+        @type ast.stmt
+        @return hook call statement located at the given statement
+        @rtype ast.Expr
+        """
+        hook = ast.parse(HookStatement).body[0]
+        for node in ast.walk(hook):
+            for attribute in ('lineno', 'col_offset', 'end_lineno',
+                              'end_col_offset'):
+                if hasattr(statement, attribute):
+                    setattr(node, attribute, getattr(statement, attribute))
+        return hook
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the registry of the command handlers of the debug
+clients.
+
+The module doesn't depend on any other module of the debug clients, so that
+the eric6 debug client and the legacy debug client can share it.
+"""
+
+import time
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+class CommandDispatcher(object):
+    """
+    Class implementing a registry mapping command names to their handlers.
+
+    Subclasses of the debug clients and plugins may register additional
+    commands or replace the handler of an existing one. The number of calls
+    and the time spent in each command are counted. The time of a command
+    includes the time of all commands handled while it is running, e.g. the
+    time of a command running the debugged program includes all commands
+    handled until the program has terminated.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.__handlers = {}
+        # number of calls, total time and maximum time indexed by command
+        self.__counters = {}
+
+    def register(self, command, handler):
+        """
+        Public method to register the handler of a command.
+
+        An already registered handler of the command is replaced.
+
+        @param command name of the command
+        @type str
+        @param handler function handling the command, it is called with the
+            arguments passed to dispatch()
+        @type function
+        """
+        self.__handlers[command] = handler
+
+    def unregister(self, command):
+        """
+        Public method to remove the handler of a command.
+
+        @param command name of the command
+        @type str
+        """
+        self.__handlers.pop(command, None)
+
+    def handler(self, command):
+        """
+        Public method to get the handler of a command.
+
+        @param command name of the command
+        @type str
+        @return handler of the command or None, if it isn't registered
+        @rtype function
+        """
+        return self.__handlers.get(command)
+
+    def commands(self):
+        """
+        Public method to get the names of the registered commands.
+
+        @return sorted list of command names
+        @rtype list of str
+        """
+        return sorted(self.__handlers)
+
+    def dispatch(self, command, *args):
+        """
+        Public method to call the handler of a command.
+
+        @param command name of the command
+        @type str
+        @param args arguments passed to the handler
+        @type tuple
+        @return flag indicating a registered command
+        @rtype bool
+        """
+        try:
+            handler = self.__handlers[command]
+        except KeyError:
+            return False
+
+        start = Timer()
+        try:
+            handler(*args)
+        finally:
+            duration = Timer() - start
+            try:
+                counter = self.__counters[command]
+            except KeyError:
+                counter = self.__counters[command] = [0, 0.0, 0.0]
+            counter[0] += 1
+            counter[1] += duration
+            if duration > counter[2]:
+                counter[2] = duration
+        return True
+
+    def statistics(self):
+        """
+        Public method to get the counters of the handled commands.
+
+        @return dictionary with the number of calls ("calls"), the total
+            time ("time") and the maximum time ("max") in seconds indexed by
+            the command name
+        @rtype dict
+        """
+        return dict(
+            (command, {"calls": calls, "time": total, "max": maximum})
+            for command, (calls, total, maximum) in self.__counters.items()
+        )
+
+    def resetStatistics(self):
+        """
+        Public method to reset the counters of the handled commands.
+        """
+        self.__counters = {}
+
+#
+# eflag: noqa = M702
@@ -7,7 +7,6 @@
 Module implementing a TestResult derivative for the eric6 debugger.
 """
 
-import select
 from unittest import TestResult
 
 
@@ -123,11 +122,7 @@ class DCTestResult(TestResult):
         self.__dbgClient.sendJsonCommand("ResponseUTStopTest", {})
         
         # ensure that pending input is processed
-        rrdy, wrdy, xrdy = select.select(
-            [self.__dbgClient.readstream], [], [], 0.01)
-
-        if self.__dbgClient.readstream in rrdy:
-            self.__dbgClient.readReady(self.__dbgClient.readstream)
+        self.__dbgClient.eventPoll()
 
 #
 # eflag: noqa = M702
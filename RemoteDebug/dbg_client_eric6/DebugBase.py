@@ -13,22 +13,24 @@ import types
 import atexit
 import inspect
 import ctypes
-import time
 from inspect import CO_GENERATOR
 
 from .BreakpointWatch import Breakpoint, Watch
+from .CommandDispatcher import CommandDispatcher
 
 if sys.version_info[0] == 2:
-    import thread as _thread
     from inspect import getargvalues, formatargvalues
 else:
-    import _thread
     from .DebugUtilities import getargvalues, formatargvalues
     unicode = str
     basestring = str
 
 gRecursionLimit = 64
 
+# frames of generators and coroutines return on every yield and await
+# (CO_GENERATOR, CO_COROUTINE, CO_ITERABLE_COROUTINE, CO_ASYNC_GENERATOR)
+SuspendableCodeFlags = CO_GENERATOR | 0x80 | 0x100 | 0x200
+
 
 def printerr(s):
     """
@@ -68,6 +70,9 @@ class DebugBase(object):
     
     # Stop all timers, when greenlets are used
     pollTimerEnabled = True
+    
+    # raised by the command reader of the client for a waiting command
+    eventPollFlag = False
 
     def __init__(self, dbgClient):
         """
@@ -102,10 +107,6 @@ class DebugBase(object):
         self.__recursionDepth = -1
         self.setRecursionDepth(inspect.currentframe())
         
-        # background task to periodicaly check for client interactions
-        self.eventPollFlag = False
-        self.timer = _thread.start_new_thread(self.__eventPollTimer, ())
-        
         # provide a hook to perform a hard breakpoint
         # Use it like this:
         # if hasattr(sys, 'breakpoint): sys.breakpoint()
@@ -113,16 +114,6 @@ class DebugBase(object):
         if sys.version_info[:2] >= (3, 7):
             sys.breakpointhook = self.set_trace
 
-    def __eventPollTimer(self):
-        """
-        Private method to set a flag every 0.5 s to check for new messages.
-        """
-        while DebugBase.pollTimerEnabled:
-            time.sleep(0.5)
-            self.eventPollFlag = True
-        
-        self.eventPollFlag = False
-    
     def getCurrentFrame(self):
         """
         Public method to return the current frame.
@@ -271,7 +262,13 @@ class DebugBase(object):
         @param toFrame destination frame
         @type frame object
         """
-        if not self.__skipFrame(fromFrame) and not self.__skipFrame(toFrame):
+        if self.__skipFrame(fromFrame) or self.__skipFrame(toFrame):
+            return
+        
+        recorder = self._dbgClient.callTraceRecorder
+        if recorder is not None:
+            recorder.record(event, fromFrame, toFrame)
+        else:
             fromInfo = {
                 "filename": self._dbgClient.absPath(
                     self.fix_frame_filename(fromFrame)),
@@ -307,7 +304,6 @@ class DebugBase(object):
         # give the client a chance to push through new break points.
         if self.eventPollFlag:
             self._dbgClient.eventPoll()
-            self.eventPollFlag = False
             
             if self.quitting:
                 raise SystemExit
@@ -324,11 +320,15 @@ class DebugBase(object):
         
         if event == 'call':
             if (self.stop_here(frame) or
-                    self.__checkBreakInFrame(frame) or
-                    Watch.watches != []):
+                    self.__breakLinesInFrame(frame) or
+                    Watch.getWatches(frame.f_code)):
                 return self.trace_dispatch
             else:
                 # No need to trace this function
+                if (self._dbgClient.detached and
+                        not self._dbgClient.tracerInstalled):
+                    # the tracer was removed in detached mode
+                    sys.settrace(None)
                 return None
         
         if event == 'return':
@@ -336,25 +336,13 @@ class DebugBase(object):
                 # Only true if we didn't stopped in this frame, because it's
                 # belonging to the eric debugger.
                 self._set_stopinfo(None, frame.f_back)
+            if (Watch.watches != [] and
+                    not frame.f_code.co_flags & SuspendableCodeFlags):
+                Watch.releaseFrame(frame)
             return None
         
         if event == 'exception':
-            if not self.__skipFrame(frame):
-                # When stepping with next/until/return in a generator frame,
-                # skip the internal StopIteration exception (with no traceback)
-                # triggered by a subiterator run with the 'yield from'
-                # statement.
-                if not (frame.f_code.co_flags & CO_GENERATOR and
-                        arg[0] is StopIteration and arg[2] is None):
-                    self.user_exception(arg)
-            # Stop at the StopIteration or GeneratorExit exception when the
-            # user has set stopframe in a generator by issuing a return
-            # command, or a next/until command at the last statement in the
-            # generator before the exception.
-            elif (self.stopframe and frame is not self.stopframe and
-                    self.stopframe.f_code.co_flags & CO_GENERATOR and
-                    arg[0] in (StopIteration, GeneratorExit)):
-                self.user_exception(arg)
+            self.dispatch_exception(frame, arg)
             return None
 
         if event == 'c_call':
@@ -369,6 +357,60 @@ class DebugBase(object):
               repr(event))
         return self.trace_dispatch
 
+    def dispatch_exception(self, frame, arg):
+        """
+        Public method reimplemented from bdb.py to handle an exception event.
+        
+        @param frame The current stack frame
+        @type frame object
+        @param arg tuple of exception type, exception value and traceback
+        @type tuple
+        """
+        if not self.__skipFrame(frame):
+            # When stepping with next/until/return in a generator frame,
+            # skip the internal StopIteration exception (with no traceback)
+            # triggered by a subiterator run with the 'yield from'
+            # statement.
+            if not (frame.f_code.co_flags & CO_GENERATOR and
+                    arg[0] is StopIteration and arg[2] is None):
+                self.user_exception(arg)
+        # Stop at the StopIteration or GeneratorExit exception when the
+        # user has set stopframe in a generator by issuing a return
+        # command, or a next/until command at the last statement in the
+        # generator before the exception.
+        elif (self.stopframe and frame is not self.stopframe and
+                self.stopframe.f_code.co_flags & CO_GENERATOR and
+                arg[0] in (StopIteration, GeneratorExit)):
+            self.user_exception(arg)
+    
+    def isStepping(self):
+        """
+        Public method to check, if the thread is stepping through the code.
+        
+        @return flag indicating a stepping thread
+        @rtype bool
+        """
+        return (self.stop_everywhere or self.stopframe is not None or
+                self.returnframe is not None)
+    
+    def startTracing(self):
+        """
+        Public method to install the trace function for the current thread.
+        
+        If the sys.monitoring backend is running, the settrace based trace
+        function is only needed while stepping. In detached mode it isn't
+        installed before it is needed.
+        """
+        client = self._dbgClient
+        if client.detached and not client.tracerInstalled:
+            if not self.isStepping():
+                return
+            client.updateTracer()
+        
+        monitor = client.monitor
+        if monitor is None or not monitor.start() or self.isStepping():
+            sys.settrace(self.trace_dispatch)
+    
     def set_trace(self, frame=None):
         """
         Public method to start debugging from 'frame'.
@@ -383,10 +425,11 @@ class DebugBase(object):
         if frame is None:
             frame = sys._getframe().f_back  # Skip set_trace method
         
+        # the command handlers are called by the command dispatcher
         if sys.version_info[0] == 2:
-            stopOnHandleCommand = self._dbgClient.handleJsonCommand.func_code
+            stopOnHandleCommand = CommandDispatcher.dispatch.im_func.func_code
         else:
-            stopOnHandleCommand = self._dbgClient.handleJsonCommand.__code__
+            stopOnHandleCommand = CommandDispatcher.dispatch.__code__
         
         frame.f_trace = self.trace_dispatch
         while frame.f_back is not None:
@@ -398,7 +441,7 @@ class DebugBase(object):
             frame = frame.f_back
         
         self.stop_everywhere = True
-        sys.settrace(self.trace_dispatch)
+        self.startTracing()
         sys.setprofile(self._dbgClient.callTraceEnabled)
     
     def bootstrap(self, target, args, kwargs):
@@ -418,7 +461,7 @@ class DebugBase(object):
         try:
             # Because in the initial run method the "base debug" function is
             # set up, it's also valid for the threads afterwards.
-            sys.settrace(self.trace_dispatch)
+            self.startTracing()
             
             target(*args, **kwargs)
         except Exception:
@@ -456,7 +499,7 @@ class DebugBase(object):
             # function has to be returned, which is called at every user code
             # function call. This is ensured by setting stop_everywhere.
             self.stop_everywhere = True
-            sys.settrace(self.trace_dispatch)
+            self.startTracing()
         
         try:
             exec(cmd, globalsDict, localsDict)
@@ -505,6 +548,10 @@ class DebugBase(object):
         if not self._dbgClient.debugging:
             sys.settrace(None)
             sys.setprofile(None)
+        elif (self._dbgClient.monitor is not None and
+                self._dbgClient.monitor.active and not self.isStepping()):
+            # breakpoints are handled by the sys.monitoring backend
+            sys.settrace(None)
 
     def set_step(self):
         """
@@ -555,6 +602,8 @@ class DebugBase(object):
         sys.setprofile(None)
         self.stopframe = None
         self.returnframe = None
+        if self._dbgClient.monitor is not None:
+            self._dbgClient.monitor.stop()
         for debugThread in self._dbgClient.threads.values():
             debugThread.quitting = True
     
@@ -597,51 +646,21 @@ class DebugBase(object):
             self._fnCache[fn] = fixedName
             return fixedName
 
-    def __checkBreakInFrame(self, frame):
+    def __breakLinesInFrame(self, frame):
         """
-        Private method to check if the function / method has a line number
-        which is a breakpoint.
+        Private method to get the breakpoint lines of the function / method
+        executed by a frame.
         
         @param frame the frame object
         @type frame object
-        @return Flag indicating a function / method with breakpoint
-        @rtype bool
+        @return line numbers of the breakpoints inside the frame's code
+        @rtype frozenset of int
         """
         try:
-            return Breakpoint.breakInFrameCache[
-                frame.f_globals.get('__file__'),
-                frame.f_code.co_firstlineno]
+            return Breakpoint.breakInCode[id(frame.f_code)]
         except KeyError:
-            filename = self.fix_frame_filename(frame)
-            if filename not in Breakpoint.breakInFile:
-                Breakpoint.breakInFrameCache[
-                    frame.f_globals.get('__file__'),
-                    frame.f_code.co_firstlineno] = False
-                return False
-            lineNo = frame.f_code.co_firstlineno
-            lineNumbers = [lineNo]
-            
-            if sys.version_info[0] == 2:
-                co_lnotab = map(ord, frame.f_code.co_lnotab[1::2])
-            else:
-                co_lnotab = frame.f_code.co_lnotab[1::2]
-            
-            # No need to handle special case if a lot of lines between
-            # (e.g. closure), because the additional lines won't cause a bp
-            for co_lno in co_lnotab:
-                lineNo += co_lno
-                lineNumbers.append(lineNo)
-            
-            for bp in Breakpoint.breakInFile[filename]:
-                if bp in lineNumbers:
-                    Breakpoint.breakInFrameCache[
-                        frame.f_globals.get('__file__'),
-                        frame.f_code.co_firstlineno] = True
-                    return True
-            Breakpoint.breakInFrameCache[
-                frame.f_globals.get('__file__'),
-                frame.f_code.co_firstlineno] = False
-            return False
+            return Breakpoint.indexCode(
+                frame.f_code, self.fix_frame_filename(frame))
     
     def break_here(self, frame):
         """
@@ -655,18 +674,20 @@ class DebugBase(object):
         @return flag indicating the break status
         @rtype bool
         """
-        filename = self.fix_frame_filename(frame)
-        if (filename, frame.f_lineno) in Breakpoint.breaks:
-            bp, flag = Breakpoint.effectiveBreak(
-                filename, frame.f_lineno, frame)
-            if bp:
-                # flag says ok to delete temp. bp
-                if flag and bp.temporary:
-                    self.__do_clearBreak(filename, frame.f_lineno)
-                return True
+        if frame.f_lineno in self.__breakLinesInFrame(frame):
+            filename = self.fix_frame_filename(frame)
+            if (filename, frame.f_lineno) in Breakpoint.breaks:
+                bp, flag = Breakpoint.effectiveBreak(
+                    filename, frame.f_lineno, frame)
+                if bp:
+                    # flag says ok to delete temp. bp
+                    if flag and bp.temporary:
+                        self.__do_clearBreak(filename, frame.f_lineno)
+                    return True
         
-        if Watch.watches != []:
-            bp, flag = Watch.effectiveWatch(frame)
+        watches = Watch.getWatches(frame.f_code)
+        if watches:
+            bp, flag = Watch.effectiveWatch(frame, watches)
             if bp:
                 # flag says ok to delete temp. watch
                 if flag and bp.temporary:
@@ -906,7 +927,6 @@ class DebugBase(object):
         self.isBroken = False
         stop_everywhere = self.stop_everywhere
         self.stop_everywhere = False
-        self.eventPollFlag = False
         self._dbgClient.unlockClient()
         self.stop_everywhere = stop_everywhere
     
@@ -996,12 +1016,13 @@ class DebugBase(object):
         @return flag indicating whether the debugger should stop here
         @rtype bool
         """
-        if self.__skipFrame(frame):
+        # check the cheap conditions first, this is called for every line
+        if not (self.stop_everywhere or
+                frame is self.stopframe or
+                frame is self.returnframe):
             return False
         
-        return (self.stop_everywhere or
-                frame is self.stopframe or
-                frame is self.returnframe)
+        return not self.__skipFrame(frame)
 
     def tracePythonLibs(self, enable):
         """
@@ -1023,6 +1044,18 @@ class DebugBase(object):
         
         self.pathsToSkip = tuple(set(pathsToSkip))
 
+    def skipFrame(self, frame):
+        """
+        Public method to check, if a frame belongs to a file, which is not
+        traced.
+        
+        @param frame the frame object
+        @type frame object
+        @return flag indicating whether the debugger should skip this frame
+        @rtype bool
+        """
+        return self.__skipFrame(frame)
+    
     def __skipFrame(self, frame):
         """
         Private method to filter out debugger files.
@@ -9,27 +9,72 @@ Module implementing a debug client base class.
 
 import sys
 import socket
-import select
 import codeop
 import codecs
 import traceback
 import os
 import json
-import imp
+import types
 import re
 import atexit
 import signal
 import time
+import ctypes
+import base64
+import numbers
 
+if sys.version_info[0] == 2:
+    import thread as _thread
+    import Queue as queue
+else:
+    import _thread
+    import queue
+
+try:
+    from imp import load_source
+except ImportError:
+    # the imp module was removed in Python 3.12
+    from importlib.machinery import SourceFileLoader
+
+    def load_source(name, pathname):
+        """
+        Function to load a module from a source file.
+        
+        @param name name of the module
+        @type str
+        @param pathname file name of the module
+        @type str
+        @return loaded module
+        @rtype module
+        """
+        module = types.ModuleType(name)
+        module.__file__ = pathname
+        sys.modules[name] = module
+        SourceFileLoader(name, pathname).exec_module(module)
+        return module
 
 from . import DebugClientCapabilities
 from . import DebugVariables
+from .DebugBase import DebugBase
 from .DebugBase import setRecursionLimit, printerr   # __IGNORE_WARNING__
-from .AsyncFile import AsyncFile, AsyncPendingWrite
-from .DebugConfig import ConfigVarTypeStrings
+from .AsyncFile import (
+    AsyncFile, AsyncPendingWrite, CompressionLevel, CompressionThreshold
+)
 from .FlexCompleter import Completer
-from .DebugUtilities import prepareJsonCommand
+from .DebugUtilities import (
+    prepareJsonCommand, prepareBinaryCommand, prepareBufferCommand,
+    CompressionAvailable
+)
 from .BreakpointWatch import Breakpoint, Watch
+from .DebugMonitor import DebugMonitor, MonitoringAvailable
+from .BinaryCodec import unpackMessage
+from .CommandDispatcher import CommandDispatcher
+from .VariableSnapshot import VariableSnapshots
+from .ValueFormatter import ValueFormatter
+from .BufferTransfer import bufferWindow
+from .CallTrace import (
+    CallTraceRecorder, BatchSize, FlushInterval, SampleInterval
+)
 
 if sys.version_info[0] == 2:
     from inspect import getargvalues, formatargvalues
@@ -39,6 +84,10 @@ else:
 
 DebugClientInstance = None
 
+# the thread hooks replace start_new_thread, but the command reader must not
+# be debugged
+DebugClientOrigStartNewThread = _thread.start_new_thread
+
 ###############################################################################
 
 
@@ -194,7 +243,7 @@ class DebugClientBase(object):
         self.framenr = 0
         
         # The context to run the debugged program in.
-        self.debugMod = imp.new_module('__main__')
+        self.debugMod = types.ModuleType('__main__')
         self.debugMod.__dict__['__builtins__'] = __builtins__
 
         # The list of complete lines to execute.
@@ -219,7 +268,36 @@ class DebugClientBase(object):
         self.errorstream = None
         self.pollingDisabled = False
         
+        # commands read by the command reader thread
+        self.commandQueue = queue.Queue()
+        self.commandReaderId = None
+        
         self.callTraceEnabled = None
+        # recorder of the compact call trace modes
+        self.callTraceRecorder = None
+        
+        # use the sys.monitoring trace backend, if it is available
+        if (MonitoringAvailable and
+                os.getenv('ERICTRACEBACKEND', '') != 'settrace'):
+            self.monitor = DebugMonitor(self)
+        else:
+            self.monitor = None
+        self.eventLoopActive = False
+        
+        # detached mode installs the trace function only when needed
+        self.detached = False
+        self.tracerInstalled = False
+        self.__pendingCalls = []
+        self.__pendingCallback = None
+        
+        # last variables sent of the frames, whose changes are requested
+        self.variableSnapshots = VariableSnapshots()
+        
+        # handlers of the commands sent by the IDE
+        self.commandDispatcher = CommandDispatcher()
+        self.__registerCommands()
+        # ids of the requests being handled indexed by the thread id
+        self.__requestIds = {}
         
         self.variant = 'You should not see this'
         
@@ -306,9 +384,9 @@ class DebugClientBase(object):
         # make sure we close down our end of the socket
         # might be overkill as normally stdin, stdout and stderr
         # SHOULD be closed on exit, but it does not hurt to do it here
-        self.readstream.close(True)
         self.writestream.close(True)
         self.errorstream.close(True)
+        self.readstream.close(True)
 
         if terminate:
             # Ok, go away.
@@ -357,686 +435,1142 @@ class DebugClientBase(object):
     
     def handleJsonCommand(self, jsonStr):
         """
-        Public method to handle a command serialized as a JSON string.
+        Public method to handle a command serialized as a JSON string or
+        using the binary encoding.
         
         @param jsonStr string containing the command received from the IDE
-        @type str
+        @type str or bytes
         """
 ##        printerr(jsonStr)          ##debug
         
         try:
-            commandDict = json.loads(jsonStr.strip())
+            if isinstance(jsonStr, bytes):
+                commandDict = unpackMessage(jsonStr)
+            else:
+                commandDict = json.loads(jsonStr.strip())
         except (TypeError, ValueError) as err:
-            printerr("Error handling command: " + jsonStr)
+            printerr("Error handling command: " + repr(jsonStr))
             printerr(str(err))
             return
         
-        method = commandDict["method"]
-        params = commandDict["params"]
+        self.__dispatchCommand(commandDict["method"], commandDict["params"],
+                               commandDict.get("id"))
+    
+    def __dispatchCommand(self, method, params, requestId=None):
+        """
+        Private method to pass a command to its handler.
+        
+        Commands without a registered handler are ignored. All messages
+        sent by the thread handling a command with an id carry this id, so
+        that the IDE may send further requests before it got the responses.
+        
+        @param method name of the command
+        @type str
+        @param params parameters of the command
+        @type dict
+        @param requestId id of the request given by the IDE
+        @type int or str
+        """
         if "filename" in params and sys.version_info[0] == 2:
             params["filename"] = params["filename"].encode(
                 sys.getfilesystemencoding())
         
-        if method == "RequestVariables":
-            self.__dumpVariables(
-                params["frameNumber"], params["scope"], params["filters"],
-                params["maxSize"])
-        
-        elif method == "RequestVariable":
-            self.__dumpVariable(
-                params["variable"], params["frameNumber"],
-                params["scope"], params["filters"],
-                params["maxSize"])
-        
-        elif method == "RequestThreadList":
-            self.dumpThreadList()
-        
-        elif method == "RequestThreadSet":
-            if params["threadID"] in self.threads:
-                self.setCurrentThread(params["threadID"])
-                self.sendJsonCommand("ResponseThreadSet", {})
-                stack = self.currentThread.getStack()
-                self.sendJsonCommand("ResponseStack", {
-                    "stack": stack,
-                })
-        
-        elif method == "RequestCapabilities":
-            clientType = "Python2" if sys.version_info[0] == 2 else "Python3"
-            self.sendJsonCommand("ResponseCapabilities", {
-                "capabilities": self.__clientCapabilities(),
-                "clientType": clientType
-            })
-        
-        elif method == "RequestBanner":
-            self.sendJsonCommand("ResponseBanner", {
-                "version": "Python {0}".format(sys.version),
-                "platform": socket.gethostname(),
-                "dbgclient": self.variant,
-            })
-        
-        elif method == "RequestSetFilter":
-            self.__generateFilterObjects(params["scope"], params["filter"])
-        
-        elif method == "RequestCallTrace":
-            if params["enable"]:
-                callTraceEnabled = self.profile
-            else:
-                callTraceEnabled = None
-            
-            if self.debugging:
-                sys.setprofile(callTraceEnabled)
-            else:
-                # remember for later
-                self.callTraceEnabled = callTraceEnabled
-        
-        elif method == "RequestEnvironment":
-            for key, value in params["environment"].items():
-                if key.endswith("+"):
-                    if key[:-1] in os.environ:
-                        os.environ[key[:-1]] += value
-                    else:
-                        os.environ[key[:-1]] = value
-                else:
-                    os.environ[key] = value
-        
-        elif method == "RequestLoad":
-            self._fncache = {}
-            self.dircache = []
-            sys.argv = []
-            self.__setCoding(params["filename"])
-            sys.argv.append(params["filename"])
-            sys.argv.extend(params["argv"])
-            sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-            if params["workdir"] == '':
-                os.chdir(sys.path[1])
-            else:
-                os.chdir(params["workdir"])
-            
-            self.running = sys.argv[0]
-            self.debugging = True
-            
-            self.fork_auto = params["autofork"]
-            self.fork_child = params["forkChild"]
-            
-            self.threads.clear()
-            self.attachThread(mainThread=True)
-            
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            # clear all old breakpoints, they'll get set after we have
-            # started
-            Breakpoint.clear_all_breaks()
-            Watch.clear_all_watches()
-            
-            self.mainThread.tracePythonLibs(params["traceInterpreter"])
-            
-            # This will eventually enter a local event loop.
-            self.debugMod.__dict__['__file__'] = self.running
-            sys.modules['__main__'] = self.debugMod
-            code = self.__compileFileSource(self.running)
-            if code:
-                sys.setprofile(self.callTraceEnabled)
-                self.mainThread.run(code, self.debugMod.__dict__, debug=True)
-
-        elif method == "RequestRun":
-            sys.argv = []
-            self.__setCoding(params["filename"])
-            sys.argv.append(params["filename"])
-            sys.argv.extend(params["argv"])
-            sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-            if params["workdir"] == '':
-                os.chdir(sys.path[1])
-            else:
-                os.chdir(params["workdir"])
-
-            self.running = sys.argv[0]
-            self.botframe = None
-            
-            self.fork_auto = params["autofork"]
-            self.fork_child = params["forkChild"]
-            
-            self.threads.clear()
-            self.attachThread(mainThread=True)
-            
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            self.mainThread.tracePythonLibs(False)
-            
-            self.debugMod.__dict__['__file__'] = sys.argv[0]
-            sys.modules['__main__'] = self.debugMod
-            res = 0
-            code = self.__compileFileSource(self.running)
-            if code:
-                self.mainThread.run(code, self.debugMod.__dict__, debug=False)
-
-        elif method == "RequestCoverage":
-            from coverage import coverage
-            sys.argv = []
-            self.__setCoding(params["filename"])
-            sys.argv.append(params["filename"])
-            sys.argv.extend(params["argv"])
-            sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-            if params["workdir"] == '':
-                os.chdir(sys.path[1])
-            else:
-                os.chdir(params["workdir"])
-            
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            # generate a coverage object
-            self.cover = coverage(
-                auto_data=True,
-                data_file="{0}.coverage".format(
-                    os.path.splitext(sys.argv[0])[0]))
-            
-            if params["erase"]:
-                self.cover.erase()
-            sys.modules['__main__'] = self.debugMod
-            self.debugMod.__dict__['__file__'] = sys.argv[0]
-            code = self.__compileFileSource(sys.argv[0])
-            if code:
-                self.running = sys.argv[0]
-                self.cover.start()
-                self.mainThread.run(code, self.debugMod.__dict__, debug=False)
-                self.cover.stop()
-                self.cover.save()
-        
-        elif method == "RequestProfile":
-            sys.setprofile(None)
-            import PyProfile
-            sys.argv = []
-            self.__setCoding(params["filename"])
-            sys.argv.append(params["filename"])
-            sys.argv.extend(params["argv"])
-            sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
-            if params["workdir"] == '':
-                os.chdir(sys.path[1])
-            else:
-                os.chdir(params["workdir"])
-
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            # generate a profile object
-            self.prof = PyProfile.PyProfile(sys.argv[0])
-            
-            if params["erase"]:
-                self.prof.erase()
-            self.debugMod.__dict__['__file__'] = sys.argv[0]
-            sys.modules['__main__'] = self.debugMod
-            script = ''
-            if sys.version_info[0] == 2:
-                script = 'execfile({0!r})'.format(sys.argv[0])
-            else:
-                with codecs.open(sys.argv[0], encoding=self.__coding) as fp:
-                    script = fp.read()
-                if script and not script.endswith('\n'):
-                    script += '\n'
-            
-            if script:
-                self.running = sys.argv[0]
-                res = 0
-                try:
-                    self.prof.run(script)
-                    atexit._run_exitfuncs()
-                except SystemExit as exc:
-                    res = exc.code
-                    atexit._run_exitfuncs()
-                except Exception:
-                    excinfo = sys.exc_info()
-                    self.__unhandled_exception(*excinfo)
-                
-                self.prof.save()
-                self.progTerminated(res)
-        
-        elif method == "ExecuteStatement":
-            if self.buffer:
-                self.buffer = self.buffer + '\n' + params["statement"]
-            else:
-                self.buffer = params["statement"]
-
-            try:
-                code = self.compile_command(self.buffer, self.readstream.name)
-            except (OverflowError, SyntaxError, ValueError):
-                # Report the exception
-                sys.last_type, sys.last_value, sys.last_traceback = \
-                    sys.exc_info()
-                self.sendJsonCommand("ClientOutput", {
-                    "text": "".join(traceback.format_exception_only(
-                        sys.last_type, sys.last_value))
-                })
-                self.buffer = ''
-            else:
-                if code is None:
-                    self.sendJsonCommand("ResponseContinue", {})
-                    return
-                else:
-                    self.buffer = ''
-
-                    try:
-                        if self.running is None:
-                            exec(code, self.debugMod.__dict__)
-                        else:
-                            if self.currentThread is None:
-                                # program has terminated
-                                self.running = None
-                                _globals = self.debugMod.__dict__
-                                _locals = _globals
-                            else:
-                                cf = self.currentThread.getCurrentFrame()
-                                # program has terminated
-                                if cf is None:
-                                    self.running = None
-                                    _globals = self.debugMod.__dict__
-                                    _locals = _globals
-                                else:
-                                    frmnr = self.framenr
-                                    while cf is not None and frmnr > 0:
-                                        cf = cf.f_back
-                                        frmnr -= 1
-                                    _globals = cf.f_globals
-                                    _locals = \
-                                        self.currentThread.getFrameLocals(
-                                            self.framenr)
-                            # reset sys.stdout to our redirector
-                            # (unconditionally)
-                            if "sys" in _globals:
-                                __stdout = _globals["sys"].stdout
-                                _globals["sys"].stdout = self.writestream
-                                exec(code, _globals, _locals)
-                                _globals["sys"].stdout = __stdout
-                            elif "sys" in _locals:
-                                __stdout = _locals["sys"].stdout
-                                _locals["sys"].stdout = self.writestream
-                                exec(code, _globals, _locals)
-                                _locals["sys"].stdout = __stdout
-                            else:
-                                exec(code, _globals, _locals)
-                            
-                            self.currentThread.storeFrameLocals(self.framenr)
-                    except SystemExit as exc:
-                        self.progTerminated(exc.code)
-                    except Exception:
-                        # Report the exception and the traceback
-                        tlist = []
-                        try:
-                            exc_type, exc_value, exc_tb = sys.exc_info()
-                            sys.last_type = exc_type
-                            sys.last_value = exc_value
-                            sys.last_traceback = exc_tb
-                            tblist = traceback.extract_tb(exc_tb)
-                            del tblist[:1]
-                            tlist = traceback.format_list(tblist)
-                            if tlist:
-                                tlist.insert(
-                                    0, "Traceback (innermost last):\n")
-                                tlist.extend(traceback.format_exception_only(
-                                    exc_type, exc_value))
-                        finally:
-                            tblist = exc_tb = None
-
-                        self.sendJsonCommand("ClientOutput", {
-                            "text": "".join(tlist)
-                        })
-            
-            self.sendJsonCommand("ResponseOK", {})
-        
-        elif method == "RequestStep":
-            self.currentThreadExec.step(True)
-            self.eventExit = True
-
-        elif method == "RequestStepOver":
-            self.currentThreadExec.step(False)
-            self.eventExit = True
-        
-        elif method == "RequestStepOut":
-            self.currentThreadExec.stepOut()
-            self.eventExit = True
-        
-        elif method == "RequestStepQuit":
-            if self.passive:
-                self.progTerminated(42)
-            else:
-                self.set_quit()
-                self.eventExit = True
-        
-        elif method == "RequestMoveIP":
-            newLine = params["newLine"]
-            self.currentThreadExec.move_instruction_pointer(newLine)
-        
-        elif method == "RequestContinue":
-            self.currentThreadExec.go(params["special"])
-            self.eventExit = True
-        
-        elif method == "RawInput":
-            # If we are handling raw mode input then break out of the current
-            # event loop.
-            self.rawLine = params["input"]
-            self.eventExit = True
-        
-        elif method == "RequestBreakpoint":
-            if params["setBreakpoint"]:
-                if params["condition"] in ['None', '']:
-                    cond = None
-                elif params["condition"] is not None:
-                    try:
-                        cond = compile(params["condition"], '<string>', 'eval')
-                    except SyntaxError:
-                        self.sendJsonCommand("ResponseBPConditionError", {
-                            "filename": params["filename"],
-                            "line": params["line"],
-                        })
-                        return
-                else:
-                    cond = None
-                
-                Breakpoint(
-                    params["filename"], params["line"], params["temporary"],
-                    cond)
-            else:
-                Breakpoint.clear_break(params["filename"], params["line"])
-        
-        elif method == "RequestBreakpointEnable":
-            bp = Breakpoint.get_break(params["filename"], params["line"])
-            if bp is not None:
-                if params["enable"]:
-                    bp.enable()
-                else:
-                    bp.disable()
-        
-        elif method == "RequestBreakpointIgnore":
-            bp = Breakpoint.get_break(params["filename"], params["line"])
-            if bp is not None:
-                bp.ignore = params["count"]
-        
-        elif method == "RequestWatch":
-            if params["setWatch"]:
-                if params["condition"].endswith(
-                        ('??created??', '??changed??')):
-                    compiledCond, flag = params["condition"].split()
-                else:
-                    compiledCond = params["condition"]
-                    flag = ''
-                
-                try:
-                    compiledCond = compile(compiledCond, '<string>', 'eval')
-                except SyntaxError:
-                    self.sendJsonCommand("ResponseWatchConditionError", {
-                        "condition": params["condition"],
-                    })
-                    return
-                Watch(
-                    params["condition"], compiledCond, flag,
-                    params["temporary"])
+        ident = _thread.get_ident()
+        previousId = self.__requestIds.get(ident)
+        if requestId is not None:
+            self.__requestIds[ident] = requestId
+        else:
+            self.__requestIds.pop(ident, None)
+        try:
+            self.commandDispatcher.dispatch(method, params)
+        finally:
+            if previousId is not None:
+                self.__requestIds[ident] = previousId
             else:
-                Watch.clear_watch(params["condition"])
-        
-        elif method == "RequestWatchEnable":
-            wp = Watch.get_watch(params["condition"])
-            if wp is not None:
-                if params["enable"]:
-                    wp.enable()
-                else:
-                    wp.disable()
-        
-        elif method == "RequestWatchIgnore":
-            wp = Watch.get_watch(params["condition"])
-            if wp is not None:
-                wp.ignore = params["count"]
-        
-        elif method == "RequestShutdown":
-            self.sessionClose()
-        
-        elif method == "RequestCompletion":
-            self.__completionList(params["text"])
+                self.__requestIds.pop(ident, None)
+    
+    def __registerCommands(self):
+        """
+        Private method to register the handlers of the commands sent by the
+        IDE.
+        """
+        for method, handler in (
+            ("RequestVariables", self.__handleRequestVariables),
+            ("RequestVariable", self.__handleRequestVariable),
+            ("RequestVariableTree", self.__handleRequestVariableTree),
+            ("RequestBuffer", self.__handleRequestBuffer),
+            ("RequestThreadList", self.__handleRequestThreadList),
+            ("RequestThreadSet", self.__handleRequestThreadSet),
+            ("RequestCapabilities", self.__handleRequestCapabilities),
+            ("RequestTransferStatistics",
+             self.__handleRequestTransferStatistics),
+            ("RequestCommandStatistics",
+             self.__handleRequestCommandStatistics),
+            ("RequestBanner", self.__handleRequestBanner),
+            ("RequestSetFilter", self.__handleRequestSetFilter),
+            ("RequestCallTrace", self.__handleRequestCallTrace),
+            ("RequestEnvironment", self.__handleRequestEnvironment),
+            ("RequestLoad", self.__handleRequestLoad),
+            ("RequestRun", self.__handleRequestRun),
+            ("RequestCoverage", self.__handleRequestCoverage),
+            ("RequestProfile", self.__handleRequestProfile),
+            ("ExecuteStatement", self.__handleExecuteStatement),
+            ("RequestStep", self.__handleRequestStep),
+            ("RequestStepOver", self.__handleRequestStepOver),
+            ("RequestStepOut", self.__handleRequestStepOut),
+            ("RequestStepQuit", self.__handleRequestStepQuit),
+            ("RequestMoveIP", self.__handleRequestMoveIP),
+            ("RequestContinue", self.__handleRequestContinue),
+            ("RawInput", self.__handleRawInput),
+            ("RequestBreakpoint", self.__handleRequestBreakpoint),
+            ("RequestBreakpointEnable", self.__handleRequestBreakpointEnable),
+            ("RequestBreakpointIgnore", self.__handleRequestBreakpointIgnore),
+            ("RequestBreakpoints", self.__handleRequestBreakpoints),
+            ("RequestWatch", self.__handleRequestWatch),
+            ("RequestWatchEnable", self.__handleRequestWatchEnable),
+            ("RequestWatchIgnore", self.__handleRequestWatchIgnore),
+            ("RequestWatches", self.__handleRequestWatches),
+            ("RequestShutdown", self.__handleRequestShutdown),
+            ("RequestCompletion", self.__handleRequestCompletion),
+            ("RequestUTDiscover", self.__handleRequestUTDiscover),
+            ("RequestUTPrepare", self.__handleRequestUTPrepare),
+            ("RequestUTRun", self.__handleRequestUTRun),
+            ("RequestUTStop", self.__handleRequestUTStop),
+            ("ResponseForkTo", self.__handleResponseForkTo),
+            ("RequestBatch", self.__handleRequestBatch),
+        ):
+            self.commandDispatcher.register(method, handler)
+    
+    def __handleRequestBatch(self, params):
+        """
+        Private method handling the RequestBatch command.
         
-        elif method == "RequestUTDiscover":
-            if params["syspath"]:
-                sys.path = params["syspath"] + sys.path
-            
-            discoveryStart = params["discoverystart"]
-            if not discoveryStart:
-                discoveryStart = params["workdir"]
-            
-            os.chdir(params["discoverystart"])
-            
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            try:
-                import unittest
-                testLoader = unittest.TestLoader()
-                test = testLoader.discover(discoveryStart)
-                if hasattr(testLoader, "errors") and \
-                   bool(testLoader.errors):
-                    self.sendJsonCommand("ResponseUTDiscover", {
-                        "testCasesList": [],
-                        "exception": "DiscoveryError",
-                        "message": "\n\n".join(testLoader.errors),
-                    })
-                else:
-                    testsList = self.__assembleTestCasesList(test,
-                                                             discoveryStart)
-                    self.sendJsonCommand("ResponseUTDiscover", {
-                        "testCasesList": testsList,
-                        "exception": "",
-                        "message": "",
-                    })
-            except Exception:
-                exc_type, exc_value, exc_tb = sys.exc_info()
-                self.sendJsonCommand("ResponseUTDiscover", {
-                    "testCasesList": [],
-                    "exception": exc_type.__name__,
-                    "message": str(exc_value),
-                })
+        The commands of the batch are handled in order, as if they were
+        received one after the other.
         
-        elif method == "RequestUTPrepare":
-            if params["syspath"]:
-                sys.path = params["syspath"] + sys.path
-            sys.path.insert(
-                0, os.path.dirname(os.path.abspath(params["filename"])))
-            if params["workdir"]:
-                os.chdir(params["workdir"])
-            else:
-                os.chdir(sys.path[0])
-            
-            # set the system exception handling function to ensure, that
-            # we report on all unhandled exceptions
-            sys.excepthook = self.__unhandled_exception
-            self.__interceptSignals()
-            
-            try:
-                import unittest
-                testLoader = unittest.TestLoader()
-                if params["discover"]:
-                    discoveryStart = params["discoverystart"]
-                    if not discoveryStart:
-                        discoveryStart = params["workdir"]
-                    if params["testcases"]:
-                        self.test = testLoader.loadTestsFromNames(
-                            params["testcases"])
-                    else:
-                        self.test = testLoader.discover(discoveryStart)
-                else:
-                    if params["filename"]:
-                        utModule = imp.load_source(
-                            params["testname"], params["filename"])
-                    else:
-                        utModule = None
-                    if params["failed"]:
-                        if utModule:
-                            failed = [t.split(".", 1)[1]
-                                      for t in params["failed"]]
-                        else:
-                            failed = params["failed"][:]
-                        self.test = testLoader.loadTestsFromNames(
-                            failed, utModule)
-                    else:
-                        self.test = testLoader.loadTestsFromName(
-                            params["testfunctionname"], utModule)
-            except Exception:
-                exc_type, exc_value, exc_tb = sys.exc_info()
-                self.sendJsonCommand("ResponseUTPrepared", {
-                    "count": 0,
-                    "exception": exc_type.__name__,
-                    "message": str(exc_value),
-                })
-                return
-            
-            # generate a coverage object
-            if params["coverage"]:
-                from coverage import coverage
-                self.cover = coverage(
-                    auto_data=True,
-                    data_file="{0}.coverage".format(
-                        os.path.splitext(params["coveragefile"])[0]))
-                if params["coverageerase"]:
-                    self.cover.erase()
-            else:
-                self.cover = None
-            
-            if params["debug"]:
-                Breakpoint.clear_all_breaks()
-                Watch.clear_all_watches()
-            
-            self.sendJsonCommand("ResponseUTPrepared", {
-                "count": self.test.countTestCases(),
-                "exception": "",
-                "message": "",
-            })
+        @param params parameters of the command
+        @type dict
+        """
+        for command in params["commands"]:
+            self.__dispatchCommand(command["method"], command["params"],
+                                   command.get("id"))
+    
+    def __handleRequestCommandStatistics(self, params):
+        """
+        Private method handling the RequestCommandStatistics command.
         
-        elif method == "RequestUTRun":
-            from DCTestResult import DCTestResult
-            self.testResult = DCTestResult(self, params["failfast"])
-            if self.cover:
-                self.cover.start()
-            self.debugging = params["debug"]
-            if params["debug"]:
-                locals_ = locals()
-                self.threads.clear()
-                self.attachThread(mainThread=True)
-                sys.setprofile(None)
-                self.mainThread.run(
-                    "result = self.test.run(self.testResult)\n",
-                    localsDict=locals_)
-                result = locals_["result"]
-            else:
-                result = self.test.run(self.testResult)
-            if self.cover:
-                self.cover.stop()
-                self.cover.save()
-            self.sendJsonCommand("ResponseUTFinished", {
-                "status": 0 if result.wasSuccessful() else 1,
-            })
+        The counters are reset after sending them, if the IDE asks for it.
         
-        elif method == "RequestUTStop":
-            self.testResult.stop()
+        @param params parameters of the command
+        @type dict
+        """
+        self.sendJsonCommand("ResponseCommandStatistics", {
+            "commands": self.commandDispatcher.statistics(),
+        })
+        if params.get("reset", False):
+            self.commandDispatcher.resetStatistics()
+    
+    def __handleRequestVariables(self, params):
+        """
+        Private method handling the RequestVariables command.
         
-        elif method == "ResponseForkTo":
-            # this results from a separate event loop
-            self.fork_child = (params["target"] == 'child')
-            self.eventExit = True
+        @param params parameters of the command
+        @type dict
+        """
+        self.__dumpVariables(
+            params["frameNumber"], params["scope"], params["filters"],
+            params["maxSize"], params.get("delta", False),
+            params.get("snapshot"))
     
-    def __assembleTestCasesList(self, suite, start):
+    def __handleRequestVariable(self, params):
         """
-        Private method to assemble a list of test cases included in a test
-        suite.
+        Private method handling the RequestVariable command.
         
-        @param suite test suite to be inspected
-        @type unittest.TestSuite
-        @param start name of directory discovery was started at
-        @type str
-        @return list of tuples containing the test case ID, a short description
-            and the path of the test file name
-        @rtype list of tuples of (str, str, str)
+        @param params parameters of the command
+        @type dict
         """
-        import unittest
-        testCases = []
-        for test in suite:
-            if isinstance(test, unittest.TestSuite):
-                testCases.extend(self.__assembleTestCasesList(test, start))
-            else:
-                testId = test.id()
-                if "ModuleImportFailure" not in testId and \
-                   "LoadTestsFailure" not in testId and \
-                   "_FailedTest" not in testId:
-                    filename = os.path.join(
-                        start,
-                        test.__module__.replace(".", os.sep) + ".py")
-                    testCases.append(
-                        (test.id(), test.shortDescription(), filename)
-                    )
-        return testCases
+        self.__dumpVariable(
+            params["variable"], params["frameNumber"],
+            params["scope"], params["filters"],
+            params["maxSize"], params.get("start"), params.get("count"))
     
-    def sendJsonCommand(self, method, params):
+    def __handleRequestVariableTree(self, params):
         """
-        Public method to send a single command or response to the IDE.
+        Private method handling the RequestVariableTree command.
         
-        @param method command or response command name to be sent
-        @type str
-        @param params dictionary of named parameters for the command or
-            response
+        @param params parameters of the command
         @type dict
         """
-        cmd = prepareJsonCommand(method, params)
+        self.__dumpVariableTree(
+            params["variables"], params["frameNumber"],
+            params["scope"], params["filters"],
+            params["maxSize"])
+    
+    def __handleRequestBuffer(self, params):
+        """
+        Private method handling the RequestBuffer command.
         
-        self.writestream.write_p(cmd)
-        self.writestream.flush()
+        @param params parameters of the command
+        @type dict
+        """
+        self.__dumpBuffer(
+            params["variable"], params["frameNumber"], params["scope"],
+            params.get("start", 0), params.get("count"))
     
-    def sendClearTemporaryBreakpoint(self, filename, lineno):
+    def __handleRequestThreadList(self, params):
         """
-        Public method to signal the deletion of a temporary breakpoint.
+        Private method handling the RequestThreadList command.
         
-        @param filename name of the file the bp belongs to
-        @type str
-        @param lineno linenumber of the bp
-        @type int
+        @param params parameters of the command
+        @type dict
         """
-        self.sendJsonCommand("ResponseClearBreakpoint", {
-            "filename": filename,
-            "line": lineno
-        })
+        self.dumpThreadList()
     
-    def sendClearTemporaryWatch(self, condition):
+    def __handleRequestThreadSet(self, params):
         """
-        Public method to signal the deletion of a temporary watch expression.
+        Private method handling the RequestThreadSet command.
         
-        @param condition condition of the watch expression to be cleared
-        @type str
+        @param params parameters of the command
+        @type dict
         """
-        self.sendJsonCommand("ResponseClearWatch", {
-            "condition": condition,
-        })
+        if params["threadID"] in self.threads:
+            self.setCurrentThread(params["threadID"])
+            self.sendJsonCommand("ResponseThreadSet", {})
+            stack = self.currentThread.getStack()
+            self.sendJsonCommand("ResponseStack", {
+                "stack": stack,
+            })
     
-    def sendResponseLine(self, stack):
+    def __handleRequestCapabilities(self, params):
         """
-        Public method to send the current call stack.
+        Private method handling the RequestCapabilities command.
         
-        @param stack call stack
-        @type list
+        @param params parameters of the command
+        @type dict
         """
-        self.sendJsonCommand("ResponseLine", {
-            "stack": stack,
+        clientType = "Python2" if sys.version_info[0] == 2 else "Python3"
+        # the IDE lists the encodings it understands by preference
+        encoding = "json"
+        for name in params.get("encodings", []):
+            if name in DebugClientCapabilities.Encodings:
+                encoding = name
+                break
+        # the IDE may ask for the compression of large messages
+        compression = self.__compressionSettings(params.get("compression"))
+        self.sendJsonCommand("ResponseCapabilities", {
+            "capabilities": self.__clientCapabilities(),
+            "clientType": clientType,
+            "encoding": encoding,
+            "compression": compression,
         })
+        # all further messages use the negotiated encoding
+        writer = self.writestream.writer
+        writer.binary = encoding == "msgpack"
+        if compression is not None:
+            writer.setCompression(compression["level"],
+                                  compression["threshold"])
     
-    def sendCallTrace(self, event, fromInfo, toInfo):
+    def __compressionSettings(self, compression):
         """
-        Public method to send a call trace entry.
+        Private method to validate the compression settings requested by the
+        IDE.
         
-        @param event trace event (call or return)
+        @param compression requested settings with optional keys "level"
+            (zlib compression level -1 to 9) and "threshold" (minimum size of
+            the messages to be compressed)
+        @type dict or None
+        @return accepted settings or None to send uncompressed messages
+        @rtype dict or None
+        """
+        if not isinstance(compression, dict) or not CompressionAvailable:
+            return None
+        
+        level = compression.get("level", CompressionLevel)
+        threshold = compression.get("threshold", CompressionThreshold)
+        for value in (level, threshold):
+            if (isinstance(value, bool) or
+                    not isinstance(value, numbers.Integral)):
+                return None
+        if not -1 <= level <= 9 or threshold < 0:
+            return None
+        
+        return {
+            "level": level,
+            "threshold": threshold,
+        }
+    
+    def __handleRequestTransferStatistics(self, params):
+        """
+        Private method handling the RequestTransferStatistics command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.sendJsonCommand("ResponseTransferStatistics",
+                             self.writestream.writer.statistics())
+    
+    def __handleRequestBanner(self, params):
+        """
+        Private method handling the RequestBanner command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.sendJsonCommand("ResponseBanner", {
+            "version": "Python {0}".format(sys.version),
+            "platform": socket.gethostname(),
+            "dbgclient": self.variant,
+        })
+    
+    def __handleRequestSetFilter(self, params):
+        """
+        Private method handling the RequestSetFilter command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.__generateFilterObjects(params["scope"], params["filter"])
+    
+    def __handleRequestCallTrace(self, params):
+        """
+        Private method handling the RequestCallTrace command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if self.callTraceRecorder is not None:
+            self.callTraceRecorder.stop()
+            self.callTraceRecorder = None
+        
+        mode = params.get("mode", "events")
+        if mode not in DebugClientCapabilities.CallTraceModes:
+            mode = "events"
+        if params["enable"] and mode != "events":
+            self.callTraceRecorder = CallTraceRecorder(
+                self, mode,
+                every=params.get("every", 1),
+                batchSize=params.get("batchSize", BatchSize),
+                flushInterval=params.get("flushInterval", FlushInterval),
+                sampleInterval=params.get("sampleInterval",
+                                          SampleInterval))
+        
+        # the sampled mode needs no profile function
+        if params["enable"] and mode != "sampled":
+            callTraceEnabled = self.profile
+        else:
+            callTraceEnabled = None
+        
+        if self.debugging:
+            sys.setprofile(callTraceEnabled)
+        else:
+            # remember for later
+            self.callTraceEnabled = callTraceEnabled
+    
+    def __handleRequestEnvironment(self, params):
+        """
+        Private method handling the RequestEnvironment command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        for key, value in params["environment"].items():
+            if key.endswith("+"):
+                if key[:-1] in os.environ:
+                    os.environ[key[:-1]] += value
+                else:
+                    os.environ[key[:-1]] = value
+            else:
+                os.environ[key] = value
+    
+    def __handleRequestLoad(self, params):
+        """
+        Private method handling the RequestLoad command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self._fncache = {}
+        self.dircache = []
+        self.variableSnapshots.clear()
+        sys.argv = []
+        self.__setCoding(params["filename"])
+        sys.argv.append(params["filename"])
+        sys.argv.extend(params["argv"])
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if params["workdir"] == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(params["workdir"])
+        
+        self.running = sys.argv[0]
+        self.debugging = True
+        
+        self.fork_auto = params["autofork"]
+        self.fork_child = params["forkChild"]
+        
+        self.threads.clear()
+        self.attachThread(mainThread=True)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        # clear all old breakpoints, they'll get set after we have
+        # started
+        Breakpoint.clear_all_breaks()
+        Watch.clear_all_watches()
+        
+        self.mainThread.tracePythonLibs(params["traceInterpreter"])
+        
+        # This will eventually enter a local event loop.
+        self.debugMod.__dict__['__file__'] = self.running
+        sys.modules['__main__'] = self.debugMod
+        code = self.__compileFileSource(self.running)
+        if code:
+            sys.setprofile(self.callTraceEnabled)
+            self.mainThread.run(code, self.debugMod.__dict__, debug=True)
+    
+    def __handleRequestRun(self, params):
+        """
+        Private method handling the RequestRun command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.variableSnapshots.clear()
+        sys.argv = []
+        self.__setCoding(params["filename"])
+        sys.argv.append(params["filename"])
+        sys.argv.extend(params["argv"])
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if params["workdir"] == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(params["workdir"])
+        
+        self.running = sys.argv[0]
+        self.botframe = None
+        
+        self.fork_auto = params["autofork"]
+        self.fork_child = params["forkChild"]
+        
+        self.threads.clear()
+        self.attachThread(mainThread=True)
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        self.mainThread.tracePythonLibs(False)
+        
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        sys.modules['__main__'] = self.debugMod
+        res = 0
+        code = self.__compileFileSource(self.running)
+        if code:
+            self.mainThread.run(code, self.debugMod.__dict__, debug=False)
+    
+    def __handleRequestCoverage(self, params):
+        """
+        Private method handling the RequestCoverage command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        from coverage import coverage
+        sys.argv = []
+        self.__setCoding(params["filename"])
+        sys.argv.append(params["filename"])
+        sys.argv.extend(params["argv"])
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if params["workdir"] == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(params["workdir"])
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        # generate a coverage object
+        self.cover = coverage(
+            auto_data=True,
+            data_file="{0}.coverage".format(
+                os.path.splitext(sys.argv[0])[0]))
+        
+        if params["erase"]:
+            self.cover.erase()
+        sys.modules['__main__'] = self.debugMod
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        code = self.__compileFileSource(sys.argv[0])
+        if code:
+            self.running = sys.argv[0]
+            self.cover.start()
+            self.mainThread.run(code, self.debugMod.__dict__, debug=False)
+            self.cover.stop()
+            self.cover.save()
+    
+    def __handleRequestProfile(self, params):
+        """
+        Private method handling the RequestProfile command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        sys.setprofile(None)
+        import PyProfile
+        sys.argv = []
+        self.__setCoding(params["filename"])
+        sys.argv.append(params["filename"])
+        sys.argv.extend(params["argv"])
+        sys.path = self.__getSysPath(os.path.dirname(sys.argv[0]))
+        if params["workdir"] == '':
+            os.chdir(sys.path[1])
+        else:
+            os.chdir(params["workdir"])
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        # generate a profile object
+        self.prof = PyProfile.PyProfile(sys.argv[0])
+        
+        if params["erase"]:
+            self.prof.erase()
+        self.debugMod.__dict__['__file__'] = sys.argv[0]
+        sys.modules['__main__'] = self.debugMod
+        script = ''
+        if sys.version_info[0] == 2:
+            script = 'execfile({0!r})'.format(sys.argv[0])
+        else:
+            with codecs.open(sys.argv[0], encoding=self.__coding) as fp:
+                script = fp.read()
+            if script and not script.endswith('\n'):
+                script += '\n'
+        
+        if script:
+            self.running = sys.argv[0]
+            res = 0
+            try:
+                self.prof.run(script)
+                atexit._run_exitfuncs()
+            except SystemExit as exc:
+                res = exc.code
+                atexit._run_exitfuncs()
+            except Exception:
+                excinfo = sys.exc_info()
+                self.__unhandled_exception(*excinfo)
+        
+            self.prof.save()
+            self.progTerminated(res)
+    
+    def __handleExecuteStatement(self, params):
+        """
+        Private method handling the ExecuteStatement command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if self.buffer:
+            self.buffer = self.buffer + '\n' + params["statement"]
+        else:
+            self.buffer = params["statement"]
+        
+        try:
+            code = self.compile_command(self.buffer, self.readstream.name)
+        except (OverflowError, SyntaxError, ValueError):
+            # Report the exception
+            sys.last_type, sys.last_value, sys.last_traceback = \
+                sys.exc_info()
+            self.sendJsonCommand("ClientOutput", {
+                "text": "".join(traceback.format_exception_only(
+                    sys.last_type, sys.last_value))
+            })
+            self.buffer = ''
+        else:
+            if code is None:
+                self.sendJsonCommand("ResponseContinue", {})
+                return
+            else:
+                self.buffer = ''
+        
+                try:
+                    if self.running is None:
+                        exec(code, self.debugMod.__dict__)
+                    else:
+                        if self.currentThread is None:
+                            # program has terminated
+                            self.running = None
+                            _globals = self.debugMod.__dict__
+                            _locals = _globals
+                        else:
+                            cf = self.currentThread.getCurrentFrame()
+                            # program has terminated
+                            if cf is None:
+                                self.running = None
+                                _globals = self.debugMod.__dict__
+                                _locals = _globals
+                            else:
+                                frmnr = self.framenr
+                                while cf is not None and frmnr > 0:
+                                    cf = cf.f_back
+                                    frmnr -= 1
+                                _globals = cf.f_globals
+                                _locals = \
+                                    self.currentThread.getFrameLocals(
+                                        self.framenr)
+                        # reset sys.stdout to our redirector
+                        # (unconditionally)
+                        if "sys" in _globals:
+                            __stdout = _globals["sys"].stdout
+                            _globals["sys"].stdout = self.writestream
+                            exec(code, _globals, _locals)
+                            _globals["sys"].stdout = __stdout
+                        elif "sys" in _locals:
+                            __stdout = _locals["sys"].stdout
+                            _locals["sys"].stdout = self.writestream
+                            exec(code, _globals, _locals)
+                            _locals["sys"].stdout = __stdout
+                        else:
+                            exec(code, _globals, _locals)
+        
+                        self.currentThread.storeFrameLocals(self.framenr)
+                except SystemExit as exc:
+                    self.progTerminated(exc.code)
+                except Exception:
+                    # Report the exception and the traceback
+                    tlist = []
+                    try:
+                        exc_type, exc_value, exc_tb = sys.exc_info()
+                        sys.last_type = exc_type
+                        sys.last_value = exc_value
+                        sys.last_traceback = exc_tb
+                        tblist = traceback.extract_tb(exc_tb)
+                        del tblist[:1]
+                        tlist = traceback.format_list(tblist)
+                        if tlist:
+                            tlist.insert(
+                                0, "Traceback (innermost last):\n")
+                            tlist.extend(traceback.format_exception_only(
+                                exc_type, exc_value))
+                    finally:
+                        tblist = exc_tb = None
+        
+                    self.sendJsonCommand("ClientOutput", {
+                        "text": "".join(tlist)
+                    })
+        
+        self.sendJsonCommand("ResponseOK", {})
+    
+    def __handleRequestStep(self, params):
+        """
+        Private method handling the RequestStep command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.currentThreadExec.step(True)
+        self.updateTracer()
+        self.eventExit = True
+    
+    def __handleRequestStepOver(self, params):
+        """
+        Private method handling the RequestStepOver command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.currentThreadExec.step(False)
+        self.updateTracer()
+        self.eventExit = True
+    
+    def __handleRequestStepOut(self, params):
+        """
+        Private method handling the RequestStepOut command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.currentThreadExec.stepOut()
+        self.updateTracer()
+        self.eventExit = True
+    
+    def __handleRequestStepQuit(self, params):
+        """
+        Private method handling the RequestStepQuit command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if self.passive:
+            self.progTerminated(42)
+        else:
+            self.set_quit()
+            self.eventExit = True
+    
+    def __handleRequestMoveIP(self, params):
+        """
+        Private method handling the RequestMoveIP command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        newLine = params["newLine"]
+        self.currentThreadExec.move_instruction_pointer(newLine)
+    
+    def __handleRequestContinue(self, params):
+        """
+        Private method handling the RequestContinue command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.currentThreadExec.go(params["special"])
+        self.updateTracer()
+        self.eventExit = True
+    
+    def __handleRawInput(self, params):
+        """
+        Private method handling the RawInput command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        # If we are handling raw mode input then break out of the current
+        # event loop.
+        self.rawLine = params["input"]
+        self.eventExit = True
+    
+    def __handleRequestBreakpoint(self, params):
+        """
+        Private method handling the RequestBreakpoint command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if params["setBreakpoint"]:
+            if params["condition"] in ['None', '']:
+                cond = None
+            else:
+                cond = params["condition"]
+        
+            try:
+                Breakpoint(
+                    params["filename"], params["line"],
+                    params["temporary"], cond)
+            except SyntaxError:
+                self.sendJsonCommand("ResponseBPConditionError", {
+                    "filename": params["filename"],
+                    "line": params["line"],
+                })
+                return
+        else:
+            Breakpoint.clear_break(params["filename"], params["line"])
+        
+        if self.monitor is not None:
+            self.monitor.breakpointsChanged(
+                params["filename"], params["setBreakpoint"])
+        self.updateTracer()
+    
+    def __handleRequestBreakpointEnable(self, params):
+        """
+        Private method handling the RequestBreakpointEnable command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        bp = Breakpoint.get_break(params["filename"], params["line"])
+        if bp is not None:
+            if params["enable"]:
+                bp.enable()
+            else:
+                bp.disable()
+    
+    def __handleRequestBreakpointIgnore(self, params):
+        """
+        Private method handling the RequestBreakpointIgnore command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        bp = Breakpoint.get_break(params["filename"], params["line"])
+        if bp is not None:
+            bp.ignore = params["count"]
+            # optionally count ignored hits before evaluating the condition
+            bp.ignorePrecheck = params.get("precheck", False)
+    
+    def __handleRequestBreakpoints(self, params):
+        """
+        Private method handling the RequestBreakpoints command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.sendJsonCommand("ResponseBreakpoints",
+                             self.__setBreakpoints(params["breakpoints"]))
+        self.updateTracer()
+    
+    def __handleRequestWatch(self, params):
+        """
+        Private method handling the RequestWatch command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if params["setWatch"]:
+            try:
+                compiledCond, flag = Watch.compileCondition(
+                    params["condition"])
+            except SyntaxError:
+                self.sendJsonCommand("ResponseWatchConditionError", {
+                    "condition": params["condition"],
+                })
+                return
+            Watch(
+                params["condition"], compiledCond, flag,
+                params["temporary"])
+            if self.monitor is not None:
+                self.monitor.breakpointsChanged()
+        else:
+            Watch.clear_watch(params["condition"])
+        self.updateTracer()
+    
+    def __handleRequestWatchEnable(self, params):
+        """
+        Private method handling the RequestWatchEnable command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        wp = Watch.get_watch(params["condition"])
+        if wp is not None:
+            if params["enable"]:
+                wp.enable()
+            else:
+                wp.disable()
+    
+    def __handleRequestWatchIgnore(self, params):
+        """
+        Private method handling the RequestWatchIgnore command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        wp = Watch.get_watch(params["condition"])
+        if wp is not None:
+            wp.ignore = params["count"]
+    
+    def __handleRequestWatches(self, params):
+        """
+        Private method handling the RequestWatches command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.sendJsonCommand("ResponseWatches",
+                             self.__setWatches(params["watches"]))
+        self.updateTracer()
+    
+    def __handleRequestShutdown(self, params):
+        """
+        Private method handling the RequestShutdown command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.sessionClose()
+    
+    def __handleRequestCompletion(self, params):
+        """
+        Private method handling the RequestCompletion command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.__completionList(params["text"])
+    
+    def __handleRequestUTDiscover(self, params):
+        """
+        Private method handling the RequestUTDiscover command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if params["syspath"]:
+            sys.path = params["syspath"] + sys.path
+        
+        discoveryStart = params["discoverystart"]
+        if not discoveryStart:
+            discoveryStart = params["workdir"]
+        
+        os.chdir(params["discoverystart"])
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        try:
+            import unittest
+            testLoader = unittest.TestLoader()
+            test = testLoader.discover(discoveryStart)
+            if hasattr(testLoader, "errors") and \
+               bool(testLoader.errors):
+                self.sendJsonCommand("ResponseUTDiscover", {
+                    "testCasesList": [],
+                    "exception": "DiscoveryError",
+                    "message": "\n\n".join(testLoader.errors),
+                })
+            else:
+                testsList = self.__assembleTestCasesList(test,
+                                                         discoveryStart)
+                self.sendJsonCommand("ResponseUTDiscover", {
+                    "testCasesList": testsList,
+                    "exception": "",
+                    "message": "",
+                })
+        except Exception:
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            self.sendJsonCommand("ResponseUTDiscover", {
+                "testCasesList": [],
+                "exception": exc_type.__name__,
+                "message": str(exc_value),
+            })
+    
+    def __handleRequestUTPrepare(self, params):
+        """
+        Private method handling the RequestUTPrepare command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        if params["syspath"]:
+            sys.path = params["syspath"] + sys.path
+        sys.path.insert(
+            0, os.path.dirname(os.path.abspath(params["filename"])))
+        if params["workdir"]:
+            os.chdir(params["workdir"])
+        else:
+            os.chdir(sys.path[0])
+        
+        # set the system exception handling function to ensure, that
+        # we report on all unhandled exceptions
+        sys.excepthook = self.__unhandled_exception
+        self.__interceptSignals()
+        
+        try:
+            import unittest
+            testLoader = unittest.TestLoader()
+            if params["discover"]:
+                discoveryStart = params["discoverystart"]
+                if not discoveryStart:
+                    discoveryStart = params["workdir"]
+                if params["testcases"]:
+                    self.test = testLoader.loadTestsFromNames(
+                        params["testcases"])
+                else:
+                    self.test = testLoader.discover(discoveryStart)
+            else:
+                if params["filename"]:
+                    utModule = load_source(
+                        params["testname"], params["filename"])
+                else:
+                    utModule = None
+                if params["failed"]:
+                    if utModule:
+                        failed = [t.split(".", 1)[1]
+                                  for t in params["failed"]]
+                    else:
+                        failed = params["failed"][:]
+                    self.test = testLoader.loadTestsFromNames(
+                        failed, utModule)
+                else:
+                    self.test = testLoader.loadTestsFromName(
+                        params["testfunctionname"], utModule)
+        except Exception:
+            exc_type, exc_value, exc_tb = sys.exc_info()
+            self.sendJsonCommand("ResponseUTPrepared", {
+                "count": 0,
+                "exception": exc_type.__name__,
+                "message": str(exc_value),
+            })
+            return
+        
+        # generate a coverage object
+        if params["coverage"]:
+            from coverage import coverage
+            self.cover = coverage(
+                auto_data=True,
+                data_file="{0}.coverage".format(
+                    os.path.splitext(params["coveragefile"])[0]))
+            if params["coverageerase"]:
+                self.cover.erase()
+        else:
+            self.cover = None
+        
+        if params["debug"]:
+            Breakpoint.clear_all_breaks()
+            Watch.clear_all_watches()
+        
+        self.sendJsonCommand("ResponseUTPrepared", {
+            "count": self.test.countTestCases(),
+            "exception": "",
+            "message": "",
+        })
+    
+    def __handleRequestUTRun(self, params):
+        """
+        Private method handling the RequestUTRun command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        from DCTestResult import DCTestResult
+        self.testResult = DCTestResult(self, params["failfast"])
+        if self.cover:
+            self.cover.start()
+        self.debugging = params["debug"]
+        if params["debug"]:
+            locals_ = locals()
+            self.threads.clear()
+            self.attachThread(mainThread=True)
+            sys.setprofile(None)
+            self.mainThread.run(
+                "result = self.test.run(self.testResult)\n",
+                localsDict=locals_)
+            result = locals_["result"]
+        else:
+            result = self.test.run(self.testResult)
+        if self.cover:
+            self.cover.stop()
+            self.cover.save()
+        self.sendJsonCommand("ResponseUTFinished", {
+            "status": 0 if result.wasSuccessful() else 1,
+        })
+    
+    def __handleRequestUTStop(self, params):
+        """
+        Private method handling the RequestUTStop command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        self.testResult.stop()
+    
+    def __handleResponseForkTo(self, params):
+        """
+        Private method handling the ResponseForkTo command.
+        
+        @param params parameters of the command
+        @type dict
+        """
+        # this results from a separate event loop
+        self.fork_child = (params["target"] == 'child')
+        self.eventExit = True
+    
+    def __assembleTestCasesList(self, suite, start):
+        """
+        Private method to assemble a list of test cases included in a test
+        suite.
+        
+        @param suite test suite to be inspected
+        @type unittest.TestSuite
+        @param start name of directory discovery was started at
+        @type str
+        @return list of tuples containing the test case ID, a short description
+            and the path of the test file name
+        @rtype list of tuples of (str, str, str)
+        """
+        import unittest
+        testCases = []
+        for test in suite:
+            if isinstance(test, unittest.TestSuite):
+                testCases.extend(self.__assembleTestCasesList(test, start))
+            else:
+                testId = test.id()
+                if "ModuleImportFailure" not in testId and \
+                   "LoadTestsFailure" not in testId and \
+                   "_FailedTest" not in testId:
+                    filename = os.path.join(
+                        start,
+                        test.__module__.replace(".", os.sep) + ".py")
+                    testCases.append(
+                        (test.id(), test.shortDescription(), filename)
+                    )
+        return testCases
+    
+    def sendJsonCommand(self, method, params):
+        """
+        Public method to send a single command or response to the IDE.
+        
+        @param method command or response command name to be sent
+        @type str
+        @param params dictionary of named parameters for the command or
+            response
+        @type dict
+        """
+        if self.__requestIds:
+            requestId = self.__requestIds.get(_thread.get_ident())
+        else:
+            requestId = None
+        
+        if self.writestream.writer.binary:
+            cmd = prepareBinaryCommand(method, params, requestId)
+        else:
+            cmd = prepareJsonCommand(method, params, requestId)
+        
+        self.writestream.write_p(cmd, method)
+    
+    def sendClearTemporaryBreakpoint(self, filename, lineno):
+        """
+        Public method to signal the deletion of a temporary breakpoint.
+        
+        @param filename name of the file the bp belongs to
+        @type str
+        @param lineno linenumber of the bp
+        @type int
+        """
+        self.sendJsonCommand("ResponseClearBreakpoint", {
+            "filename": filename,
+            "line": lineno
+        })
+    
+    def sendClearTemporaryWatch(self, condition):
+        """
+        Public method to signal the deletion of a temporary watch expression.
+        
+        @param condition condition of the watch expression to be cleared
+        @type str
+        """
+        self.sendJsonCommand("ResponseClearWatch", {
+            "condition": condition,
+        })
+    
+    def sendResponseLine(self, stack):
+        """
+        Public method to send the current call stack.
+        
+        @param stack call stack
+        @type list
+        """
+        # the trace up to the stop comes first
+        if self.callTraceRecorder is not None:
+            self.callTraceRecorder.flush()
+        
+        self.sendJsonCommand("ResponseLine", {
+            "stack": stack,
+        })
+    
+    def sendCallTrace(self, event, fromInfo, toInfo):
+        """
+        Public method to send a call trace entry.
+        
+        @param event trace event (call or return)
         @type str
         @param fromInfo dictionary containing the origin info
         @type dict with 'filename', 'linenumber' and 'codename'
@@ -1045,104 +1579,507 @@ class DebugClientBase(object):
         @type dict with 'filename', 'linenumber' and 'codename'
             as keys
         """
-        self.sendJsonCommand("CallTrace", {
-            "event": event[0],
-            "from": fromInfo,
-            "to": toInfo,
-        })
+        self.sendJsonCommand("CallTrace", {
+            "event": event[0],
+            "from": fromInfo,
+            "to": toInfo,
+        })
+    
+    def sendException(self, exceptionType, exceptionMessage, stack):
+        """
+        Public method to send information for an exception.
+        
+        @param exceptionType type of exception raised
+        @type str
+        @param exceptionMessage message of the exception
+        @type str
+        @param stack stack trace information
+        @type list
+        """
+        self.sendJsonCommand("ResponseException", {
+            "type": exceptionType,
+            "message": exceptionMessage,
+            "stack": stack,
+        })
+    
+    def sendSyntaxError(self, message, filename, lineno, charno):
+        """
+        Public method to send information for a syntax error.
+        
+        @param message syntax error message
+        @type str
+        @param filename name of the faulty file
+        @type str
+        @param lineno line number info
+        @type int
+        @param charno character number info
+        @type int
+        """
+        self.sendJsonCommand("ResponseSyntax", {
+            "message": message,
+            "filename": filename,
+            "linenumber": lineno,
+            "characternumber": charno,
+        })
+    
+    def sendPassiveStartup(self, filename, exceptions):
+        """
+        Public method to send the passive start information.
+        
+        @param filename name of the script
+        @type str
+        @param exceptions flag to enable exception reporting of the IDE
+        @type bool
+        """
+        self.sendJsonCommand("PassiveStartup", {
+            "filename": filename,
+            "exceptions": exceptions,
+        })
+    
+    def __setBreakpoints(self, breakpoints):
+        """
+        Private method to replace all breakpoints by a new set.
+        
+        Unchanged breakpoints are kept including their hit count. The code
+        index is rebuilt once for each file with changed breakpoints.
+        
+        @param breakpoints list of dictionaries with keys "filename", "line",
+            "temporary", "condition" and optional "enabled" and "ignore"
+        @type list of dict
+        @return dictionary with the number of added and removed breakpoints
+            and a list of breakpoints with invalid conditions
+        @rtype dict
+        """
+        errors = []
+        newBreaks = {}
+        for params in breakpoints:
+            filename = os.path.abspath(params["filename"])
+            cond = params["condition"]
+            compiledCond = None
+            if cond in ['None', '']:
+                cond = None
+            elif cond is not None:
+                try:
+                    compiledCond = Breakpoint.compileCondition(cond)
+                except SyntaxError:
+                    errors.append({
+                        "filename": params["filename"],
+                        "line": params["line"],
+                    })
+                    # keep an existing breakpoint as is
+                    key = (filename, params["line"])
+                    if key in Breakpoint.breaks:
+                        newBreaks[key] = None
+                    continue
+            newBreaks[(filename, params["line"])] = (
+                params, cond, compiledCond)
+        
+        addedFiles = set()
+        changedFiles = set()
+        removed = 0
+        for key, bp in list(Breakpoint.breaks.items()):
+            if key in newBreaks:
+                if newBreaks[key] is None:
+                    del newBreaks[key]
+                    continue
+                params, cond, compiledCond = newBreaks[key]
+                if bp.cond == cond and bp.temporary == params["temporary"]:
+                    del newBreaks[key]
+                    bp.enabled = params.get("enabled", True)
+                    bp.ignore = params.get("ignore", 0)
+                    continue
+            else:
+                removed += 1
+            bp.deleteMe(updateIndex=False)
+            changedFiles.add(key[0])
+        
+        for (filename, line), newBreak in newBreaks.items():
+            params, cond, compiledCond = newBreak
+            bp = Breakpoint(filename, line, params["temporary"], cond,
+                            updateIndex=False, compiledCond=compiledCond)
+            bp.enabled = params.get("enabled", True)
+            bp.ignore = params.get("ignore", 0)
+            addedFiles.add(filename)
+        
+        for filename in changedFiles | addedFiles:
+            Breakpoint.reindexFile(filename)
+            if self.monitor is not None:
+                self.monitor.breakpointsChanged(
+                    filename, filename in addedFiles)
+        
+        return {
+            "added": len(newBreaks),
+            "removed": removed,
+            "errors": errors,
+        }
+    
+    def __setWatches(self, watches):
+        """
+        Private method to replace all watch expressions by a new set.
+        
+        @param watches list of dictionaries with keys "condition",
+            "temporary" and optional "enabled" and "ignore"
+        @type list of dict
+        @return dictionary with the number of added and removed watch
+            expressions and a list of invalid conditions
+        @rtype dict
+        """
+        errors = []
+        newWatches = {}
+        for params in watches:
+            newWatches[params["condition"]] = params
+        
+        removed = 0
+        for wp in Watch.watches[:]:
+            params = newWatches.get(wp.cond)
+            if params is not None and wp.temporary == params["temporary"]:
+                del newWatches[wp.cond]
+                wp.enabled = params.get("enabled", True)
+                wp.ignore = params.get("ignore", 0)
+            else:
+                if params is None:
+                    removed += 1
+                wp.deleteMe()
+        
+        added = 0
+        for cond, params in newWatches.items():
+            try:
+                compiledCond, flag = Watch.compileCondition(cond)
+            except SyntaxError:
+                errors.append(cond)
+                continue
+            wp = Watch(cond, compiledCond, flag, params["temporary"])
+            wp.enabled = params.get("enabled", True)
+            wp.ignore = params.get("ignore", 0)
+            added += 1
+        
+        if added and self.monitor is not None:
+            self.monitor.breakpointsChanged()
+        
+        return {
+            "added": added,
+            "removed": removed,
+            "errors": errors,
+        }
+    
+    def __clientCapabilities(self):
+        """
+        Private method to determine the clients capabilities.
+        
+        @return client capabilities (integer)
+        """
+        capabilities = self.clientCapabilities
+        if not CompressionAvailable:
+            capabilities &= ~DebugClientCapabilities.HasCompression
+        if sys.version_info < (3, 12):
+            capabilities &= ~DebugClientCapabilities.HasDetachedAllThreads
+        try:
+            import PyProfile    # __IGNORE_WARNING__
+            try:
+                del sys.modules['PyProfile']
+            except KeyError:
+                pass
+            return capabilities
+        except ImportError:
+            return capabilities & ~DebugClientCapabilities.HasProfiler
+    
+    def startCommandReader(self):
+        """
+        Public method to start the thread reading the commands of the IDE.
+        """
+        self.commandQueue = queue.Queue()
+        self.commandReaderId = DebugClientOrigStartNewThread(
+            self.__commandReader, (self.readstream, self.commandQueue))
+    
+    def __commandReader(self, stream, commandQueue):
+        """
+        Private method reading the commands of the IDE as they arrive.
+        
+        The commands are queued and the poll flag of the trace function is
+        raised. While the program runs without a trace function, the main
+        thread is asked to process them.
+        
+        @param stream stream to read the commands from
+        @type AsyncFile
+        @param commandQueue queue to put the commands into
+        @type Queue
+        """
+        # Python 2 runs the thread on, while it clears the modules at exit,
+        # even the builtins may be gone then, so the exception class is
+        # looked up in advance
+        error = Exception
+        try:
+            self.__readCommands(stream, commandQueue)
+        except error:
+            if DebugBase is None:
+                return
+            raise
+    
+    def __readCommands(self, stream, commandQueue):
+        """
+        Private method implementing the loop of the command reader thread.
+        
+        @param stream stream to read the commands from
+        @type AsyncFile
+        @param commandQueue queue to put the commands into
+        @type Queue
+        """
+        while True:
+            received = False
+            try:
+                # all commands received at once are handled in one go
+                for command in stream.readCommands():
+                    commandQueue.put(command)
+                    received = True
+            except (socket.error, EOFError):
+                # the connection was lost
+                received = False
+            except ValueError as err:
+                # the data of a malformed command was dropped, the session
+                # goes on with the next command
+                printerr("Error reading command: " + str(err))
+                if not received:
+                    continue
+            if not received:
+                # the connection was closed, None ends the session
+                commandQueue.put(None)
+                break
+            
+            if not DebugBase.pollTimerEnabled:
+                # commands are handled by event loops only
+                continue
+            
+            DebugBase.eventPollFlag = True
+            monitor = self.monitor
+            unattended = self.detached or (
+                monitor is not None and monitor.active)
+            if unattended and not self.eventLoopActive:
+                # there may be no trace function to pick up the command
+                if not self.__callInMainThread(self.__pollCommands, None):
+                    # e.g. PyPy, the commands can only be handled here
+                    self.__pollCommands(None)
+    
+    def __pollCommands(self, _):
+        """
+        Private method to handle the queued commands without a trace
+        function.
+        
+        @param _ unused argument passed by __callInMainThread
+        @type None
+        """
+        if (not DebugBase.eventPollFlag or self.eventLoopActive or
+                not self.lockClient(False)):
+            # picked up already or handled by the event loop of a stop
+            return
+        
+        try:
+            self.eventPoll()
+        finally:
+            self.unlockClient()
+    
+    def isClientThread(self, ident):
+        """
+        Public method to check, if a thread belongs to the debug client
+        itself.
+        
+        @param ident id of the thread
+        @type int
+        @return flag indicating a thread of the debug client
+        @rtype bool
+        """
+        return ident == self.commandReaderId or (
+            self.writestream is not None and
+            ident == self.writestream.writer.senderId) or (
+            self.callTraceRecorder is not None and
+            ident == self.callTraceRecorder.threadId)
+    
+    def updateTracer(self):
+        """
+        Public method to install or remove the trace function in detached
+        mode.
+        
+        The trace function is needed as long as there are breakpoints or
+        watch expressions or a thread is stepping.
+        """
+        if not self.detached:
+            return
+        
+        needed = (bool(Breakpoint.breaks) or Watch.watches != [] or
+                  any(t.isStepping() for t in list(self.threads.values())))
+        if needed and not self.tracerInstalled:
+            self.__installTracer()
+        elif not needed and self.tracerInstalled:
+            self.__removeTracer()
+    
+    def __installTracer(self):
+        """
+        Private method to install the trace function in all threads.
+        
+        The frames running already get it as their local trace function.
+        Before Python 3.12 only the main thread and threads started later on
+        can be traced, see DebugClientCapabilities.HasDetachedAllThreads.
+        """
+        self.tracerInstalled = True
+        if self.monitor is not None and self.monitor.start():
+            # sys.monitoring covers all threads, stepping installs the trace
+            # function itself
+            return
+        
+        # don't import threading from the command reader thread, it would
+        # become the main thread of a freshly imported module
+        settraceAll = getattr(sys.modules.get("threading"),
+                              "settrace_all_threads", None)
+        if settraceAll is not None:
+            settraceAll(self.__detachedDispatch)
+            self.__traceRunningFrames(sys._current_frames())
+        elif not self.__callInMainThread(self.__traceMainThread, True):
+            sys.stderr.write(
+                "The trace function can't be installed in the main thread"
+                " of this interpreter, only threads started from now on are"
+                " traced.\n")
+    
+    def __removeTracer(self):
+        """
+        Private method to remove the trace function from all threads.
+        
+        Before Python 3.12 other threads remove it on their next call event.
+        """
+        self.tracerInstalled = False
+        if self.monitor is not None:
+            self.monitor.stop()
+        Watch.releaseFrames()
+        
+        settraceAll = getattr(sys.modules.get("threading"),
+                              "settrace_all_threads", None)
+        if settraceAll is not None:
+            settraceAll(None)
+        else:
+            self.__callInMainThread(self.__traceMainThread, False)
+    
+    def __traceMainThread(self, install):
+        """
+        Private method called in the main thread to install or remove the
+        trace function.
+        
+        @param install flag indicating to install the trace function
+        @type bool
+        """
+        if install:
+            sys.settrace(self.__detachedDispatch)
+            self.__traceRunningFrames(
+                {_thread.get_ident(): sys._getframe(1)})
+        else:
+            sys.settrace(None)
     
-    def sendException(self, exceptionType, exceptionMessage, stack):
+    def __traceRunningFrames(self, frames):
         """
-        Public method to send information for an exception.
+        Private method to set the local trace function of running frames.
         
-        @param exceptionType type of exception raised
-        @type str
-        @param exceptionMessage message of the exception
-        @type str
-        @param stack stack trace information
-        @type list
+        Without it, a running frame gets no line events and never stops at
+        a breakpoint.
+        
+        @param frames innermost frames indexed by thread id
+        @type dict
         """
-        self.sendJsonCommand("ResponseException", {
-            "type": exceptionType,
-            "message": exceptionMessage,
-            "stack": stack,
-        })
+        for ident, frame in frames.items():
+            if self.isClientThread(ident):
+                continue
+            
+            while frame is not None:
+                if frame.f_trace is None:
+                    frame.f_trace = self.__detachedDispatch
+                frame = frame.f_back
     
-    def sendSyntaxError(self, message, filename, lineno, charno):
+    def __detachedDispatch(self, frame, event, arg):
         """
-        Public method to send information for a syntax error.
+        Private method installed as the trace function of all threads in
+        detached mode, which replaces itself by the trace function of the
+        thread's DebugBase object.
         
-        @param message syntax error message
-        @type str
-        @param filename name of the faulty file
+        @param frame the current stack frame
+        @type frame object
+        @param event the trace event
         @type str
-        @param lineno line number info
-        @type int
-        @param charno character number info
-        @type int
+        @param arg the arguments
+        @type depends on the previous event parameter
+        @return local trace function
+        @rtype trace function or None
         """
-        self.sendJsonCommand("ResponseSyntax", {
-            "message": message,
-            "filename": filename,
-            "linenumber": lineno,
-            "characternumber": charno,
-        })
+        sys.settrace(None)
+        if self.isClientThread(_thread.get_ident()):
+            return None
+        
+        dbg = self.getThread()
+        dbg.startTracing()
+        if sys.gettrace() is None:
+            return None
+        return dbg.trace_dispatch(frame, event, arg)
     
-    def sendPassiveStartup(self, filename, exceptions):
+    def __callInMainThread(self, func, arg):
         """
-        Public method to send the passive start information.
+        Private method to call a function in the main thread.
         
-        @param filename name of the script
-        @type str
-        @param exceptions flag to enable exception reporting of the IDE
-        @type bool
+        From other threads the call is scheduled with Py_AddPendingCall and
+        executed as soon as the main thread runs Python code.
+        
+        @param func function to be called
+        @type function
+        @param arg argument of the function
+        @type any
+        @return flag indicating, that the call was made or scheduled, i.e.
+            the C API of the interpreter is available
+        @rtype bool
         """
-        self.sendJsonCommand("PassiveStartup", {
-            "filename": filename,
-            "exceptions": exceptions,
-        })
+        if self.mainThread.id == _thread.get_ident():
+            func(arg)
+            return True
+        
+        addPendingCall = getattr(getattr(ctypes, "pythonapi", None),
+                                 "Py_AddPendingCall", None)
+        if addPendingCall is None:
+            # e.g. PyPy or an interpreter embedded without its C API
+            return False
+        
+        if self.__pendingCallback is None:
+            # a single callback kept alive for the lifetime of the client
+            # runs all calls queued, it must not be freed while it's running
+            self.__pendingCallback = ctypes.CFUNCTYPE(
+                ctypes.c_int, ctypes.c_void_p)(self.__runPendingCalls)
+        self.__pendingCalls.append((func, arg))
+        return addPendingCall(self.__pendingCallback, None) == 0
     
-    def __clientCapabilities(self):
+    def __runPendingCalls(self, _):
         """
-        Private method to determine the clients capabilities.
+        Private method called by the main thread to run the queued calls.
         
-        @return client capabilities (integer)
+        @param _ unused argument of Py_AddPendingCall
+        @type int
+        @return 0 to report success
+        @rtype int
         """
-        try:
-            import PyProfile    # __IGNORE_WARNING__
+        while self.__pendingCalls:
+            func, arg = self.__pendingCalls.pop(0)
             try:
-                del sys.modules['PyProfile']
-            except KeyError:
+                func(arg)
+            except Exception:
                 pass
-            return self.clientCapabilities
-        except ImportError:
-            return (
-                self.clientCapabilities & ~DebugClientCapabilities.HasProfiler)
+        return 0
     
-    def readReady(self, stream):
+    def readReady(self, command):
         """
-        Public method called when there is data ready to be read.
+        Public method called to handle a command read from the IDE.
         
-        @param stream file like object that has data to be written
+        @param command command string or None for a closed connection
+        @type str or None
         @return flag indicating an error condition
         @rtype bool
         """
-        error = False
-        
-        self.lockClient()
-        try:
-            command = stream.readCommand()
-        except Exception:
-            error = True
-            command = ""
-        self.unlockClient()
-
-        if error or len(command) == 0:
+        if command is None:
             self.sessionClose()
-        else:
-            self.handleJsonCommand(command)
+            return True
         
-        return error
+        self.handleJsonCommand(command)
+        return False
 
     def writeReady(self, stream):
         """
@@ -1150,7 +2087,6 @@ class DebugClientBase(object):
         
         @param stream file like object that has data to be written
         """
-        stream.write_p("")
         stream.flush()
     
     def __interact(self):
@@ -1174,48 +2110,31 @@ class DebugClientBase(object):
             polling disabled (boolean)
         """
         self.eventExit = False
+        eventLoopActive = self.eventLoopActive
+        self.eventLoopActive = True
         self.pollingDisabled = disablePolling
-        selectErrors = 0
-
+        
         while not self.eventExit:
-            wrdy = []
-
             if self.writestream.nWriteErrors > self.writestream.maxtries:
                 break
             
-            if AsyncPendingWrite(self.writestream):
-                wrdy.append(self.writestream)
-
-            if AsyncPendingWrite(self.errorstream):
-                wrdy.append(self.errorstream)
+            self.__writePending()
             
             try:
-                rrdy, wrdy, xrdy = select.select([self.readstream], wrdy, [])
-            except (select.error, KeyboardInterrupt, socket.error):
-                selectErrors += 1
-                if selectErrors <= 10:      # arbitrarily selected
-                    # just carry on
-                    continue
-                else:
-                    # give up for too many errors
-                    break
-            
-            # reset the select error counter
-            selectErrors = 0
+                command = self.commandQueue.get()
+            except KeyboardInterrupt:
+                continue
             
-            if self.readstream in rrdy:
-                error = self.readReady(self.readstream)
-                if error:
-                    break
-
-            if self.writestream in wrdy:
-                self.writeReady(self.writestream)
-
-            if self.errorstream in wrdy:
-                self.writeReady(self.errorstream)
+            error = self.readReady(command)
+            if error:
+                break
 
         self.eventExit = False
+        self.eventLoopActive = eventLoopActive
         self.pollingDisabled = False
+        
+        # the program continues and may change the summarized arrays
+        DebugVariables.arraySummaries.clear()
 
     def eventPoll(self):
         """
@@ -1224,26 +2143,27 @@ class DebugClientBase(object):
         if self.pollingDisabled:
             return
         
-        wrdy = []
-        if AsyncPendingWrite(self.writestream):
-            wrdy.append(self.writestream)
-
-        if AsyncPendingWrite(self.errorstream):
-            wrdy.append(self.errorstream)
+        DebugBase.eventPollFlag = False
+        self.__writePending()
         
-        # immediate return if nothing is ready.
-        try:
-            rrdy, wrdy, xrdy = select.select([self.readstream], wrdy, [], 0)
-        except (select.error, KeyboardInterrupt, socket.error):
-            return
-
-        if self.readstream in rrdy:
-            self.readReady(self.readstream)
-
-        if self.writestream in wrdy:
+        # immediate return if nothing is waiting.
+        while True:
+            try:
+                command = self.commandQueue.get_nowait()
+            except queue.Empty:
+                break
+            
+            if self.readReady(command):
+                break
+    
+    def __writePending(self):
+        """
+        Private method to write pending output of the output streams.
+        """
+        if AsyncPendingWrite(self.writestream):
             self.writeReady(self.writestream)
-
-        if self.errorstream in wrdy:
+        
+        if AsyncPendingWrite(self.errorstream):
             self.writeReady(self.errorstream)
     
     def connectDebugger(self, port, remoteAddress=None, redirect=True):
@@ -1254,6 +2174,12 @@ class DebugClientBase(object):
         stdout and stderr and saves these file objects in case the application
         being debugged redirects them itself.
         
+        Besides a host name or IP address the remote address may be "unix:"
+        followed by the path of a Unix domain socket or "fd:" followed by
+        the number of an inherited file descriptor of a connected socket,
+        e.g. one end of a socketpair created by the process starting the
+        client. The port is ignored for these.
+        
         @param port the port number to connect to (int)
         @param remoteAddress the network address of the debug server host
             (string)
@@ -1264,11 +2190,33 @@ class DebugClientBase(object):
             remoteAddress = "127.0.0.1"
         elif "@@i" in remoteAddress:
             remoteAddress = remoteAddress.split("@@i")[0]
-        sock = socket.create_connection((remoteAddress, port))
+        
+        if remoteAddress.startswith("unix:"):
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(remoteAddress[5:])
+        elif remoteAddress.startswith("fd:"):
+            fd = int(remoteAddress[3:])
+            if sys.version_info >= (3, 7):
+                # the family is taken from the file descriptor
+                sock = socket.socket(fileno=fd)
+            else:
+                # fromfd() works on a duplicate
+                sock = socket.fromfd(fd, self.__socketFamily(fd),
+                                     socket.SOCK_STREAM)
+                DebugClientOrigClose(fd)
+        else:
+            sock = socket.create_connection((remoteAddress, port))
+        try:
+            # send the small messages of the debugger without delay
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        except socket.error:
+            # not a TCP socket
+            pass
 
         self.readstream = AsyncFile(sock, sys.stdin.mode, sys.stdin.name)
         self.writestream = AsyncFile(sock, sys.stdout.mode, sys.stdout.name)
-        self.errorstream = AsyncFile(sock, sys.stderr.mode, sys.stderr.name)
+        self.errorstream = AsyncFile(sock, sys.stderr.mode, sys.stderr.name,
+                                     self.writestream.writer)
         
         if redirect:
             sys.stdin = self.readstream
@@ -1276,9 +2224,39 @@ class DebugClientBase(object):
             sys.stderr = self.errorstream
         self.redirect = redirect
         
+        self.startCommandReader()
+        
         # attach to the main thread here
         self.attachThread(mainThread=True)
 
+    def __socketFamily(self, fd):
+        """
+        Private method to determine the address family of an inherited
+        socket before Python 3.7.
+        
+        @param fd file descriptor of the socket
+        @type int
+        @return address family
+        @rtype int
+        """
+        # the family of the probe doesn't matter for the queries
+        probe = socket.fromfd(fd, socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            if hasattr(socket, "SO_DOMAIN"):
+                return probe.getsockopt(socket.SOL_SOCKET, socket.SO_DOMAIN)
+            
+            # the address is decoded according to the family of the socket
+            address = probe.getsockname()
+        finally:
+            probe.close()
+        
+        if not isinstance(address, tuple):
+            return socket.AF_UNIX
+        elif len(address) == 4:
+            return socket.AF_INET6
+        else:
+            return socket.AF_INET
+    
     def __unhandled_exception(self, exctype, excval, exctb):
         """
         Private method called to report an uncaught exception.
@@ -1419,20 +2397,34 @@ class DebugClientBase(object):
             status = 1
 
         if self.running:
+            # the program has ended, a RequestShutdown handled by the trace
+            # function while waiting for the sender would be swallowed by
+            # the caller
+            sys.settrace(None)
             self.set_quit()
             self.running = None
+            if self.callTraceRecorder is not None:
+                self.callTraceRecorder.flush()
             self.sendJsonCommand("ResponseExit", {
                 "status": status,
                 "message": message,
             })
+            # the interpreter may exit right after, the sender thread with it
+            self.writestream.writer.flush()
         
         # reset coding
         self.__coding = self.defaultCoding
 
-    def __dumpVariables(self, frmnr, scope, filterList, maxSize):
+    def __dumpVariables(self, frmnr, scope, filterList, maxSize,
+                        delta=False, snapshotId=None):
         """
         Private method to return the variables of a frame to the debug server.
         
+        If the changes are requested, the variables sent are remembered as a
+        snapshot of the frame. When the IDE passes the id of this snapshot
+        the next time, only the added, changed and removed variables are
+        sent.
+        
         @param frmnr distance of frame reported on. 0 is the current frame
         @type int
         @param scope 1 to report global variables, 0 for local variables
@@ -1440,53 +2432,76 @@ class DebugClientBase(object):
         @param filterList the indices of variable types to be filtered
         @type list of int
         @param maxSize maximum size the formatted value of a variable will
-            be shown. If it is bigger than that, a 'too big' indication will
-            be given.
+            be shown. If it is bigger than that, the value is cut off and
+            ends with a truncation marker.
+        @type int
+        @keyparam delta flag indicating to send the changes only
+        @type bool
+        @keyparam snapshotId id of the snapshot held by the IDE
         @type int
         """
         if self.currentThread is None:
             return
         
-        frmnr += self.currentThread.skipFrames
         if scope == 0:
-            self.framenr = frmnr
-        
-        f = self.currentThread.getCurrentFrame()
+            self.framenr = frmnr + self.currentThread.skipFrames
         
-        while f is not None and frmnr > 0:
-            f = f.f_back
-            frmnr -= 1
+        scope, varDict, frame = self.__frameVariables(frmnr, scope)
         
-        if f is None:
-            if scope:
-                varDict = self.debugMod.__dict__
-            else:
-                scope = -1
-        elif scope:
-            varDict = f.f_globals
-        elif f.f_globals is f.f_locals:
-            scope = -1
-        else:
-            varDict = f.f_locals
-            
         varlist = []
+        snapshot = None
         
         if scope != -1:
             keylist = varDict.keys()
             
+            formattedValues = None
+            if delta:
+                # the globals are the same for all frames of a module
+                key = (scope, id(varDict) if scope else id(frame))
+                snapshot = self.variableSnapshots.get(key)
+                if snapshot is not None:
+                    formattedValues = snapshot.formattedValues(maxSize)
+            
             vlist = self.__formatVariablesList(
-                keylist, varDict, scope, filterList, maxSize=maxSize)
+                keylist, varDict, scope, filterList, maxSize=maxSize,
+                formattedValues=formattedValues)
             varlist.extend(vlist)
+            
+            if delta:
+                newSnapshot = self.variableSnapshots.store(
+                    key, varlist, varDict, maxSize)
+                if snapshot is not None and \
+                        snapshot.snapshotId == snapshotId:
+                    added, changed, removed = snapshot.changes(varlist)
+                    self.sendJsonCommand("ResponseVariables", {
+                        "scope": scope,
+                        "delta": True,
+                        "base": snapshotId,
+                        "snapshot": newSnapshot.snapshotId,
+                        "added": added,
+                        "changed": changed,
+                        "removed": removed,
+                    })
+                    return
+                
+                snapshot = newSnapshot
         
-        self.sendJsonCommand("ResponseVariables", {
+        response = {
             "scope": scope,
             "variables": varlist,
-        })
+        }
+        if snapshot is not None:
+            response["snapshot"] = snapshot.snapshotId
+        self.sendJsonCommand("ResponseVariables", response)
     
-    def __dumpVariable(self, var, frmnr, scope, filterList, maxSize):
+    def __dumpVariable(self, var, frmnr, scope, filterList, maxSize,
+                       start=None, count=None):
         """
         Private method to return the variables of a frame to the debug server.
         
+        If a window of items is requested by start or count, only these items
+        of the variable are sent together with the number of all its items.
+        
         @param var list encoded name of the requested variable
         @type list of strings
         @param frmnr distance of frame reported on. 0 is the current frame
@@ -1495,13 +2510,163 @@ class DebugClientBase(object):
         @param filterList the indices of variable types to be filtered
         @type list of int
         @param maxSize maximum size the formatted value of a variable will
-            be shown. If it is bigger than that, a 'too big' indication will
-            be given.
+            be shown. If it is bigger than that, the value is cut off and
+            ends with a truncation marker.
+        @type int
+        @param start index of the first item of the window
+        @type int
+        @param count number of items of the window
+        @type int
+        """
+        if self.currentThread is None:
+            return
+        
+        scope, varDict, _frame = self.__frameVariables(frmnr, scope)
+        
+        if start is None and count is None:
+            window = None
+        else:
+            window = (start or 0,
+                      DebugVariables.MaxItemsToHandle if count is None
+                      else count)
+        
+        varlist = []
+        length = None
+        
+        if scope != -1:
+            variable = self.__resolveVariable(varDict, var, {})
+            varlist = self.__expandVariable(
+                variable, scope, filterList, maxSize, window)
+            if window is not None:
+                try:
+                    length = len(variable)
+                except Exception:
+                    pass    # no items, the attributes were sent
+        
+        response = {
+            "scope": scope,
+            "variable": var,
+            "variables": varlist,
+        }
+        if window is not None:
+            response["start"] = window[0]
+            response["length"] = length
+        self.sendJsonCommand("ResponseVariable", response)
+    
+    def __dumpBuffer(self, var, frmnr, scope, start, count):
+        """
+        Private method to send the raw data of a variable to the debug server.
+        
+        With the binary encoding the data is sent as binary data, which is
+        taken from the memory of the variable, if it is contiguous. With the
+        JSON encoding it is sent base64 encoded.
+        
+        @param var list encoded name of the requested variable
+        @type list of str
+        @param frmnr distance of frame reported on. 0 is the current frame
+        @type int
+        @param scope 1 to report global variables, 0 for local variables
+        @type int
+        @param start index of the first item to be sent
+        @type int
+        @param count number of items to be sent or None for all items
+        @type int
+        """
+        if self.currentThread is None:
+            return
+        
+        scope, varDict, _frame = self.__frameVariables(frmnr, scope)
+        
+        response = {
+            "scope": scope,
+            "variable": var,
+        }
+        data = None
+        if scope != -1:
+            variable = self.__resolveVariable(varDict, var, {})
+            try:
+                data, info = bufferWindow(variable, start, count)
+                response.update(info)
+            except (TypeError, ValueError) as exc:
+                response["error"] = str(exc)
+        
+        if data is None:
+            self.sendJsonCommand("ResponseBuffer", response)
+        elif self.writestream.writer.binary:
+            response["encoding"] = "bytes"
+            response["data"] = data
+            if self.__requestIds:
+                requestId = self.__requestIds.get(_thread.get_ident())
+            else:
+                requestId = None
+            self.writestream.write_p(
+                prepareBufferCommand("ResponseBuffer", response, requestId),
+                "ResponseBuffer")
+            # the data may be the memory of the variable, which mustn't
+            # change before it was sent, however long that takes
+            self.writestream.writer.flush(None)
+        else:
+            response["encoding"] = "base64"
+            response["data"] = base64.b64encode(data).decode("ascii")
+            self.sendJsonCommand("ResponseBuffer", response)
+    
+    def __dumpVariableTree(self, variables, frmnr, scope, filterList,
+                           maxSize):
+        """
+        Private method to return the variables of several variables of a
+        frame to the debug server.
+        
+        Common parts of the variable names are resolved only once.
+        
+        @param variables list of list encoded names of the requested
+            variables
+        @type list of list of str
+        @param frmnr distance of frame reported on. 0 is the current frame
+        @type int
+        @param scope 1 to report global variables, 0 for local variables
+        @type int
+        @param filterList the indices of variable types to be filtered
+        @type list of int
+        @param maxSize maximum size the formatted value of a variable will
+            be shown. If it is bigger than that, the value is cut off and
+            ends with a truncation marker.
         @type int
         """
         if self.currentThread is None:
             return
         
+        scope, varDict, _frame = self.__frameVariables(frmnr, scope)
+        
+        resolved = {}
+        varlists = []
+        for var in variables:
+            varlist = []
+            if scope != -1:
+                variable = self.__resolveVariable(varDict, var, resolved)
+                varlist = self.__expandVariable(
+                    variable, scope, filterList, maxSize)
+            varlists.append({
+                "variable": var,
+                "variables": varlist,
+            })
+        
+        self.sendJsonCommand("ResponseVariableTree", {
+            "scope": scope,
+            "variables": varlists,
+        })
+    
+    def __frameVariables(self, frmnr, scope):
+        """
+        Private method to get the variables dictionary of a frame.
+        
+        @param frmnr distance of frame reported on. 0 is the current frame
+        @type int
+        @param scope 1 for the global variables, 0 for the local variables
+        @type int
+        @return tuple of the scope, which is -1 if there are no such
+            variables, the variables dictionary and the frame
+        @rtype tuple of (int, dict, frame object)
+        """
         frmnr += self.currentThread.skipFrames
         f = self.currentThread.getCurrentFrame()
         
@@ -1509,6 +2674,7 @@ class DebugClientBase(object):
             f = f.f_back
             frmnr -= 1
         
+        varDict = None
         if f is None:
             if scope:
                 varDict = self.debugMod.__dict__
@@ -1521,40 +2687,78 @@ class DebugClientBase(object):
         else:
             varDict = f.f_locals
         
-        varlist = []
+        return scope, varDict, f
+    
+    def __resolveVariable(self, varDict, var, resolved):
+        """
+        Private method to resolve a variable given by its list encoded name.
         
-        if scope != -1:
-            variable = varDict
-            for attribute in var:
-                attribute = self.__extractIndicators(attribute)[0]
-                typeObject, typeName, typeStr, resolver = \
-                    DebugVariables.getType(variable)
-                if resolver:
-                    variable = resolver.resolve(variable, attribute)
-                    if variable is None:
-                        break
-                    
-                else:
-                    break
-                
-            if variable is not None:
-                typeObject, typeName, typeStr, resolver = \
-                    DebugVariables.getType(variable)
-                if typeStr.startswith(("PyQt5.", "PyQt4.")):
-                    vlist = self.__formatQtVariable(variable, typeName)
-                    varlist.extend(vlist)
-                elif resolver:
-                    varDict = resolver.getDictionary(variable)
-                    vlist = self.__formatVariablesList(
-                        list(varDict.keys()), varDict, scope, filterList,
-                        maxSize=maxSize)
-                    varlist.extend(vlist)
+        @param varDict variables dictionary the name starts in
+        @type dict
+        @param var list encoded name of the variable
+        @type list of str
+        @param resolved dictionary of the variables resolved so far indexed
+            by the tuple of their names, it is updated
+        @type dict
+        @return resolved variable, None if it doesn't exist
+        @rtype any
+        """
+        # start at the longest part of the name resolved before
+        depth = len(var)
+        while depth > 0 and tuple(var[:depth]) not in resolved:
+            depth -= 1
+        variable = resolved[tuple(var[:depth])] if depth else varDict
+        
+        while depth < len(var) and variable is not None:
+            resolver = DebugVariables.getType(variable)[3]
+            if not resolver:
+                break
+            
+            attribute = self.__extractIndicators(var[depth])[0]
+            variable = resolver.resolve(variable, attribute)
+            depth += 1
+            resolved[tuple(var[:depth])] = variable
         
-        self.sendJsonCommand("ResponseVariable", {
-            "scope": scope,
-            "variable": var,
-            "variables": varlist,
-        })
+        return variable
+    
+    def __expandVariable(self, variable, scope, filterList, maxSize,
+                         window=None):
+        """
+        Private method to format the variables contained in a variable.
+        
+        @param variable variable to be expanded
+        @type any
+        @param scope 1 to report global variables, 0 for local variables
+        @type int
+        @param filterList the indices of variable types to be filtered
+        @type list of int
+        @param maxSize maximum size the formatted value of a variable will
+            be shown. If it is bigger than that, the value is cut off and
+            ends with a truncation marker.
+        @type int
+        @param window index of the first item and number of items to be
+            formatted or None for the first items
+        @type tuple of (int, int)
+        @return list of formatted variables
+        @rtype list
+        """
+        varlist = []
+        if variable is not None:
+            typeObject, typeName, typeStr, resolver = \
+                DebugVariables.getType(variable)
+            if typeStr.startswith(("PyQt5.", "PyQt4.")):
+                vlist = self.__formatQtVariable(variable, typeName)
+                varlist.extend(vlist)
+            elif resolver:
+                if window is None:
+                    varDict = resolver.getDictionary(variable)
+                else:
+                    varDict = resolver.getWindow(variable, *window)
+                vlist = self.__formatVariablesList(
+                    list(varDict.keys()), varDict, scope, filterList,
+                    maxSize=maxSize)
+                varlist.extend(vlist)
+        return varlist
         
     def __extractIndicators(self, var):
         """
@@ -1718,7 +2922,8 @@ class DebugClientBase(object):
         return varlist
     
     def __formatVariablesList(self, keylist, dict_, scope, filterList=None,
-                              formatSequences=False, maxSize=0):
+                              formatSequences=False, maxSize=0,
+                              formattedValues=None):
         """
         Private method to produce a formated variables list.
         
@@ -1746,15 +2951,20 @@ class DebugClientBase(object):
             number of items contained in these variables is returned.
         @type bool
         @param maxSize maximum size the formatted value of a variable will
-            be shown. If it is bigger than that, a 'too big' indication will
-            be placed in the value field.
+            be shown. If it is bigger than that, the value is cut off and
+            ends with a truncation marker.
         @type int
+        @param formattedValues dictionary of tuples of an immutable value and
+            its formatted value indexed by the variable name. The formatted
+            value is reused, if the variable still refers to this value.
+        @type dict
         @return A tuple consisting of a list of formatted variables. Each
             variable entry is a tuple of three elements, the variable name,
             its type and value.
         @rtype list of tuple of (str, str, str)
         """
-        filterList = [] if filterList is None else filterList[:]
+        filterList = frozenset(filterList or ())
+        formatter = ValueFormatter(maxSize) if maxSize else None
         
         varlist = []
         if scope:
@@ -1784,76 +2994,30 @@ class DebugClientBase(object):
                 valtype = 'module'
             else:
                 value = dict_[key]
-                valtypestr = str(type(value))[1:-1]
-                _, valtype = valtypestr.split(' ', 1)
-                valtype = valtype[1:-1]
-                valtypename = type(value).__name__
-                if valtype not in ConfigVarTypeStrings:
-                    if valtype in ["numpy.ndarray", "array.array"]:
-                        if ConfigVarTypeStrings.index('list') in filterList:
-                            continue
-                    elif valtypename == "MultiValueDict":
-                        if ConfigVarTypeStrings.index('dict') in filterList:
-                            continue
-                    elif valtype == "sip.methoddescriptor":
-                        if ConfigVarTypeStrings.index(
-                                'method') in filterList:
-                            continue
-                    elif valtype == "sip.enumtype":
-                        if ConfigVarTypeStrings.index('class') in filterList:
-                            continue
-                    elif ConfigVarTypeStrings.index('instance') in filterList:
-                        continue
-                    
-                    if (not valtypestr.startswith('type ') and
-                            valtypename not in
-                            ["ndarray", "MultiValueDict", "array"]):
-                        valtype = valtypestr
-                else:
-                    try:
-                        # Strip 'instance' to be equal with Python 3
-                        if valtype == "instancemethod":
-                            valtype = "method"
-                        
-                        if ConfigVarTypeStrings.index(valtype) in filterList:
-                            continue
-                    except ValueError:
-                        if valtype == "classobj":
-                            if ConfigVarTypeStrings.index(
-                                    'instance') in filterList:
-                                continue
-                        elif valtype == "sip.methoddescriptor":
-                            if ConfigVarTypeStrings.index(
-                                    'method') in filterList:
-                                continue
-                        elif valtype == "sip.enumtype":
-                            if ConfigVarTypeStrings.index('class') in \
-                                    filterList:
-                                continue
-                        elif not valtype.startswith("PySide") and \
-                            (ConfigVarTypeStrings.index('other') in
-                             filterList):
-                            continue
+                typeInfo = DebugVariables.getTypeInfo(type(value))
+                if typeInfo.filterIndex in filterList:
+                    continue
+                valtype = typeInfo.valueType
                 
                 try:
-                    if valtype in ['list', 'tuple', 'dict', 'set',
-                                   'frozenset', 'array.array']:
-                        if valtype == 'dict':
-                            rvalue = "{0:d}".format(len(value.keys()))
-                        else:
-                            rvalue = "{0:d}".format(len(value))
-                    elif valtype == "numpy.ndarray":
+                    itemsCount = typeInfo.itemsCount
+                    if itemsCount == "len":
+                        rvalue = "{0:d}".format(len(value))
+                    elif itemsCount == "size":
                         rvalue = "{0:d}".format(value.size)
-                    elif valtypename == "MultiValueDict":
+                    elif itemsCount == "keys":
                         rvalue = "{0:d}".format(len(value.keys()))
-                        valtype = "django.MultiValueDict"  # shortened type
+                    elif (formattedValues and key in formattedValues and
+                          formattedValues[key][0] is value):
+                        rvalue = formattedValues[key][1]
                     else:
-                        rvalue = repr(value)
+                        if formatter is None:
+                            rvalue = repr(value)
+                        else:
+                            rvalue = formatter.format(value)
                         if valtype.startswith('class') and \
                            rvalue[0] in ['{', '(', '[']:
                             rvalue = ""
-                        elif maxSize and len(rvalue) > maxSize:
-                            rvalue = "@@TOO_BIG_TO_SHOW@@"
                 except Exception:
                     rvalue = ''
             
@@ -1952,12 +3116,14 @@ class DebugClientBase(object):
 
     def startDebugger(self, filename=None, host=None, port=None,
                       enableTrace=True, exceptions=True, tracePython=False,
-                      redirect=True):
+                      redirect=True, zeroTrace=False, detached=False):
         """
         Public method used to start the remote debugger.
         
         @param filename the program to be debugged (string)
-        @param host hostname of the debug server (string)
+        @param host hostname of the debug server, "unix:" followed by the
+            path of a Unix domain socket or "fd:" followed by the number of
+            an inherited socket (string)
         @param port portnumber of the debug server (int)
         @param enableTrace flag to enable the tracing function (boolean)
         @param exceptions flag to enable exception reporting of the IDE
@@ -1966,6 +3132,12 @@ class DebugClientBase(object):
             (boolean)
         @param redirect flag indicating redirection of stdin, stdout and
             stderr (boolean)
+        @param zeroTrace flag indicating to handle breakpoints without a
+            trace function and to trace only while stepping (boolean)
+        @param detached flag indicating to install no trace function until
+            a breakpoint or watch expression is set or a thread steps. The
+            commands of the IDE are handled by the command reader thread
+            meanwhile (boolean)
         """
         global debugClient
         if host is None:
@@ -1996,13 +3168,20 @@ class DebugClientBase(object):
         self.attachThread(mainThread=True)
         self.mainThread.tracePythonLibs(tracePython)
         
+        if zeroTrace:
+            self.monitor = DebugMonitor(self, zeroTrace=True)
+        
         # set the system exception handling function to ensure, that
         # we report on all unhandled exceptions
         sys.excepthook = self.__unhandled_exception
         self.__interceptSignals()
         
         # now start debugging
-        if enableTrace:
+        if detached:
+            self.detached = True
+            self.updateTracer()
+            sys.setprofile(self.callTraceEnabled)
+        elif enableTrace:
             self.mainThread.set_trace()
     
     def startProgInDebugger(self, progargs, wd='', host=None,
@@ -2014,7 +3193,9 @@ class DebugClientBase(object):
         @param progargs commandline for the program to be debugged
             (list of strings)
         @param wd working directory for the program execution (string)
-        @param host hostname of the debug server (string)
+        @param host hostname of the debug server, "unix:" followed by the
+            path of a Unix domain socket or "fd:" followed by the number of
+            an inherited socket (string)
         @param port portnumber of the debug server (int)
         @param exceptions flag to enable exception reporting of the IDE
             (boolean)
@@ -2089,6 +3270,10 @@ class DebugClientBase(object):
         @param host hostname of the debug server (string)
         @return IP address (string)
         """
+        if host.startswith(("unix:", "fd:")):
+            # a local transport
+            return host
+        
         try:
             host, version = host.split("@@")
         except ValueError:
@@ -2227,11 +3412,14 @@ class DebugClientBase(object):
             self.eventLoop(True)
         pid = DebugClientOrigFork()
         if pid == 0:
-            # child
+            # child, threads don't survive a fork
+            self.writestream.writer.forked()
             if not self.fork_child:
                 sys.settrace(None)
                 sys.setprofile(None)
                 self.sessionClose(False)
+            else:
+                self.startCommandReader()
         else:
             # parent
             if self.fork_child:
@@ -14,9 +14,31 @@ HasCoverage = 0x0008
 HasCompleter = 0x0010
 HasUnittest = 0x0020
 HasShell = 0x0040
+HasBatchBreakpoints = 0x0080
+# the detached mode reaches threads running already, i.e. Python 3.12+;
+# before only the main thread and threads started later on are traced
+HasDetachedAllThreads = 0x0100
+HasBinaryEncoding = 0x0200
+HasCompression = 0x0400
+HasCallTraceModes = 0x0800
+HasBatchCommands = 0x1000
+HasRequestIds = 0x2000
+HasVariableDeltas = 0x4000
+HasVariablePaging = 0x8000
+HasBufferTransfer = 0x10000
 
 HasAll = HasDebugger | HasInterpreter | HasProfiler | \
-    HasCoverage | HasCompleter | HasUnittest | HasShell
+    HasCoverage | HasCompleter | HasUnittest | HasShell | \
+    HasBatchBreakpoints | HasDetachedAllThreads | HasBinaryEncoding | \
+    HasCompression | HasCallTraceModes | HasBatchCommands | HasRequestIds | \
+    HasVariableDeltas | HasVariablePaging | HasBufferTransfer
+
+# message encodings understood by the client, JSON is always supported
+Encodings = ["json", "msgpack"]
+
+# call trace modes of the client, events sends one message per call and
+# return
+CallTraceModes = ["events", "batched", "aggregated", "sampled"]
 
 #
 # eflag: noqa = M702
@@ -0,0 +1,445 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing a trace backend based on sys.monitoring (PEP 669).
+"""
+
+import sys
+import os
+import threading
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins      # __IGNORE_WARNING__
+
+from .BreakpointWatch import Breakpoint, Watch
+from .CodePatcher import CodePatcher, HookName
+
+MonitoringAvailable = hasattr(sys, "monitoring")
+
+
+class DebugMonitor(object):
+    """
+    Class implementing the sys.monitoring trace backend of Python 3.12+.
+
+    Only code objects containing breakpoints get LINE events. Lines without
+    a breakpoint are disabled on their first hit and code objects without a
+    breakpoint never receive more than one PY_START event. Stepping is left
+    to the settrace based trace function of the thread's DebugBase object,
+    which is installed only as long as the thread is stepping.
+    
+    In zero trace mode LINE events are enabled just for the code objects
+    holding a breakpoint. These are the ones of the live functions and, as
+    long as there are breakpoints, the ones started later, which get a
+    single PY_START event. Before Python 3.12 the live functions get a
+    patched code object calling a breakpoint hook instead and the functions
+    of modules imported later are patched after the import. Statements
+    executed while such a module is imported are not covered. Watch
+    expressions are evaluated only while stepping in this mode.
+    """
+    ToolName = "eric6 debugger"
+
+    def __init__(self, dbgClient, zeroTrace=False):
+        """
+        Constructor
+
+        @param dbgClient the owning client
+        @type DebugClient
+        @keyparam zeroTrace flag indicating to run without any global event
+        @type bool
+        """
+        self._dbgClient = dbgClient
+        self.zeroTrace = zeroTrace
+        self.active = False
+
+        # code objects with enabled LINE events indexed by id(code)
+        self.__lineCodes = {}
+        self.__patcher = None
+        
+        # import hook of the zero trace mode before Python 3.12
+        self.__originalImport = None
+        self.__importHook = None
+        self.__moduleNames = set()
+        self.__importState = threading.local()
+
+    def start(self):
+        """
+        Public method to install the monitoring callbacks.
+
+        @return flag indicating a successful start
+        @rtype bool
+        """
+        if self.active:
+            return True
+
+        if MonitoringAvailable:
+            monitoring = sys.monitoring
+            events = monitoring.events
+            toolId = monitoring.DEBUGGER_ID
+            try:
+                monitoring.use_tool_id(toolId, DebugMonitor.ToolName)
+            except ValueError:
+                # another debugger owns the tool id, use the settrace backend
+                return False
+
+            monitoring.register_callback(toolId, events.LINE, self.__line)
+            monitoring.register_callback(
+                toolId, events.PY_START, self.__pyStart)
+            if not self.zeroTrace:
+                monitoring.register_callback(
+                    toolId, events.RAISE, self.__raise)
+                monitoring.register_callback(
+                    toolId, events.PY_RETURN, self.__pyReturn)
+            self.__updateGlobalEvents()
+        elif self.zeroTrace:
+            self.__patcher = CodePatcher()
+            setattr(sys, HookName, self.__breakpointHook)
+            self.__installImportHook()
+        else:
+            return False
+
+        self.active = True
+        if self.zeroTrace:
+            for filename in list(Breakpoint.breakInFile.keys()):
+                self.__updateFile(filename)
+        return True
+
+    def stop(self):
+        """
+        Public method to remove the monitoring callbacks.
+        """
+        if not self.active:
+            return
+
+        self.active = False
+        if self.__patcher is not None:
+            self.__removeImportHook()
+            self.__patcher.unpatchFunctions()
+            self.__patcher = None
+            # frames of patched code may still be running
+            setattr(sys, HookName, lambda: None)
+            return
+
+        monitoring = sys.monitoring
+        events = monitoring.events
+        toolId = monitoring.DEBUGGER_ID
+        monitoring.set_events(toolId, events.NO_EVENTS)
+        for code in self.__lineCodes.values():
+            monitoring.set_local_events(toolId, code, events.NO_EVENTS)
+        self.__lineCodes.clear()
+        for event in (events.PY_START, events.LINE, events.RAISE,
+                      events.PY_RETURN):
+            monitoring.register_callback(toolId, event, None)
+        monitoring.free_tool_id(toolId)
+
+    def breakpointsChanged(self, filename=None, added=True):
+        """
+        Public method to adapt the backend to changed breakpoints or watch
+        expressions.
+        
+        After adding one all disabled events have to be re-enabled, because
+        code objects and lines may have been disabled before. In zero trace
+        mode the live functions of the file are (un)patched.
+
+        @keyparam filename name of the file of a changed breakpoint or None
+            for a changed watch expression
+        @type str
+        @keyparam added flag indicating an added breakpoint or watch
+        @type bool
+        """
+        if not self.active:
+            return
+
+        if self.zeroTrace and filename is not None:
+            self.__updateFile(os.path.abspath(filename))
+        if self.__patcher is None:
+            self.__updateGlobalEvents()
+        if added and MonitoringAvailable:
+            if not self.zeroTrace:
+                if filename is None:
+                    # code objects with LINE events may need PY_RETURN now
+                    for code in list(self.__lineCodes.values()):
+                        self.__enableLineEvents(code)
+                self.__updateRunningCode()
+            sys.monitoring.restart_events()
+
+    def __updateGlobalEvents(self):
+        """
+        Private method to enable the global events needed for the current
+        breakpoints.
+
+        Exceptions are reported only for code objects containing a
+        breakpoint, so RAISE events are enabled only while there are
+        breakpoints. Stepping threads get their exceptions from the trace
+        function. In zero trace mode PY_START events are needed only while
+        there are breakpoints and no RAISE event is used.
+        """
+        events = sys.monitoring.events
+        if self.zeroTrace:
+            eventSet = events.NO_EVENTS
+        else:
+            eventSet = events.PY_START
+        if Breakpoint.breakInFile:
+            eventSet |= events.PY_START
+            if not self.zeroTrace:
+                eventSet |= events.RAISE
+        sys.monitoring.set_events(sys.monitoring.DEBUGGER_ID, eventSet)
+
+    def __updateRunningCode(self):
+        """
+        Private method to enable the LINE events of running code objects.
+
+        The PY_START event of a running code object is over, e.g. the one of
+        the module of a program stopped at its first line, so a breakpoint
+        added to it would never be hit.
+        """
+        fixFrameFilename = self._dbgClient.fix_frame_filename
+        for frame in sys._current_frames().values():
+            while frame is not None:
+                code = frame.f_code
+                if id(code) not in self.__lineCodes:
+                    try:
+                        lines = Breakpoint.breakInCode[id(code)]
+                    except KeyError:
+                        lines = Breakpoint.indexCode(
+                            code, fixFrameFilename(frame))
+                    if lines or Watch.getWatches(code):
+                        self.__enableLineEvents(code)
+                frame = frame.f_back
+
+    def __enableLineEvents(self, code):
+        """
+        Private method to enable the LINE events of a code object.
+
+        Code objects with relevant watch expressions get PY_RETURN events as
+        well to release the values stored for their frames.
+
+        @param code code object
+        @type code object
+        """
+        events = sys.monitoring.events
+        eventSet = events.LINE
+        if not self.zeroTrace and Watch.getWatches(code):
+            eventSet |= events.PY_RETURN
+        self.__lineCodes[id(code)] = code
+        sys.monitoring.set_local_events(
+            sys.monitoring.DEBUGGER_ID, code, eventSet)
+
+    def __updateFile(self, filename):
+        """
+        Private method to enable the breakpoints of a file in zero trace mode.
+
+        @param filename file name of the breakpoints
+        @type str
+        """
+        lines = Breakpoint.breakInFile.get(filename, set())
+        if self.__patcher is not None:
+            self.__patcher.patchFile(filename, lines)
+            return
+
+        codes = {}
+        for func in CodePatcher.liveFunctions(filename):
+            for code in CodePatcher.codeObjects(func.__code__):
+                codes[id(code)] = code
+        # code objects of the file run already, e.g. ones of closures
+        for codeRef in list(Breakpoint.codeInFile.get(filename, {}).values()):
+            code = codeRef()
+            if code is not None:
+                codes[id(code)] = code
+
+        for code in codes.values():
+            if (Breakpoint.indexCode(code, filename) and
+                    id(code) not in self.__lineCodes):
+                self.__enableLineEvents(code)
+
+    def __installImportHook(self):
+        """
+        Private method to wrap the import function to patch the functions
+        of modules imported later.
+        """
+        originalImport = builtins.__import__
+        importedModules = self.__importedModules
+        importState = self.__importState
+
+        def importHook(*args, **kwargs):
+            """
+            Function wrapping the import function.
+
+            @param args positional arguments of the import function
+            @type tuple
+            @param kwargs keyword arguments of the import function
+            @type dict
+            @return imported module
+            @rtype module
+            """
+            depth = getattr(importState, "depth", 0)
+            importState.depth = depth + 1
+            try:
+                module = originalImport(*args, **kwargs)
+            finally:
+                importState.depth = depth
+            if depth == 0:
+                # the functions of nested imports are complete now
+                importedModules()
+            return module
+
+        self.__originalImport = originalImport
+        self.__importHook = importHook
+        self.__moduleNames = set(sys.modules)
+        builtins.__import__ = importHook
+
+    def __removeImportHook(self):
+        """
+        Private method to restore the import function.
+        """
+        if builtins.__import__ is self.__importHook:
+            builtins.__import__ = self.__originalImport
+        # a hook wrapped by somebody else stays, but does nothing anymore
+        self.__originalImport = None
+        self.__importHook = None
+        self.__moduleNames = set()
+
+    def __importedModules(self):
+        """
+        Private method to patch the functions of the newly imported modules
+        containing a breakpoint.
+        """
+        patcher = self.__patcher
+        if patcher is None or len(sys.modules) == len(self.__moduleNames):
+            return
+
+        moduleNames = set(list(sys.modules.keys()))
+        newNames = moduleNames - self.__moduleNames
+        self.__moduleNames = moduleNames
+        filenames = set()
+        for name in newNames:
+            fn = getattr(sys.modules.get(name), "__file__", None)
+            if fn:
+                fn = CodePatcher.fixupFilename(fn)
+                if fn in Breakpoint.breakInFile:
+                    filenames.add(fn)
+        for filename in filenames:
+            self.__updateFile(filename)
+
+    def __pyStart(self, code, instructionOffset):
+        """
+        Private method handling the PY_START event.
+
+        @param code code object being started
+        @type code object
+        @param instructionOffset offset of the first instruction
+        @type int
+        @return DISABLE to suppress further events for this code object
+        @rtype object
+        """
+        try:
+            lines = Breakpoint.breakInCode[id(code)]
+        except KeyError:
+            # PY_START is raised in the threads of the debugger as well,
+            # which must not wait for the client lock
+            frame = sys._getframe(1)
+            lines = Breakpoint.indexCode(
+                code, self._dbgClient.fix_frame_filename(frame))
+
+        if ((lines or (not self.zeroTrace and Watch.getWatches(code))) and
+                id(code) not in self.__lineCodes):
+            self.__enableLineEvents(code)
+
+        return sys.monitoring.DISABLE
+
+    def __line(self, code, lineNo):
+        """
+        Private method handling the LINE event.
+
+        @param code code object being executed
+        @type code object
+        @param lineNo line number about to be executed
+        @type int
+        @return DISABLE to suppress further events for this line
+        @rtype object
+        """
+        if sys.gettrace() is not None:
+            # the thread is stepping, the trace function handles this line
+            return None
+
+        if (lineNo not in Breakpoint.breakInCode.get(id(code), ()) and
+                (self.zeroTrace or not Watch.getWatches(code))):
+            return sys.monitoring.DISABLE
+
+        self.__breakHere(sys._getframe(1))
+        return None
+
+    def __pyReturn(self, code, instructionOffset, retval):
+        """
+        Private method handling the PY_RETURN event.
+
+        It isn't raised for yields, so the values of generator frames are
+        kept until the generator is finished.
+
+        @param code code object returning
+        @type code object
+        @param instructionOffset offset of the return instruction
+        @type int
+        @param retval value being returned
+        @type any
+        @return DISABLE to suppress further events for this return
+        @rtype object
+        """
+        if not Watch.getWatches(code):
+            return sys.monitoring.DISABLE
+
+        Watch.releaseFrame(sys._getframe(1))
+        return None
+
+    def __breakpointHook(self):
+        """
+        Private method called by the functions patched in zero trace mode.
+        """
+        if sys.gettrace() is None:
+            self.__breakHere(sys._getframe(1))
+
+    def __breakHere(self, frame):
+        """
+        Private method to stop at a breakpoint.
+
+        @param frame the frame object
+        @type frame object
+        """
+        dbg = self._dbgClient.getThread()
+        if dbg.break_here(frame):
+            dbg.user_line(frame)
+            if dbg.isStepping():
+                # getStack() already applied the trace function to the frames
+                sys.settrace(dbg.trace_dispatch)
+
+    def __raise(self, code, instructionOffset, exception):
+        """
+        Private method handling the RAISE event.
+
+        Like with the settrace backend, exceptions are only reported for
+        code objects being traced, i.e. containing a breakpoint.
+
+        @param code code object raising the exception
+        @type code object
+        @param instructionOffset offset of the raising instruction
+        @type int
+        @param exception the raised exception
+        @type BaseException
+        """
+        if sys.gettrace() is not None or not Breakpoint.breakInCode.get(
+                id(code)):
+            return
+
+        frame = sys._getframe(1)
+        dbg = self._dbgClient.getThread()
+        dbg.dispatch_exception(
+            frame, (type(exception), exception, exception.__traceback__))
+        if dbg.isStepping():
+            sys.settrace(dbg.trace_dispatch)
+
+#
+# eflag: noqa = M702
@@ -9,6 +9,19 @@ Module implementing utilities functions for the debug client.
 
 import json
 
+try:
+    import zlib
+    CompressionAvailable = True
+except ImportError:
+    zlib = None
+    CompressionAvailable = False
+
+from .BinaryCodec import packMessage, packMessageParts
+
+# first byte of a compressed message, JSON and binary encoded messages never
+# start with it
+CompressedMessageFlag = b"z"
+
 #
 # Taken from inspect.py of Python 3.4
 #
@@ -126,7 +139,7 @@ def formatargvalues(args, varargs, varkw, localsDict,
     return argvalues
 
 
-def prepareJsonCommand(method, params):
+def prepareJsonCommand(method, params, requestId=None):
     """
     Function to prepare a single command or response for transmission to
     the IDE.
@@ -135,6 +148,8 @@ def prepareJsonCommand(method, params):
     @type str
     @param params dictionary of named parameters for the command or response
     @type dict
+    @keyparam requestId id of the request answered by the response
+    @type int or str
     @return prepared JSON command or response string
     @rtype str
     """
@@ -143,7 +158,112 @@ def prepareJsonCommand(method, params):
         "method": method,
         "params": params,
     }
+    if requestId is not None:
+        commandDict["id"] = requestId
     return json.dumps(commandDict) + '\n'
 
+
+def prepareBinaryCommand(method, params, requestId=None):
+    """
+    Function to prepare a single command or response for transmission to
+    the IDE using the binary encoding.
+    
+    The encoded message is prefixed by its length as a 9 character long
+    decimal number. It is told apart from a JSON message by its first
+    character, which is always a digit.
+    
+    @param method command or response name to be sent
+    @type str
+    @param params dictionary of named parameters for the command or response
+    @type dict
+    @keyparam requestId id of the request answered by the response
+    @type int or str
+    @return prepared binary command or response
+    @rtype bytes
+    """
+    commandDict = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+    }
+    if requestId is not None:
+        commandDict["id"] = requestId
+    data = packMessage(commandDict)
+    return "{0:09d}".format(len(data)).encode() + data
+
+
+def prepareBufferCommand(method, params, requestId=None):
+    """
+    Function to prepare a single command or response containing raw data for
+    transmission to the IDE using the binary encoding.
+    
+    The command is encoded like one prepared by prepareBinaryCommand, but
+    the byte arrays and memoryviews of its parameters are kept as separate
+    parts of it, so that they are sent without copying them.
+    
+    @param method command or response name to be sent
+    @type str
+    @param params dictionary of named parameters for the command or response
+    @type dict
+    @keyparam requestId id of the request answered by the response
+    @type int or str
+    @return parts of the prepared binary command or response
+    @rtype list of bytes, bytearray or memoryview
+    """
+    commandDict = {
+        "jsonrpc": "2.0",
+        "method": method,
+        "params": params,
+    }
+    if requestId is not None:
+        commandDict["id"] = requestId
+    parts = packMessageParts(commandDict)
+    length = sum(len(part) for part in parts)
+    return ["{0:09d}".format(length).encode()] + parts
+
+
+def compressCommand(data, level):
+    """
+    Function to compress a prepared command or response.
+    
+    The compressed message is prefixed by its length as a 9 character long
+    decimal number like a binary encoded one. Its first byte is
+    CompressedMessageFlag followed by the zlib compressed JSON string or
+    binary encoding of the message.
+    
+    @param data JSON command or response as prepared by prepareJsonCommand
+        or binary command or response as prepared by prepareBinaryCommand
+    @type bytes
+    @param level zlib compression level
+    @type int
+    @return compressed command or response
+    @rtype bytes
+    """
+    if data[:1] == b"{":
+        message = data.rstrip(b"\n")
+    else:
+        # strip the length field
+        message = data[9:]
+    compressed = CompressedMessageFlag + zlib.compress(message, level)
+    return "{0:09d}".format(len(compressed)).encode() + compressed
+
+
+def decompressCommand(data):
+    """
+    Function to decompress a received command.
+    
+    @param data command as received
+    @type bytes
+    @return JSON string or binary encoding of the command, the command as
+        received, if it isn't compressed or can't be decompressed
+    @rtype bytes
+    """
+    if data[:1] == CompressedMessageFlag and zlib is not None:
+        try:
+            return zlib.decompress(data[1:])
+        except zlib.error:
+            pass
+    return data
+
 #
 # eflag: noqa = M702
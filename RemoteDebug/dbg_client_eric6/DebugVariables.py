@@ -11,11 +11,54 @@ Module implementing classes and functions to dump variable contents.
 # This code was inspired by pydevd.
 #
 
+import itertools
+from collections import namedtuple
+
+from .DebugConfig import ConfigVarTypeStrings
+from .ArraySummary import ArraySummaries
+
 MaxItemsToHandle = 300
 TooLargeMessage = ("Too large to show contents. Max items to show: " +
                    str(MaxItemsToHandle))
 TooLargeAttribute = "Too large to be handled."
 
+
+def _windowRange(length, start, count):
+    """
+    Protected function to clip a window of items to the items of a container.
+    
+    A window contains at most MaxItemsToHandle items.
+    
+    @param length number of items of the container
+    @type int
+    @param start index of the first item of the window
+    @type int
+    @param count number of items of the window
+    @type int
+    @return tuple of the index of the first item and the index after the
+        last item
+    @rtype tuple of (int, int)
+    """
+    start = min(max(start, 0), length)
+    count = min(max(count, 0), MaxItemsToHandle)
+    return start, min(start + count, length)
+
+
+def _iterItems(var):
+    """
+    Protected function to iterate over the items of a dictionary without
+    copying them.
+    
+    @param var dictionary to iterate over
+    @type dict
+    @return iterator over the tuples of key and value
+    @rtype iterator
+    """
+    try:
+        return var.iteritems()      # Python 2
+    except AttributeError:
+        return iter(var.items())
+
 ############################################################
 ## Classes implementing resolvers for various compund types
 ############################################################
@@ -52,6 +95,24 @@ class BaseResolver(object):
             implementation
         """     # __IGNORE_WARNING_D235__
         raise NotImplementedError
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        Variables without items return all their attributes.
+        
+        @param var variable to be converted
+        @type any
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        return self.getDictionary(var)
 
 
 ############################################################
@@ -176,6 +237,37 @@ class DictResolver(BaseResolver):
         d.update(additionals)
         
         return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        The items are taken in the iteration order of the dictionary, which
+        doesn't change as long as the dictionary isn't changed. The additional
+        fields are part of the first window only.
+        
+        @param var variable to be converted
+        @type dict
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        d = {}
+        start, stop = _windowRange(len(var), start, count)
+        for key, value in itertools.islice(_iterItems(var), start, stop):
+            key = "{0} (ID:{1})".format(self.keyToStr(key), id(key))
+            d[key] = value
+        
+        if start == 0:
+            # in case it has additional fields
+            additionals = defaultResolver.getDictionary(var)
+            d.update(additionals)
+        
+        return d
 
 
 ############################################################
@@ -231,6 +323,34 @@ class ListResolver(BaseResolver):
         d.update(additionals)
         
         return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        The additional fields are part of the first window only.
+        
+        @param var variable to be converted
+        @type tuple or list
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        d = {}
+        start, stop = _windowRange(len(var), start, count)
+        for index, value in enumerate(var[start:stop], start):
+            d[str(index)] = value
+        
+        if start == 0:
+            # in case it has additional fields
+            additionals = defaultResolver.getDictionary(var)
+            d.update(additionals)
+        
+        return d
 
 
 ############################################################
@@ -294,6 +414,36 @@ class SetResolver(BaseResolver):
         d.update(additionals)
         
         return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        The items are taken in the iteration order of the set, which doesn't
+        change as long as the set isn't changed. The additional fields are
+        part of the first window only.
+        
+        @param var variable to be converted
+        @type set or frozenset
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        d = {}
+        start, stop = _windowRange(len(var), start, count)
+        for value in itertools.islice(var, start, stop):
+            d["ID: " + str(id(value))] = value
+        
+        if start == 0:
+            # in case it has additional fields
+            additionals = defaultResolver.getDictionary(var)
+            d.update(additionals)
+        
+        return d
 
 
 ############################################################
@@ -305,6 +455,9 @@ class NdArrayResolver(BaseResolver):
     """
     Class used to resolve from numpy ndarray including some meta data.
     """
+    SummaryAttributes = ('min', 'max', 'mean', 'std', 'nans', 'histogram',
+                         'edges', 'sampleStep')
+    
     def __isNumeric(self, arr):
         """
         Private method to check, if an array is of a numeric type.
@@ -333,21 +486,9 @@ class NdArrayResolver(BaseResolver):
         if attribute == '__internals__':
             return defaultResolver.getDictionary(var)
         
-        if attribute == 'min':
-            if self.__isNumeric(var):
-                return var.min()
-            else:
-                return None
-        
-        if attribute == 'max':
-            if self.__isNumeric(var):
-                return var.max()
-            else:
-                return None
-        
-        if attribute == 'mean':
-            if self.__isNumeric(var):
-                return var.mean()
+        if attribute in NdArrayResolver.SummaryAttributes:
+            if self.__isNumeric(var) and var.size > 0:
+                return arraySummaries.summary(var).get(attribute)
             else:
                 return None
         
@@ -361,15 +502,7 @@ class NdArrayResolver(BaseResolver):
             return var.size
         
         if attribute.startswith('['):
-            container = NdArrayItemsContainer()
-            count = 0
-            for element in var:
-                setattr(container, str(count), element)
-                count += 1
-                if count > MaxItemsToHandle:
-                    setattr(container, TooLargeAttribute, TooLargeMessage)
-                    break
-            return container
+            return NdArrayItemsContainer(var)
         
         return None
     
@@ -384,37 +517,49 @@ class NdArrayResolver(BaseResolver):
         """
         d = {}
         d['__internals__'] = defaultResolver.getDictionary(var)
-        if var.size > 1024 * 1024:
-            d['min'] = 'ndarray too big, calculating min would slow down' \
-                       ' debugging'
-            d['max'] = 'ndarray too big, calculating max would slow down' \
-                       ' debugging'
-        else:
-            if self.__isNumeric(var):
-                if var.size == 0:
-                    d['min'] = 'empty array'
-                    d['max'] = 'empty array'
-                    d['mean'] = 'empty array'
-                else:
-                    d['min'] = var.min()
-                    d['max'] = var.max()
-                    d['mean'] = var.mean()
+        if self.__isNumeric(var):
+            if var.size == 0:
+                d['min'] = 'empty array'
+                d['max'] = 'empty array'
+                d['mean'] = 'empty array'
             else:
-                d['min'] = 'not a numeric object'
-                d['max'] = 'not a numeric object'
-                d['mean'] = 'not a numeric object'
+                # huge arrays are summarized from a sample of their elements
+                summary = arraySummaries.summary(var)
+                for name in ('min', 'max', 'mean', 'std'):
+                    d[name] = summary.get(name, 'all elements are NaN')
+                d['nans'] = summary['nans']
+                if 'histogram' in summary:
+                    d['histogram'] = summary['histogram']
+                    d['edges'] = summary['edges']
+                if summary['sampleStep'] > 1:
+                    d['sampleStep'] = summary['sampleStep']
+        else:
+            d['min'] = 'not a numeric object'
+            d['max'] = 'not a numeric object'
+            d['mean'] = 'not a numeric object'
         d['shape'] = var.shape
         d['dtype'] = var.dtype
         d['size'] = var.size
-        d['[0:{0}]'.format(len(var) - 1)] = list(var[0:MaxItemsToHandle])
+        d['[0:{0}]'.format(len(var) - 1)] = \
+            NdArrayItemsContainer(var).slice(0, MaxItemsToHandle)
         return d
-
-
-class NdArrayItemsContainer:
-    """
-    Class to store ndarray items.
-    """
-    pass
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        @param var variable to be converted
+        @type ndarray
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        return itemsContainerResolver.getWindow(
+            NdArrayItemsContainer(var), start, count)
 
 
 ############################################################
@@ -477,6 +622,29 @@ class MultiValueDictResolver(DictResolver):
         d["___len___"] = len(var)
         
         return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        @param var variable to be converted
+        @type MultiValueDict
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        d = {}
+        start, stop = _windowRange(len(var), start, count)
+        for key in itertools.islice(iter(var.keys()), start, stop):
+            value = var.getlist(key)
+            key = "{0} (ID:{1})".format(self.keyToStr(key), id(key))
+            d[key] = value
+        
+        return d
 
 
 ############################################################
@@ -528,15 +696,7 @@ class ArrayResolver(BaseResolver):
                 return 'illegal type'
         
         if attribute.startswith('['):
-            container = ArrayItemsContainer()
-            count = 0
-            for element in var:
-                setattr(container, str(count), element)
-                count += 1
-                if count > MaxItemsToHandle:
-                    setattr(container, TooLargeAttribute, TooLargeMessage)
-                    break
-            return container
+            return ArrayItemsContainer(var)
         
         return None
     
@@ -556,17 +716,160 @@ class ArrayResolver(BaseResolver):
         else:
             d['type'] = 'illegal type'
         d['itemsize'] = var.itemsize
-        d['[0:{0}]'.format(len(var) - 1)] = var.tolist()[0:MaxItemsToHandle]
+        d['[0:{0}]'.format(len(var) - 1)] = var[0:MaxItemsToHandle].tolist()
         return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        @param var variable to be converted
+        @type array.array
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        return itemsContainerResolver.getWindow(
+            ArrayItemsContainer(var), start, count)
 
 
-class ArrayItemsContainer:
+############################################################
+## Resolver for the items of arrays
+############################################################
+
+
+class ItemsContainer(object):
+    """
+    Base class of the containers giving access to the items of an array.
+    
+    The items are taken from the array, when they are requested.
+    """
+    def __init__(self, items):
+        """
+        Constructor
+        
+        @param items array containing the items
+        @type ndarray or array.array
+        """
+        self.items = items
+    
+    def __len__(self):
+        """
+        Special method to get the number of items.
+        
+        @return number of items
+        @rtype int
+        """
+        return len(self.items)
+    
+    def slice(self, start, stop):
+        """
+        Public method to get a range of items.
+        
+        The items are converted to Python objects by one call instead of
+        one by one.
+        
+        @param start index of the first item
+        @type int
+        @param stop index after the last item
+        @type int
+        @return list of items
+        @rtype list
+        """
+        return self.items[start:stop].tolist()
+
+
+class NdArrayItemsContainer(ItemsContainer):
+    """
+    Class to access ndarray items.
+    """
+    def slice(self, start, stop):
+        """
+        Public method to get a range of items.
+        
+        The items of a one-dimensional array are converted to Python objects
+        by one call, the items of other arrays are the arrays of their rows.
+        
+        @param start index of the first item
+        @type int
+        @param stop index after the last item
+        @type int
+        @return list of items
+        @rtype list
+        """
+        items = self.items[start:stop]
+        if items.ndim == 1:
+            return items.tolist()
+        else:
+            return list(items)
+
+
+class ArrayItemsContainer(ItemsContainer):
     """
-    Class to store array.array items.
+    Class to access array.array items.
     """
     pass
 
 
+class ItemsContainerResolver(BaseResolver):
+    """
+    Class used to resolve from the items of an array.
+    """
+    def resolve(self, var, attribute):
+        """
+        Public method to get an attribute from a variable.
+        
+        @param var variable to extract an attribute or value from
+        @type ItemsContainer
+        @param attribute index of the item to extract
+        @type str
+        @return value of the attribute
+        @rtype any
+        """
+        try:
+            return var.items[int(attribute)]
+        except Exception:
+            return None
+    
+    def getDictionary(self, var):
+        """
+        Public method to get the attributes of a variable as a dictionary.
+        
+        @param var variable to be converted
+        @type ItemsContainer
+        @return dictionary containing the variable attributes
+        @rtype dict
+        """
+        d = self.getWindow(var, 0, MaxItemsToHandle)
+        if len(var) > MaxItemsToHandle:
+            d[TooLargeAttribute] = TooLargeMessage
+        return d
+    
+    def getWindow(self, var, start, count):
+        """
+        Public method to get a window of the items of a variable as a
+        dictionary.
+        
+        @param var variable to be converted
+        @type ItemsContainer
+        @param start index of the first item
+        @type int
+        @param count number of items
+        @type int
+        @return dictionary containing the items of the window
+        @rtype dict
+        """
+        d = {}
+        start, stop = _windowRange(len(var), start, count)
+        for index, value in enumerate(var.slice(start, stop), start):
+            d[str(index)] = value
+        return d
+
+
 defaultResolver = DefaultResolver()
 dictResolver = DictResolver()
 listResolver = ListResolver()
@@ -574,6 +877,11 @@ setResolver = SetResolver()
 ndarrayResolver = NdArrayResolver()
 multiValueDictResolver = MultiValueDictResolver()
 arrayResolver = ArrayResolver()
+itemsContainerResolver = ItemsContainerResolver()
+
+# summaries of the numeric numpy arrays, the debug client clears them
+# whenever the debugged program continues
+arraySummaries = ArraySummaries()
 
 ############################################################
 ## Methods to determine the type of a variable and the
@@ -581,13 +889,33 @@ arrayResolver = ArrayResolver()
 ############################################################
 
 _TypeMap = None
+# resolvers of the types of the type map, the first entry of a type wins
+_TypeResolvers = None
+
+# classification of a type as used to format and filter variables
+#   typeName: name of the type
+#   typeStr: qualified name of the type
+#   resolver: resolver of the variables of the type or None
+#   valueType: type shown for the variables of the type
+#   filterIndex: index into ConfigVarTypeStrings of the type filter hiding
+#       the variables of the type or None
+#   itemsCount: how the number of items is shown instead of the value,
+#       "len" for len(var), "keys" for len(var.keys()), "size" for var.size
+#       or None to show the value itself
+TypeInfo = namedtuple(
+    'TypeInfo',
+    'typeName typeStr resolver valueType filterIndex itemsCount')
+
+_TypeInfos = {}
+# number of classified types kept, dynamically created types may come and go
+MaxTypeInfos = 2048
 
 
 def _initTypeMap():
     """
     Protected function to initialize the type map.
     """
-    global _TypeMap
+    global _TypeMap, _TypeResolvers
     
     _TypeMap = [
         (type(None), None,),
@@ -598,6 +926,7 @@ def _initTypeMap():
         (tuple, listResolver),
         (list, listResolver),
         (dict, dictResolver),
+        (ItemsContainer, itemsContainerResolver),
     ]
     
     try:
@@ -638,6 +967,101 @@ def _initTypeMap():
         # it should go before dict
     except ImportError:
         pass  # django may not be installed
+    
+    _TypeResolvers = {}
+    for typeObject, resolver in _TypeMap:
+        _TypeResolvers.setdefault(typeObject, resolver)
+    _TypeInfos.clear()
+
+
+def _classifyType(typeObject):
+    """
+    Protected function to classify a type.
+    
+    @param typeObject type to be classified
+    @type type
+    @return classification of the type
+    @rtype TypeInfo
+    """
+    typeName = typeObject.__name__
+    typeStr = str(typeObject)[8:-2]
+    
+    if typeStr.startswith(("PyQt5.", "PyQt4.")):
+        resolver = None
+    else:
+        try:
+            # exact type first, the subclasses need the type map
+            resolver = _TypeResolvers[typeObject]
+        except KeyError:
+            for typeData in _TypeMap:
+                if issubclass(typeObject, typeData[0]):
+                    resolver = typeData[1]
+                    break
+            else:
+                resolver = defaultResolver
+    
+    valtypestr = str(typeObject)[1:-1]
+    valtype = valtypestr.split(' ', 1)[1][1:-1]
+    if valtype not in ConfigVarTypeStrings:
+        if valtype in ["numpy.ndarray", "array.array"]:
+            filterIndex = ConfigVarTypeStrings.index('list')
+        elif typeName == "MultiValueDict":
+            filterIndex = ConfigVarTypeStrings.index('dict')
+        elif valtype == "sip.methoddescriptor":
+            filterIndex = ConfigVarTypeStrings.index('method')
+        elif valtype == "sip.enumtype":
+            filterIndex = ConfigVarTypeStrings.index('class')
+        else:
+            filterIndex = ConfigVarTypeStrings.index('instance')
+        
+        if (not valtypestr.startswith('type ') and
+                typeName not in ["ndarray", "MultiValueDict", "array"]):
+            valtype = valtypestr
+    else:
+        # Strip 'instance' to be equal with Python 3
+        if valtype == "instancemethod":
+            valtype = "method"
+        filterIndex = ConfigVarTypeStrings.index(valtype)
+    
+    if valtype in ['list', 'tuple', 'dict', 'set', 'frozenset',
+                   'array.array']:
+        itemsCount = "len"
+    elif valtype == "numpy.ndarray":
+        itemsCount = "size"
+    elif typeName == "MultiValueDict":
+        itemsCount = "keys"
+        valtype = "django.MultiValueDict"   # shortened type
+    else:
+        itemsCount = None
+    
+    return TypeInfo(typeName, typeStr, resolver, valtype, filterIndex,
+                    itemsCount)
+
+
+def getTypeInfo(typeObject):
+    """
+    Public function to get the classification of a type.
+    
+    A type is classified once and the classification is reused for all
+    variables of the type.
+    
+    @param typeObject type to get the classification for
+    @type type
+    @return classification of the type
+    @rtype TypeInfo
+    """
+    try:
+        return _TypeInfos[typeObject]
+    except KeyError:
+        pass
+    
+    if _TypeMap is None:
+        _initTypeMap()
+    
+    if len(_TypeInfos) >= MaxTypeInfos:
+        _TypeInfos.clear()
+    typeInfo = _TypeInfos[typeObject] = _classifyType(typeObject)
+    return typeInfo
 
 
 def getType(obj):
@@ -650,15 +1074,17 @@ def getType(obj):
     @rtype tuple of type, str, str, BaseResolver
     """
     typeObject = type(obj)
-    typeName = typeObject.__name__
-    typeStr = str(typeObject)[8:-2]
+    typeInfo = getTypeInfo(typeObject)
+    resolver = typeInfo.resolver
     
-    if typeStr.startswith(("PyQt5.", "PyQt4.")):
-        resolver = None
-    else:
-        if _TypeMap is None:
-            _initTypeMap()
-        
+    try:
+        cls = obj.__class__
+    except Exception:
+        # e.g. a proxy of a deleted object
+        cls = typeObject
+    if cls is not typeObject and resolver is not None:
+        # objects pretending to be of another class, e.g. weakref.proxy,
+        # are resolved like the class they claim
         for typeData in _TypeMap:
             if isinstance(obj, typeData[0]):
                 resolver = typeData[1]
@@ -666,7 +1092,7 @@ def getType(obj):
         else:
             resolver = defaultResolver
     
-    return typeObject, typeName, typeStr, resolver
+    return typeObject, typeInfo.typeName, typeInfo.typeStr, resolver
 
 #
 # eflag: noqa = M702
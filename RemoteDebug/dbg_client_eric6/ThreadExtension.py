@@ -106,6 +106,36 @@ class ThreadExtension(object):
 
         return ident
     
+    def getThread(self, ident=None):
+        """
+        Public method to get the DebugBase object of a thread.
+        
+        A DebugBase object is created for a thread, which wasn't started
+        under debugger control.
+        
+        @param ident id of the thread (defaults to the current thread)
+        @type int
+        @return DebugBase object of the thread
+        @rtype DebugBase
+        """
+        if ident is None:
+            ident = _thread.get_ident()
+        try:
+            return self.threads[ident]
+        except KeyError:
+            pass
+        
+        self.lockClient()
+        try:
+            newThread = DebugBase(self)
+            newThread.id = ident
+            newThread.name = 'Thread-{0}'.format(self.threadNumber)
+            self.threadNumber += 1
+            self.threads[ident] = newThread
+        finally:
+            self.unlockClient()
+        return newThread
+    
     def threadTerminated(self, threadId):
         """
         Public method called when a DebugThread has exited.
@@ -220,8 +250,8 @@ class ThreadExtension(object):
         """
         frames = sys._current_frames()
         for threadId, frame in frames.items():
-            # skip our own timer thread
-            if frame.f_code.co_name == '__eventPollTimer':
+            # skip the threads of the debug client
+            if self.isClientThread(threadId):
                 continue
             
             # Unknown thread
@@ -244,7 +274,7 @@ class ThreadExtension(object):
         
         # Clean up obsolet because terminated threads
         self.threads = {id_: thrd for id_, thrd in self.threads.items()
-                        if id_ in frames}
+                        if id_ in frames and not self.isClientThread(id_)}
     
     def find_module(self, fullname, path=None):
         """
@@ -311,7 +341,7 @@ class ThreadExtension(object):
                 _debugClient.threads[self.ident] = newThread
                 newThread.name = self.name
                 # see DebugBase.bootstrap
-                sys.settrace(newThread.trace_dispatch)
+                newThread.startTracing()
                 try:
                     run()
                 except Exception:
@@ -388,7 +418,7 @@ class ThreadExtension(object):
                 _debugClient.threads[ident] = newThread
                 
                 # see DebugBase.bootstrap
-                sys.settrace(newThread.trace_dispatch)
+                newThread.startTracing()
                 try:
                     run()
                 except SystemExit:
@@ -0,0 +1,329 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing a formatter creating the value strings of variables with
+a bounded size.
+
+Strings and bytes are sliced before they are converted, builtin containers
+are limited in depth and length like reprlib does and the formatting of the
+parts of a builtin container stops, as soon as enough text was created.
+Omitted parts are shown as "..." and a value, which isn't complete, ends with
+the truncation marker.
+
+The __repr__ methods of other objects always create their complete text,
+which is cut off afterwards, and the time they use can't be limited without
+interrupting them. The first call for a type is unbounded. Once it took
+longer than the time budget, the further objects of the type get the default
+representation until the formatter is discarded, i.e. for the rest of the
+variables request. The layer and layer tree types of QGIS, whose
+representation may query the data provider, get it right from the start.
+"""
+
+import sys
+import time
+from itertools import islice
+
+try:
+    import reprlib
+except ImportError:
+    import repr as reprlib      # Python 2
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+# text shown in place of the omitted parts of a value
+OmissionMarker = "..."
+
+# text appended to a value, which isn't complete, it never ends a complete
+# value like the "@@TOO_BIG_TO_SHOW@@" value known by the IDE
+TruncationMarker = "@@TOO_BIG_TO_SHOW@@"
+
+# time in seconds the __repr__ method of an object may use before the
+# objects of its type get the default representation
+ReprTimeBudget = 0.25
+
+# modules of the types having a special formatting, types of other modules
+# with the same name use their __repr__ method
+BuiltinModules = frozenset(("builtins", "__builtin__", "collections", "array"))
+
+# qualified names of the types known to have a slow __repr__ method, their
+# subclasses get the default representation as well
+SlowTypeNames = frozenset(
+    "qgis._core." + name for name in (
+        "QgsMapLayer", "QgsVectorLayer", "QgsRasterLayer", "QgsMeshLayer",
+        "QgsPluginLayer", "QgsVectorTileLayer", "QgsPointCloudLayer",
+        "QgsAnnotationLayer", "QgsGroupLayer", "QgsTiledSceneLayer",
+        "QgsLayerTreeNode", "QgsLayerTree", "QgsLayerTreeGroup",
+        "QgsLayerTreeLayer", "QgsLayerTreeModel", "QgsProject",
+    ))
+
+
+class ValueFormatter(reprlib.Repr):
+    """
+    Class creating the value strings of variables of a bounded size.
+    """
+    def __init__(self, maxSize):
+        """
+        Constructor
+
+        @param maxSize maximum size of the formatted values
+        @type int
+        """
+        reprlib.Repr.__init__(self)
+
+        self.maxSize = maxSize
+        self.maxstring = self.maxlong = self.maxother = maxSize
+        # each item takes at least two characters including the separator
+        self.maxtuple = self.maxlist = self.maxarray = self.maxdict = \
+            self.maxset = self.maxfrozenset = self.maxdeque = \
+            max(maxSize // 2, 1)
+
+        # types with a __repr__ method having exceeded the time budget or
+        # known to be slow
+        self.__slowTypes = set()
+        # types checked against the known slow types
+        self.__checkedTypes = set()
+        self.__remaining = maxSize
+        self.__truncated = False
+
+    def format(self, value):
+        """
+        Public method to format a value.
+
+        @param value value to be formatted
+        @type any
+        @return formatted value, values longer than the maximum size are
+            cut off, values with omitted parts end with the truncation marker
+        @rtype str
+        """
+        self.__remaining = self.maxSize
+        self.__truncated = False
+        rvalue = self.repr1(value, self.maxlevel)
+        if len(rvalue) > self.maxSize:
+            rvalue = rvalue[:self.maxSize] + TruncationMarker
+        elif self.__truncated:
+            rvalue += TruncationMarker
+        return rvalue
+
+    def repr1(self, x, level):
+        """
+        Public method to format a part of a value.
+
+        Builtin types are formatted by the repr_<type name> methods, all
+        other objects by repr_instance(). Parts following the part exceeding
+        the maximum size aren't formatted.
+
+        @param x part to be formatted
+        @type any
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted part
+        @rtype str
+        """
+        remaining = self.__remaining
+        if remaining <= 0:
+            self.__truncated = True
+            return OmissionMarker
+
+        typeObject = type(x)
+        method = None
+        if typeObject.__module__ in BuiltinModules:
+            method = getattr(
+                self, "repr_" + "_".join(typeObject.__name__.split()), None)
+        if method is None:
+            method = self.repr_instance
+        s = method(x, level)
+        self.__remaining = remaining - len(s)
+        return s
+
+    def __reprSliced(self, x):
+        """
+        Private method to format the start of a string or bytes object.
+
+        @param x object to be formatted
+        @type str, unicode, bytes or bytearray
+        @return formatted start of the object
+        @rtype str
+        """
+        if len(x) > self.maxstring:
+            self.__truncated = True
+            return repr(x[:self.maxstring]) + OmissionMarker
+        return repr(x)
+
+    def repr_str(self, x, level):
+        """
+        Public method to format a string.
+
+        @param x string to be formatted
+        @type str
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted string
+        @rtype str
+        """
+        return self.__reprSliced(x)
+
+    repr_unicode = repr_bytes = repr_bytearray = repr_str
+
+    def repr_int(self, x, level):
+        """
+        Public method to format an integer.
+
+        @param x integer to be formatted
+        @type int or long
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted integer, the middle digits of a long one are
+            omitted
+        @rtype str
+        """
+        s = repr(x)
+        if len(s) > self.maxlong:
+            self.__truncated = True
+            i = max(0, (self.maxlong - len(OmissionMarker)) // 2)
+            j = max(0, self.maxlong - len(OmissionMarker) - i)
+            s = s[:i] + OmissionMarker + s[len(s) - j:]
+        return s
+
+    repr_long = repr_int
+
+    def _repr_iterable(self, x, level, left, right, maxiter, trail=''):
+        """
+        Protected method to format the items of a container.
+
+        @param x container to be formatted
+        @type iterable
+        @param level remaining depth of nested containers
+        @type int
+        @param left text in front of the items
+        @type str
+        @param right text behind the items
+        @type str
+        @param maxiter maximum number of items
+        @type int
+        @keyparam trail text behind a single item
+        @type str
+        @return formatted container
+        @rtype str
+        """
+        n = len(x)
+        if level <= 0 and n:
+            self.__truncated = True
+            return left + OmissionMarker + right
+
+        pieces = [self.repr1(item, level - 1) for item in islice(x, maxiter)]
+        if n > maxiter:
+            self.__truncated = True
+            pieces.append(OmissionMarker)
+        elif n == 1 and trail:
+            right = trail + right
+        return left + ", ".join(pieces) + right
+
+    def repr_dict(self, x, level):
+        """
+        Public method to format a dictionary.
+
+        The first items are formatted in iteration order without sorting all
+        keys like reprlib does.
+
+        @param x dictionary to be formatted
+        @type dict
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted dictionary
+        @rtype str
+        """
+        n = len(x)
+        if n == 0:
+            return "{}"
+        if level <= 0:
+            self.__truncated = True
+            return "{" + OmissionMarker + "}"
+
+        items = getattr(x, "iteritems", x.items)()     # Python 2
+        pieces = ["{0}: {1}".format(self.repr1(key, level - 1),
+                                    self.repr1(value, level - 1))
+                  for key, value in islice(items, self.maxdict)]
+        if n > self.maxdict:
+            self.__truncated = True
+            pieces.append(OmissionMarker)
+        return "{" + ", ".join(pieces) + "}"
+
+    def repr_set(self, x, level):
+        """
+        Public method to format a set.
+
+        The first items are formatted in iteration order without sorting all
+        of them like reprlib does.
+
+        @param x set to be formatted
+        @type set
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted set
+        @rtype str
+        """
+        if sys.version_info[0] == 2:
+            return self._repr_iterable(x, level, "set([", "])", self.maxset)
+        if not x:
+            return "set()"
+        return self._repr_iterable(x, level, "{", "}", self.maxset)
+
+    def repr_frozenset(self, x, level):
+        """
+        Public method to format a frozen set.
+
+        The first items are formatted in iteration order without sorting all
+        of them like reprlib does.
+
+        @param x frozen set to be formatted
+        @type frozenset
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted frozen set
+        @rtype str
+        """
+        if sys.version_info[0] == 2:
+            return self._repr_iterable(x, level, "frozenset([", "])",
+                                       self.maxfrozenset)
+        if not x:
+            return "frozenset()"
+        return self._repr_iterable(x, level, "frozenset({", "})",
+                                   self.maxfrozenset)
+
+    def repr_instance(self, x, level):
+        """
+        Public method to format an object without a special formatting.
+
+        Objects of a type known to be slow or having exceeded the time budget
+        before get the default representation.
+
+        @param x object to be formatted
+        @type any
+        @param level remaining depth of nested containers
+        @type int
+        @return formatted object
+        @rtype str
+        """
+        typeObject = type(x)
+        if typeObject not in self.__checkedTypes:
+            self.__checkedTypes.add(typeObject)
+            if any("{0}.{1}".format(getattr(base, "__module__", ""),
+                                    base.__name__) in SlowTypeNames
+                   for base in getattr(typeObject, "__mro__", ())):
+                self.__slowTypes.add(typeObject)
+        if typeObject in self.__slowTypes:
+            return "<{0}.{1} object at {2:#x}>".format(
+                typeObject.__module__, typeObject.__name__, id(x))
+
+        start = Timer()
+        s = repr(x)
+        if Timer() - start > ReprTimeBudget:
+            self.__slowTypes.add(typeObject)
+        return s
+
+#
+# eflag: noqa = M702
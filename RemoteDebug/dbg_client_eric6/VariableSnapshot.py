@@ -0,0 +1,167 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the snapshots of formatted variables used to send only
+the changes of the variables of a frame.
+
+The IDE asks for the changes by passing the id of the snapshot it holds. If
+the client still has this snapshot, it answers with the added, changed and
+removed variables only. Otherwise it sends all variables and the id of the
+new snapshot.
+"""
+
+import sys
+
+# types of immutable values, whose formatted value is reused, as long as a
+# variable refers to the same object
+if sys.version_info[0] == 2:
+    ImmutableTypes = frozenset((str, unicode, int, long, float, complex,
+                                bool, type(None)))      # __IGNORE_WARNING__
+else:
+    ImmutableTypes = frozenset((str, bytes, int, float, complex, bool,
+                                type(None)))
+
+# number of snapshots kept by the client
+MaxSnapshots = 32
+
+# maximum size of the formatted value of an immutable value kept for reuse,
+# the snapshots must not keep large objects alive
+MaxReusedValueSize = 256
+
+
+class VariableSnapshot(object):
+    """
+    Class holding the formatted variables of a frame as sent to the IDE.
+    """
+    def __init__(self, snapshotId, varlist, varDict, maxSize):
+        """
+        Constructor
+
+        @param snapshotId id of the snapshot
+        @type int
+        @param varlist formatted variables as tuples of the variable name,
+            its type and value
+        @type list of tuple of (str, str, str)
+        @param varDict dictionary of the variables
+        @type dict
+        @param maxSize maximum size of the formatted values
+        @type int
+        """
+        self.snapshotId = snapshotId
+        self.maxSize = maxSize
+        self.entries = dict((entry[0], entry) for entry in varlist)
+
+        # the small immutable values are kept to reuse their formatted value
+        self.values = {}
+        for name, _valtype, rvalue in varlist:
+            value = varDict.get(name)
+            if (type(value) in ImmutableTypes and
+                    len(rvalue) <= MaxReusedValueSize):
+                self.values[name] = (value, rvalue)
+
+    def formattedValues(self, maxSize):
+        """
+        Public method to get the formatted immutable values for reuse.
+
+        @param maxSize maximum size of the formatted values to be created
+        @type int
+        @return dictionary of tuples of the value and its formatted value
+            indexed by the variable name
+        @rtype dict
+        """
+        if maxSize != self.maxSize:
+            return {}
+        return self.values
+
+    def changes(self, varlist):
+        """
+        Public method to determine the changes of the variables.
+
+        @param varlist formatted variables as tuples of the variable name,
+            its type and value
+        @type list of tuple of (str, str, str)
+        @return tuple of the added and changed variables and of the names of
+            the removed variables
+        @rtype tuple of (list of tuple of (str, str, str),
+            list of tuple of (str, str, str), list of str)
+        """
+        entries = self.entries
+        added = []
+        changed = []
+        names = set()
+        for entry in varlist:
+            name = entry[0]
+            names.add(name)
+            previous = entries.get(name)
+            if previous is None:
+                added.append(entry)
+            elif previous != entry:
+                changed.append(entry)
+        removed = [name for name in entries if name not in names]
+        return added, changed, removed
+
+
+class VariableSnapshots(object):
+    """
+    Class keeping the last snapshot of the variables of each frame.
+    """
+    def __init__(self, maxSnapshots=MaxSnapshots):
+        """
+        Constructor
+
+        @keyparam maxSnapshots number of snapshots to be kept
+        @type int
+        """
+        self.maxSnapshots = maxSnapshots
+        self.__snapshots = {}
+        self.__lastId = 0
+
+    def get(self, key):
+        """
+        Public method to get the last snapshot of a frame.
+
+        @param key key of the frame and scope
+        @type tuple
+        @return snapshot or None
+        @rtype VariableSnapshot
+        """
+        return self.__snapshots.get(key)
+
+    def store(self, key, varlist, varDict, maxSize):
+        """
+        Public method to store a new snapshot of a frame.
+
+        The oldest snapshot is dropped, if there are too many.
+
+        @param key key of the frame and scope
+        @type tuple
+        @param varlist formatted variables as tuples of the variable name,
+            its type and value
+        @type list of tuple of (str, str, str)
+        @param varDict dictionary of the variables
+        @type dict
+        @param maxSize maximum size of the formatted values
+        @type int
+        @return the new snapshot
+        @rtype VariableSnapshot
+        """
+        self.__lastId += 1
+        snapshot = VariableSnapshot(self.__lastId, varlist, varDict, maxSize)
+        self.__snapshots[key] = snapshot
+        if len(self.__snapshots) > self.maxSnapshots:
+            oldest = min(self.__snapshots,
+                         key=lambda k: self.__snapshots[k].snapshotId)
+            del self.__snapshots[oldest]
+        return snapshot
+
+    def clear(self):
+        """
+        Public method to drop all snapshots.
+        """
+        self.__snapshots = {}
+
+#
+# eflag: noqa = M702
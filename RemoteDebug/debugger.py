@@ -24,22 +24,73 @@
 import sys
 
 
+ERIC6_HOST = 'localhost'
+ERIC6_PORT = 42424
+
+
+def parse_eric6_address(address):
+    """Split an eric6 IDE address into the host and port of the client.
+
+    The address is host, host:port, an IPv6 address with or without
+    brackets ([::1]:4000), unix:<socket path> or fd:<inherited socket>.
+    Missing parts default to localhost and port 42424. Raises ValueError
+    for an invalid port.
+    """
+    address = address.strip()
+    host, port = address, ''
+    if address.startswith(('unix:', 'fd:')):
+        return address, ERIC6_PORT
+    if address.startswith('['):
+        host, bracket, rest = address[1:].partition(']')
+        if not bracket or (rest and not rest.startswith(':')):
+            raise ValueError(u"Invalid IPv6 address: {}".format(address))
+        port = rest[1:]
+    elif address.count(':') == 1:
+        host, _, port = address.partition(':')
+    if port:
+        if not port.isdigit() or not 0 < int(port) < 65536:
+            raise ValueError(u"Invalid port: {}".format(port))
+        port = int(port)
+    else:
+        port = ERIC6_PORT
+    host = host or ERIC6_HOST
+    if ':' in host:
+        # the client resolves IPv6 addresses only when told so
+        host += '@@v6'
+    return host, port
+
+
 class DebuggerClient:
     """Base class for Debugger clients"""
 
     def start_debugging(self, config=None):
         raise NotImplementedError
 
+    def validate_config(self, config):
+        """Return an error message for invalid settings or None"""
+        return None
+
 class Eric6Client(DebuggerClient):
 
+    def validate_config(self, config):
+        try:
+            parse_eric6_address(config.get('eric6_address') or '')
+        except ValueError as e:
+            return u'{}'.format(e)
+        return None
+
     def start_debugging(self, config=None):
         started = False
         try:
             from .dbg_client_eric6.DebugClient import DebugClient
+            detached = bool(config and config.get('eric6_detached'))
+            host, port = parse_eric6_address(
+                (config and config.get('eric6_address')) or '')
             DBG = DebugClient()
             DBG.startDebugger(
-                host='localhost', filename='', port=42424,
-                exceptions=True, enableTrace=True, redirect=True)
+                host=host, filename='', port=port,
+                exceptions=True, enableTrace=True, redirect=True,
+                detached=detached)
             started = True
         except Exception as e:
             print('Exception in Eric6Client.start_debugging: {}'.format(e))
@@ -198,6 +198,10 @@ class RemoteDebug:
             'RemoteDebug/debugger', self.dlg.debugger_cbox)
         self._settings.add_handler(
             'RemoteDebug/pydev_path', self.dlg.pydev_path_ledit)
+        self._settings.add_handler(
+            'RemoteDebug/eric6_detached', self.dlg.eric6_detached_cbox)
+        self._settings.add_handler(
+            'RemoteDebug/eric6_address', self.dlg.eric6_address_ledit)
 
     def unload(self):
         """Removes the plugin menu item and icon from QGIS GUI."""
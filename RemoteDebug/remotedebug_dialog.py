@@ -31,11 +31,11 @@ from sys import version_info
 if version_info < (3, 0):
     from PyQt4 import QtGui, uic
     from PyQt4.QtCore import Qt, pyqtSlot
-    from PyQt4.QtGui import QDialog, QFileDialog   
+    from PyQt4.QtGui import QDialog, QFileDialog, QMessageBox
 else:
     from PyQt5 import QtGui, uic
     from PyQt5.QtCore import Qt, pyqtSlot
-    from PyQt5.QtWidgets import QDialog, QFileDialog
+    from PyQt5.QtWidgets import QDialog, QFileDialog, QMessageBox
     
 import os
 from .debugger import Debugger
@@ -81,9 +81,14 @@ class RemoteDebugDialog(QDialog, FORM_CLASS):
     def start_debugging(self):
         debugger = self._debugger.client(
             self.debugger_cbox.currentIndex())
+        config = self._debugger_config()
+        error = debugger.validate_config(config)
+        if error:
+            QMessageBox.warning(self, u"Remote Debug", error)
+            return
         self._plugin.statusBar().showMessage(
             u"Connecting to remote debugger...")
-        active = debugger.start_debugging(self._debugger_config())
+        active = debugger.start_debugging(config)
         self._plugin.statusBar().showMessage("")
         if active:
             self.accept()
@@ -94,4 +99,6 @@ class RemoteDebugDialog(QDialog, FORM_CLASS):
                 u"Debugging connection failed", level=1, duration=2)
 
     def _debugger_config(self):
-        return {'pydev_path': self.pydev_path_ledit.text()}
+        return {'pydev_path': self.pydev_path_ledit.text(),
+                'eric6_detached': self.eric6_detached_cbox.isChecked(),
+                'eric6_address': self.eric6_address_ledit.text().strip()}
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the time the eric6 debug client needs to expand numpy
+arrays.
+
+A program creating a numpy array is stopped at a breakpoint. The array is
+expanded once to compute its summary and again to get the cached summary.
+Then a page of its items is requested. The interpreter running the client
+needs numpy.
+
+Usage: python bench_arrays.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+import numpy
+array = numpy.random.rand({rows}, {columns}).astype(numpy.{dtype})
+stop = True
+"""
+BreakpointLine = 3
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def requestVariable(ide, var, params=None):
+    """
+    Function to request the variables of a variable.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param var list encoded name of the variable
+    @type list of str
+    @param params additional parameters of the request
+    @type dict
+    @return time until the response was received in seconds
+    @rtype float
+    """
+    request = {
+        "variable": var,
+        "frameNumber": 0,
+        "scope": 1,
+        "filters": [0],
+        "maxSize": 1024,
+    }
+    request.update(params or {})
+    start = Timer()
+    ide.sendJsonCommand("RequestVariable", request)
+    ide.waitForResponse()
+    return Timer() - start
+
+
+def measure(python, workdir, program, rows, repeat):
+    """
+    Function to measure the expansions of the array.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program creating the array
+    @type str
+    @param rows number of rows of the array
+    @type int
+    @param repeat number of runs, the fastest one is reported
+    @type int
+    @return time of the first expansion, fastest time of the further
+        expansions and of a page of items in seconds
+    @rtype tuple of (float, float, float)
+    @exception RuntimeError raised to indicate a missing stop
+    """
+    ide = Eric6Ide(python)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+        ide.sendBreakpoint(program, BreakpointLine, "")
+        ide.sendContinue()
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the breakpoint")
+
+        first = requestVariable(ide, ["array"])
+        again = min(requestVariable(ide, ["array"]) for _ in range(repeat))
+        items = ["array", "[0:{0}]".format(rows - 1), "0"]
+        page = min(requestVariable(ide, items, {"start": 0, "count": 100})
+                   for _ in range(repeat))
+
+        ide.sendContinue()
+        if ide.waitForEvent() == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return first, again, page
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the expansion of numpy arrays.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--rows", type=int, default=10000,
+                        help="number of rows of the array")
+    parser.add_argument("--columns", type=int, default=10000,
+                        help="number of columns of the array")
+    parser.add_argument("--dtype", default="float32",
+                        help="numpy type of the elements")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of runs, the fastest one is reported")
+    args = parser.parse_args()
+
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} x {2} array of {3}".format(
+        version, args.rows, args.columns, args.dtype))
+
+    workdir = tempfile.mkdtemp(prefix="bench_arrays")
+    try:
+        program = os.path.join(workdir, "arrays.py")
+        with open(program, "w") as f:
+            f.write(Program.format(rows=args.rows, columns=args.columns,
+                                   dtype=args.dtype))
+
+        first, again, page = measure(args.python, workdir, program,
+                                     args.rows, args.repeat)
+        print("{0:24s}{1:10.2f} ms".format("summary", first * 1e3))
+        print("{0:24s}{1:10.2f} ms".format("cached summary", again * 1e3))
+        print("{0:24s}{1:10.2f} ms".format("page of 100 items", page * 1e3))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the time the eric6 debug client needs to send the items of
+a large array.
+
+A program creating an array.array of doubles is stopped at a breakpoint.
+Its items are fetched once page by page with RequestVariable and once with
+a single RequestBuffer. The time and the number of bytes received are
+reported for both. With the JSON encoding the raw data is sent base64
+encoded, with the msgpack encoding it is sent as binary data.
+
+The program appends to the array after it was continued. This raises a
+BufferError, if the client still holds on to the memory of the array.
+
+Usage: python bench_buffer.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import base64
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+import array
+values = array.array("d", range({items}))
+stop = True
+values.append(0.0)
+"""
+BreakpointLine = 3
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def fetchPages(ide, items, count):
+    """
+    Function to fetch the items of the array page by page.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param items number of items of the array
+    @type int
+    @param count number of items of a page
+    @type int
+    @exception RuntimeError raised to indicate a missing item
+    """
+    received = 0
+    for start in range(0, items, count):
+        ide.sendJsonCommand("RequestVariable", {
+            "variable": ["values", "[0:{0}]".format(items - 1)],
+            "frameNumber": 0,
+            "scope": 1,
+            "filters": [0],
+            "maxSize": 1024,
+            "start": start,
+            "count": count,
+        })
+        received += len(ide.waitForResponse()["params"]["variables"])
+    if received < items:
+        raise RuntimeError("the pages miss items of the array")
+
+
+def fetchBuffer(ide, items):
+    """
+    Function to fetch the items of the array as raw data.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param items number of items of the array
+    @type int
+    @exception RuntimeError raised to indicate a missing item
+    """
+    ide.sendJsonCommand("RequestBuffer", {
+        "variable": ["values"],
+        "frameNumber": 0,
+        "scope": 1,
+        "start": 0,
+        "count": items,
+    })
+    params = ide.waitForResponse()["params"]
+    data = params["data"]
+    if params["encoding"] == "base64":
+        data = base64.b64decode(data)
+    if len(data) < items * params["itemsize"]:
+        raise RuntimeError("the raw data misses items of the array")
+
+
+def measure(python, encoding, workdir, program, items, count, repeat):
+    """
+    Function to measure both ways of fetching the items.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param encoding encoding of the messages of the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program creating the array
+    @type str
+    @param items number of items of the array
+    @type int
+    @param count number of items of a page
+    @type int
+    @param repeat number of runs, the fastest one is reported
+    @type int
+    @return fastest time in seconds and number of bytes received of the
+        pages and of the raw data
+    @rtype list of tuple of (float, int)
+    @exception RuntimeError raised to indicate a missing stop or an array,
+        that couldn't be resized
+    """
+    ide = Eric6Ide(python, encoding=encoding)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+        ide.sendBreakpoint(program, BreakpointLine, "")
+        ide.sendContinue()
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the breakpoint")
+
+        results = []
+        for fetch in (lambda: fetchPages(ide, items, count),
+                      lambda: fetchBuffer(ide, items)):
+            fastest = None
+            for _ in range(repeat):
+                startBytes = ide.bytesReceived
+                begin = Timer()
+                fetch()
+                duration = Timer() - begin
+                if fastest is None or duration < fastest:
+                    fastest = duration
+            results.append((fastest, ide.bytesReceived - startBytes))
+
+        ide.sendContinue()
+        event = ide.waitForEvent()
+        if event == "exception":
+            raise RuntimeError("the array couldn't be resized after sending"
+                               " its raw data")
+        elif event == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return results
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure fetching the items of a large array.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--encoding", choices=["json", "msgpack"],
+                        default="json",
+                        help="encoding of the messages of the client")
+    parser.add_argument("--items", type=int, default=30000,
+                        help="number of items of the array")
+    parser.add_argument("--count", type=int, default=300,
+                        help="number of items of a page")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of runs, the fastest one is reported")
+    args = parser.parse_args()
+
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} encoding, array of {2} doubles"
+          .format(version, args.encoding, args.items))
+    print("{0:24s}{1:>12s}{2:>12s}".format("request", "time [ms]", "bytes"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_buffer")
+    try:
+        program = os.path.join(workdir, "values.py")
+        with open(program, "w") as f:
+            f.write(Program.format(items=args.items))
+
+        results = measure(args.python, args.encoding, workdir, program,
+                          args.items, args.count, args.repeat)
+        for name, (duration, received) in zip(
+                ("RequestVariable pages", "RequestBuffer"), results):
+            print("{0:24s}{1:12.2f}{2:12d}".format(
+                name, duration * 1e3, received))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
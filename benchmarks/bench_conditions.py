@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the breakpoint hits per second of the eric6 debug client.
+
+The loop of a small function is run under the trace function with a
+breakpoint on its body, which never stops. The breakpoint is unconditional
+with a high ignore count, has a condition evaluated in the global namespace
+only or a condition using a local variable. The evaluation of an uncompiled
+condition string on every hit is measured for comparison.
+
+Usage: python bench_conditions.py [iterations]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "RemoteDebug"))
+
+from dbg_client_eric6.DebugBase import DebugBase             # __IGNORE_WARNING__
+from dbg_client_eric6.BreakpointWatch import Breakpoint      # __IGNORE_WARNING__
+
+Threshold = 10 ** 9
+
+
+def workload(count):
+    """
+    Function containing the breakpoint line.
+    
+    @param count number of loop iterations
+    @type int
+    @return sum of the loop counter
+    @rtype int
+    """
+    total = 0
+    for i in range(count):
+        total += i                  # the breakpoint line
+    return total
+
+
+BreakLine = workload.__code__.co_firstlineno + 11
+
+
+class BenchClient(object):
+    """
+    Class implementing the parts of the debug client used by DebugBase.
+    """
+    callTraceEnabled = None
+    debugging = True
+    monitor = None
+    
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.threads = {}
+    
+    def eventPoll(self):
+        """
+        Public method to poll for commands of the IDE.
+        """
+        pass
+    
+    def absPath(self, fn):
+        """
+        Public method to convert a file name to an absolute one.
+        
+        @param fn file name
+        @type str
+        @return absolute file name
+        @rtype str
+        """
+        return fn
+
+
+class BenchDebugBase(DebugBase):
+    """
+    Class counting the stops instead of talking to the IDE.
+    """
+    def __init__(self):
+        """
+        Constructor
+        """
+        DebugBase.__init__(self, BenchClient())
+        self.stops = 0
+    
+    def user_line(self, frame):
+        """
+        Public method reimplemented to count the stops.
+        
+        @param frame the frame object
+        @type frame object
+        """
+        self.stops += 1
+
+
+def measure(dbg, count):
+    """
+    Function to run the workload under the trace function.
+    
+    @param dbg debugger object
+    @type BenchDebugBase
+    @param count number of loop iterations
+    @type int
+    @return hits per second
+    @rtype float
+    """
+    dbg.stop_everywhere = False
+    start = time.time()
+    sys.settrace(dbg.trace_dispatch)
+    try:
+        workload(count)
+    finally:
+        sys.settrace(None)
+    return count / (time.time() - start)
+
+
+def main():
+    """
+    Function running the benchmark configurations.
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    filename = os.path.abspath(__file__)
+    if filename.endswith((".pyc", ".pyo")):
+        filename = filename[:-1]
+    
+    configurations = [
+        ("no breakpoint", None, False, False),
+        ("unconditional, ignored", None, False, True),
+        ("condition on globals", "Threshold < 0", False, False),
+        ("condition on locals", "total < 0", False, False),
+        ("condition string eval", "total < 0", True, False),
+        ("condition, ignore precheck", "total < 0", False, True),
+    ]
+    dbg = BenchDebugBase()
+    print("Python {0}, {1} iterations".format(sys.version.split()[0], count))
+    for name, cond, uncompiled, ignored in configurations:
+        Breakpoint.clear_all_breaks()
+        if name != "no breakpoint":
+            bp = Breakpoint(filename, BreakLine, False, cond)
+            if uncompiled:
+                # the behaviour of evaluating the source on every hit
+                bp.compiledCond = cond
+                bp.condNames = Breakpoint.LocalsNames
+            if ignored:
+                bp.ignore = Threshold
+                bp.ignorePrecheck = cond is not None
+        rate = measure(dbg, count)
+        print("{0:30s} {1:12.0f} hits/s".format(name, rate))
+    
+    DebugBase.pollTimerEnabled = False
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
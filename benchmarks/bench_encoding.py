@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the throughput of the message encodings of the eric6
+debug client.
+
+ResponseVariables and CallTrace messages are encoded as sent by the client
+and decoded as done by the IDE, once using JSON and once using the binary
+encoding. The binary encoding is measured with the msgpack package, if it
+is installed, and with the pure Python fallback. Messages per second of
+encoding and decoding and the size of a message are reported.
+
+Usage: python bench_encoding.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "RemoteDebug"))
+
+from dbg_client_eric6 import BinaryCodec                    # __IGNORE_WARNING__
+from dbg_client_eric6.DebugUtilities import (               # __IGNORE_WARNING__
+    prepareJsonCommand, prepareBinaryCommand
+)
+
+
+def variablesMessage(count):
+    """
+    Function to create the parameters of a ResponseVariables message.
+
+    @param count number of variables
+    @type int
+    @return method and parameters of the message
+    @rtype tuple of (str, dict)
+    """
+    samples = [
+        ("int", "42"),
+        ("str", "'a short string value'"),
+        ("float", "3.141592653589793"),
+        ("list", "4"),
+        ("dict", "12"),
+        ("NoneType", "None"),
+        ("bool", "True"),
+        ("Foo", "<__main__.Foo object at 0x7f3a5c1d2e80>"),
+    ]
+    variables = []
+    for index in range(count):
+        vtype, value = samples[index % len(samples)]
+        variables.append(["variable_{0}".format(index), vtype, value])
+    return "ResponseVariables", {"scope": 0, "variables": variables}
+
+
+def callTraceMessage():
+    """
+    Function to create the parameters of a CallTrace message.
+
+    @return method and parameters of the message
+    @rtype tuple of (str, dict)
+    """
+    return "CallTrace", {
+        "event": "c",
+        "from": "/home/user/project/package/module.py:123:caller",
+        "to": "/home/user/project/package/helpers.py:45:callee",
+    }
+
+
+def decodeJson(data):
+    """
+    Function to decode a JSON message as done by the IDE.
+
+    @param data message as sent by the client
+    @type bytes
+    @return decoded message
+    @rtype dict
+    """
+    return json.loads(data.decode("utf-8"))
+
+
+def decodeBinary(data):
+    """
+    Function to decode a binary message as done by the IDE.
+
+    @param data message as sent by the client
+    @type bytes
+    @return decoded message
+    @rtype dict
+    """
+    # skip the length field
+    return BinaryCodec.unpackMessage(data[9:])
+
+
+def encodeJson(method, params):
+    """
+    Function to encode a JSON message as sent by the client.
+
+    @param method message name
+    @type str
+    @param params parameters of the message
+    @type dict
+    @return encoded message
+    @rtype bytes
+    """
+    return prepareJsonCommand(method, params).encode("utf-8")
+
+
+def rate(func, args, seconds):
+    """
+    Function to determine the number of calls per second of a function.
+
+    @param func function to be called
+    @type function
+    @param args arguments of the function
+    @type tuple
+    @param seconds minimum time to measure (in seconds)
+    @type float
+    @return calls per second
+    @rtype float
+    """
+    calls = 0
+    batch = 1
+    start = time.time()
+    while True:
+        for _ in range(batch):
+            func(*args)
+        calls += batch
+        duration = time.time() - start
+        if duration >= seconds:
+            return calls / duration
+        batch *= 2
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the throughput of the message encodings.")
+    parser.add_argument("--variables", type=int, default=200,
+                        help="number of variables of ResponseVariables")
+    parser.add_argument("--seconds", type=float, default=1.0,
+                        help="measuring time of each figure")
+    args = parser.parse_args()
+
+    messages = [variablesMessage(args.variables), callTraceMessage()]
+    encodings = [("json", encodeJson, decodeJson)]
+    if BinaryCodec.msgpack is not None:
+        encodings.append(("msgpack", prepareBinaryCommand, decodeBinary))
+    encodings.append(("pure python", prepareBinaryCommand, decodeBinary))
+
+    print("Python {0}, {1} variables".format(
+        sys.version.split()[0], args.variables))
+    print("{0:20s}{1:>14s}{2:>14s}{3:>14s}{4:>10s}".format(
+        "message", "encoding", "encode [1/s]", "decode [1/s]", "bytes"))
+    msgpack = BinaryCodec.msgpack
+    try:
+        for method, params in messages:
+            for name, encode, decode in encodings:
+                if name == "pure python":
+                    BinaryCodec.msgpack = None
+                data = encode(method, params)
+                assert decode(data)["params"] == json.loads(
+                    json.dumps(params))
+                print("{0:20s}{1:>14s}{2:14.0f}{3:14.0f}{4:10d}".format(
+                    method, name,
+                    rate(encode, (method, params), args.seconds),
+                    rate(decode, (data,), args.seconds),
+                    len(data)))
+                BinaryCodec.msgpack = msgpack
+    finally:
+        BinaryCodec.msgpack = msgpack
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the round trip latency of step commands of the eric6 debug
+client for each transport.
+
+A small program is stepped through line by line. The time from sending
+RequestStep until the ResponseLine of the next line is received is
+measured for a TCP connection, a Unix domain socket and a socketpair
+inherited by the client.
+
+Usage: python bench_latency.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+total = 0
+for i in range(1000000):
+    total += i
+"""
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def measureSteps(python, transport, workdir, program, steps, warmup):
+    """
+    Function to measure the latencies of step commands.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param transport connection to the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program to step through
+    @type str
+    @param steps number of measured steps
+    @type int
+    @param warmup number of steps before measuring
+    @type int
+    @return latencies of the steps in seconds
+    @rtype list of float
+    @exception RuntimeError raised to indicate a missing stop
+    """
+    latencies = []
+    ide = Eric6Ide(python, transport)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+
+        for step in range(warmup + steps):
+            start = Timer()
+            ide.sendJsonCommand("RequestStep", {})
+            if ide.waitForEvent() != "line":
+                raise RuntimeError("the client didn't stop after a step")
+            if step >= warmup:
+                latencies.append(Timer() - start)
+
+        ide.sendJsonCommand("RequestStepQuit", {})
+        if ide.waitForEvent() == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return latencies
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the latency of step commands per transport.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--transports",
+                        default=",".join(Eric6Ide.Transports),
+                        help="comma separated transports to measure")
+    parser.add_argument("--steps", type=int, default=2000,
+                        help="number of measured steps")
+    parser.add_argument("--warmup", type=int, default=100,
+                        help="number of steps before measuring")
+    args = parser.parse_args()
+
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} steps".format(version, args.steps))
+    print("{0:12s}{1:>14s}{2:>14s}{3:>14s}".format(
+        "transport", "median [us]", "mean [us]", "p99 [us]"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_latency")
+    try:
+        program = os.path.join(workdir, "stepping.py")
+        with open(program, "w") as f:
+            f.write(Program)
+
+        for transport in args.transports.split(","):
+            latencies = sorted(measureSteps(
+                args.python, transport, workdir, program, args.steps,
+                args.warmup))
+            print("{0:12s}{1:14.1f}{2:14.1f}{3:14.1f}".format(
+                transport,
+                latencies[len(latencies) // 2] * 1e6,
+                sum(latencies) / len(latencies) * 1e6,
+                latencies[int(len(latencies) * 0.99)] * 1e6))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the time the eric6 debug client needs to send a page of the
+items of a large container.
+
+A program creating a large list, dictionary and set is stopped at a
+breakpoint. Pages of the items of each container are requested with the
+start and count parameters of RequestVariable at the beginning, in the
+middle and at the end of the container.
+
+Usage: python bench_paging.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+bigList = list(range({items}))
+bigDict = dict(("key{{0}}".format(index), index) for index in range({items}))
+bigSet = set(range({items}))
+stop = True
+"""
+BreakpointLine = 4
+
+Containers = [
+    ("list", "bigList[]"),
+    ("dict", "bigDict{:}"),
+    ("set", "bigSet{}"),
+]
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def requestPage(ide, name, start, count):
+    """
+    Function to request a page of the items of a container.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param name name of the container variable
+    @type str
+    @param start index of the first item
+    @type int
+    @param count number of items
+    @type int
+    @exception RuntimeError raised to indicate an incomplete page
+    """
+    ide.sendJsonCommand("RequestVariable", {
+        "variable": [name],
+        "frameNumber": 0,
+        "scope": 1,
+        "filters": [0],
+        "maxSize": 1024,
+        "start": start,
+        "count": count,
+    })
+    params = ide.waitForResponse()["params"]
+    if len(params["variables"]) < count:
+        raise RuntimeError("the page of {0} is incomplete".format(name))
+
+
+def measure(python, workdir, program, items, count, repeat):
+    """
+    Function to measure the pages of each container.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program creating the containers
+    @type str
+    @param items number of items of the containers
+    @type int
+    @param count number of items of a page
+    @type int
+    @param repeat number of runs, the fastest one is reported
+    @type int
+    @return fastest time of the first, the middle and the last page of each
+        container in seconds
+    @rtype list of list of float
+    @exception RuntimeError raised to indicate a missing stop
+    """
+    ide = Eric6Ide(python)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+        ide.sendBreakpoint(program, BreakpointLine, "")
+        ide.sendContinue()
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the breakpoint")
+
+        times = []
+        for _kind, name in Containers:
+            containerTimes = []
+            for start in (0, (items - count) // 2, items - count):
+                fastest = None
+                for _ in range(repeat):
+                    begin = Timer()
+                    requestPage(ide, name, start, count)
+                    duration = Timer() - begin
+                    if fastest is None or duration < fastest:
+                        fastest = duration
+                containerTimes.append(fastest)
+            times.append(containerTimes)
+
+        ide.sendContinue()
+        if ide.waitForEvent() == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return times
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure paging through large containers.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--items", type=int, default=1000000,
+                        help="number of items of the containers")
+    parser.add_argument("--count", type=int, default=100,
+                        help="number of items of a page")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of runs, the fastest one is reported")
+    args = parser.parse_args()
+
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} items, {2} items per page".format(
+        version, args.items, args.count))
+    print("{0:8s}{1:>12s}{2:>12s}{3:>12s}".format(
+        "type", "first [ms]", "middle [ms]", "last [ms]"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_paging")
+    try:
+        program = os.path.join(workdir, "containers.py")
+        with open(program, "w") as f:
+            f.write(Program.format(items=args.items))
+
+        times = measure(args.python, workdir, program, args.items,
+                        args.count, args.repeat)
+        for (kind, _name), containerTimes in zip(Containers, times):
+            print("{0:8s}{1:12.2f}{2:12.2f}{3:12.2f}".format(
+                kind, *[duration * 1e3 for duration in containerTimes]))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the variables traffic of the eric6 debug client while
+stepping.
+
+A function of a module with many global variables is stepped through line
+by line. After each step the local and the global variables are requested
+like the IDE does, once getting all variables and once getting the changes
+since the last step only. The time and the number of bytes received per
+step are reported.
+
+Usage: python bench_stepping.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+for index in range({globals}):
+    globals()["text{{0}}".format(index)] = "value {{0}} ".format(index) * 10
+    globals()["number{{0}}".format(index)] = index * 1.5
+
+def work(steps):
+    total = 0
+    for step in range(steps):
+        total += step
+        text = "step {{0}}".format(step)
+    return total
+
+work(1000000)
+"""
+BreakpointLine = 6
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def measureSteps(python, workdir, program, steps, delta):
+    """
+    Function to measure the steps.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program to step through
+    @type str
+    @param steps number of steps
+    @type int
+    @param delta flag indicating to request the changes only
+    @type bool
+    @return time in seconds and bytes received per step
+    @rtype tuple of (float, float)
+    @exception RuntimeError raised to indicate a missing stop
+    """
+    ide = Eric6Ide(python)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+        ide.sendBreakpoint(program, BreakpointLine, "")
+        ide.sendContinue()
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the breakpoint")
+
+        snapshots = {0: None, 1: None}
+        start = Timer()
+        startBytes = ide.bytesReceived
+        for _ in range(steps):
+            ide.sendJsonCommand("RequestStep", {})
+            if ide.waitForEvent() != "line":
+                raise RuntimeError("the client didn't stop after a step")
+            for scope in (0, 1):
+                ide.sendJsonCommand("RequestVariables", {
+                    "frameNumber": 0,
+                    "scope": scope,
+                    "filters": [],
+                    "maxSize": 1024,
+                    "delta": delta,
+                    "snapshot": snapshots[scope],
+                })
+            for _scope in (0, 1):
+                params = ide.waitForResponse()["params"]
+                snapshots[params["scope"]] = params.get("snapshot")
+        duration = Timer() - start
+        received = ide.bytesReceived - startBytes
+
+        ide.sendJsonCommand("RequestStepQuit", {})
+        if ide.waitForEvent() == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return duration / steps, received / float(steps)
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the variables traffic while stepping.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--globals", type=int, default=2000,
+                        help="number of pairs of global variables")
+    parser.add_argument("--steps", type=int, default=100,
+                        help="number of steps")
+    args = parser.parse_args()
+
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} global variables, {2} steps".format(
+        version, 2 * args.globals, args.steps))
+    print("{0:12s}{1:>16s}{2:>16s}".format(
+        "variables", "per step [ms]", "per step [kB]"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_stepping")
+    try:
+        program = os.path.join(workdir, "stepping.py")
+        with open(program, "w") as f:
+            f.write(Program.format(globals=args.globals))
+
+        for name, delta in (("all", False), ("changes", True)):
+            duration, received = measureSteps(
+                args.python, workdir, program, args.steps, delta)
+            print("{0:12s}{1:16.2f}{2:16.1f}".format(
+                name, duration * 1e3, received / 1024.0))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
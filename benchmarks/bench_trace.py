@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the slowdown of programs run under the debug clients.
+
+The workloads of workloads.py are run by the eric6 and the legacy debug
+client talking to a loopback stand-in for the IDE. The slowdown ratio
+against running the workload without a debugger is reported for each
+configuration: no breakpoints, unconditional breakpoints in the file of
+the workload, never true conditional breakpoints on its hot lines, a never
+true watch expression, the call trace in each of its modes and a coverage
+run.
+
+The legacy client needs a Python 2 interpreter, which is searched as
+"python2" unless given by --python2. Its workloads run at a tenth of the
+scale by default (--legacy-scale), because its trace function is much
+slower. The slowdown ratios don't depend on the scale.
+
+Usage: python bench_trace.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide, LegacyIde
+
+WorkloadsFile = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "workloads.py")
+WorkloadNames = ["numeric", "recursion", "calls", "generators", "threads"]
+ConfigurationNames = ["no breakpoints", "breakpoints", "conditional",
+                      "watches", "call trace", "trace batched",
+                      "trace aggregated", "trace sampled", "coverage"]
+NeverTrue = "count < 0"
+
+
+def findLines(filename):
+    """
+    Function to get the line numbers to put the breakpoints on.
+
+    @param filename file name of the workloads
+    @type str
+    @return line numbers of the idle function body and of the hot lines
+    @rtype tuple of (list of int, list of int)
+    """
+    idleLines = []
+    hotLines = []
+    inIdle = False
+    with open(filename) as f:
+        for lineno, line in enumerate(f, 1):
+            if line.startswith("def "):
+                inIdle = line.startswith("def idle(")
+            elif inIdle and line.strip() == "count += 1":
+                idleLines.append(lineno)
+            if "# bench: hot" in line:
+                hotLines.append(lineno)
+    return idleLines, hotLines
+
+
+def configurations(program, count):
+    """
+    Function to get the session parameters of the configurations.
+
+    @param program file name of the workloads
+    @type str
+    @param count number of unconditional breakpoints
+    @type int
+    @return dictionary of keyword arguments of FakeIde.runSession indexed by
+        the configuration name
+    @rtype dict
+    """
+    idleLines, hotLines = findLines(program)
+    return {
+        "no breakpoints": {},
+        "breakpoints": {
+            "breakpoints": [(program, line, "")
+                            for line in idleLines[:count]],
+        },
+        "conditional": {
+            "breakpoints": [(program, line, NeverTrue) for line in hotLines],
+        },
+        "watches": {"watches": [NeverTrue]},
+        "call trace": {"callTrace": "events"},
+        "trace batched": {"callTrace": "batched"},
+        "trace aggregated": {"callTrace": "aggregated"},
+        "trace sampled": {"callTrace": "sampled"},
+        "coverage": {"coverage": True},
+    }
+
+
+def readResult(resultFile):
+    """
+    Function to read the run time written by a workload.
+
+    @param resultFile name of the result file
+    @type str
+    @return run time in seconds
+    @rtype float
+    @exception RuntimeError raised to indicate a missing result
+    """
+    try:
+        with open(resultFile) as f:
+            duration = float(f.read())
+        os.remove(resultFile)
+    except (IOError, OSError, ValueError):
+        raise RuntimeError("the workload didn't finish")
+    return duration
+
+
+def runPlain(python, workdir, program, argv):
+    """
+    Function to run a workload without a debugger.
+
+    @param python path of the interpreter
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the workloads
+    @type str
+    @param argv arguments of the workload
+    @type list of str
+    @return run time in seconds
+    @rtype float
+    """
+    subprocess.check_call([python, program] + argv, cwd=workdir)
+    return readResult(argv[-1])
+
+
+def runDebugged(ideClass, python, workdir, program, argv, session):
+    """
+    Function to run a workload under a debug client.
+
+    @param ideClass class of the IDE stand-in
+    @type class
+    @param python path of the interpreter
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the workloads
+    @type str
+    @param argv arguments of the workload
+    @type list of str
+    @param session keyword arguments of FakeIde.runSession
+    @type dict
+    @return run time in seconds and number of messages of the client
+    @rtype tuple of (float, int)
+    """
+    ide = ideClass(python)
+    ide.runSession(workdir, program, argv, **session)
+    return readResult(argv[-1]), ide.messages
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the slowdown caused by the debug clients.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--python2", default="python2",
+                        help="interpreter for the legacy client")
+    parser.add_argument("--clients", default="eric6,legacy",
+                        help="comma separated clients to benchmark")
+    parser.add_argument("--workloads", default=",".join(WorkloadNames),
+                        help="comma separated workloads to run")
+    parser.add_argument("--configurations",
+                        default=",".join(ConfigurationNames),
+                        help="comma separated configurations to measure")
+    parser.add_argument("--scale", type=float, default=1.0,
+                        help="scale of the workloads")
+    parser.add_argument("--legacy-scale", type=float, default=0.1,
+                        help="scale of the workloads of the legacy client")
+    parser.add_argument("--breakpoints", type=int, default=10,
+                        help="number of unconditional breakpoints")
+    parser.add_argument("--repeat", type=int, default=1,
+                        help="number of runs, the fastest one is reported")
+    args = parser.parse_args()
+
+    clients = {
+        "eric6": (Eric6Ide, args.python, args.scale),
+        "legacy": (LegacyIde, args.python2, args.legacy_scale),
+    }
+    workloadNames = args.workloads.split(",")
+    configurationNames = args.configurations.split(",")
+
+    workdir = tempfile.mkdtemp(prefix="bench_trace")
+    try:
+        # the coverage data file is written next to the program
+        program = os.path.join(workdir, "workloads.py")
+        shutil.copy(WorkloadsFile, program)
+        resultFile = os.path.join(workdir, "result.txt")
+        sessions = configurations(program, args.breakpoints)
+
+        for clientName in args.clients.split(","):
+            ideClass, python, scale = clients[clientName]
+            try:
+                version = subprocess.check_output(
+                    [python, "-c", "import sys; print(sys.version.split()[0])"]
+                ).decode().strip()
+            except (OSError, subprocess.CalledProcessError):
+                print("{0}: interpreter {1} not found, skipped".format(
+                    clientName, python))
+                continue
+
+            print("{0} client, Python {1}, scale {2}".format(
+                clientName, version, scale))
+            print("{0:16s}".format("") + "".join(
+                "{0:>12s}".format(name) for name in workloadNames))
+            baseline = {}
+            for name in workloadNames:
+                argv = [name, str(scale), resultFile]
+                baseline[name] = min(
+                    runPlain(python, workdir, program, argv)
+                    for _ in range(args.repeat))
+            print("{0:16s}".format("plain [s]") + "".join(
+                "{0:12.3f}".format(baseline[name]) for name in workloadNames))
+
+            for configurationName in configurationNames:
+                session = sessions[configurationName]
+                row = "{0:16s}".format(configurationName)
+                for name in workloadNames:
+                    if (session.get("callTrace") and
+                            not ideClass.SupportsCallTrace):
+                        row += "{0:>12s}".format("n/a")
+                        continue
+
+                    argv = [name, str(scale), resultFile]
+                    try:
+                        duration = min(
+                            runDebugged(ideClass, python, workdir, program,
+                                        argv, session)[0]
+                            for _ in range(args.repeat))
+                        row += "{0:11.1f}x".format(duration / baseline[name])
+                    except RuntimeError:
+                        row += "{0:>12s}".format("failed")
+                print(row)
+            print()
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
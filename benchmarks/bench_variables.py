@@ -0,0 +1,235 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module measuring the time the eric6 debug client needs to expand a tree of
+variables.
+
+A program building a tree of objects is stopped at a breakpoint and every
+node of the tree is expanded. The nodes are requested one after the other
+with RequestVariable, pipelined with request ids without waiting for the
+responses and all at once with RequestVariableTree.
+
+Usage: python bench_variables.py [options]
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+
+from fake_ide import Eric6Ide
+
+Program = """\
+class Node(object):
+    def __init__(self, depth, width):
+        self.payload = list(range(20))
+        self.text = "node at depth {{0}}".format(depth)
+        if depth > 0:
+            for index in range(width):
+                setattr(self, "child{{0}}".format(index),
+                        Node(depth - 1, width))
+
+tree = Node({depth}, {width})
+stop = True
+"""
+BreakpointLine = 11
+
+# Python 2 has no perf_counter()
+Timer = getattr(time, "perf_counter", time.time)
+
+
+def nodePaths(depth, width):
+    """
+    Function to create the list encoded names of all nodes of the tree.
+
+    @param depth depth of the tree
+    @type int
+    @param width number of children of a node
+    @type int
+    @return list encoded names of the nodes, parents first
+    @rtype list of list of str
+    """
+    paths = [["tree"]]
+    level = paths
+    for _ in range(depth):
+        level = [path + ["child{0}".format(index)]
+                 for path in level for index in range(width)]
+        paths.extend(level)
+    return paths
+
+
+def variableParams(var):
+    """
+    Function to create the parameters of a RequestVariable command.
+
+    @param var list encoded name of the variable
+    @type list of str
+    @return parameters of the command
+    @rtype dict
+    """
+    return {
+        "variable": var,
+        "frameNumber": 0,
+        "scope": 1,
+        "filters": [],
+        "maxSize": 1024,
+    }
+
+
+def expandSequential(ide, paths):
+    """
+    Function to expand the nodes waiting for each response.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param paths list encoded names of the nodes
+    @type list of list of str
+    """
+    for var in paths:
+        ide.sendJsonCommand("RequestVariable", variableParams(var))
+        ide.waitForResponse()
+
+
+def expandPipelined(ide, paths):
+    """
+    Function to expand the nodes sending all requests before waiting for
+    the responses.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param paths list encoded names of the nodes
+    @type list of list of str
+    @exception RuntimeError raised to indicate a missing response
+    """
+    for requestId, var in enumerate(paths):
+        ide.sendJsonCommand("RequestVariable", variableParams(var), requestId)
+    # the responses may come in any order
+    answered = set(ide.waitForResponse().get("id") for _ in paths)
+    if answered != set(range(len(paths))):
+        raise RuntimeError("responses are missing")
+
+
+def expandTree(ide, paths):
+    """
+    Function to expand the nodes by a single request.
+
+    @param ide reference to the IDE stand-in
+    @type Eric6Ide
+    @param paths list encoded names of the nodes
+    @type list of list of str
+    @exception RuntimeError raised to indicate a missing response
+    """
+    params = variableParams(None)
+    del params["variable"]
+    params["variables"] = paths
+    ide.sendJsonCommand("RequestVariableTree", params)
+    if len(ide.waitForResponse()["params"]["variables"]) != len(paths):
+        raise RuntimeError("responses are missing")
+
+
+Modes = [
+    ("sequential", expandSequential),
+    ("pipelined", expandPipelined),
+    ("tree", expandTree),
+]
+
+
+def measure(python, workdir, program, paths, repeat):
+    """
+    Function to measure the expansion of the tree in each mode.
+
+    @param python path of the interpreter running the client
+    @type str
+    @param workdir working directory
+    @type str
+    @param program file name of the program building the tree
+    @type str
+    @param paths list encoded names of the nodes
+    @type list of list of str
+    @param repeat number of runs, the fastest one is reported
+    @type int
+    @return fastest time of each mode in seconds
+    @rtype list of float
+    @exception RuntimeError raised to indicate a missing stop
+    """
+    ide = Eric6Ide(python)
+    ide.launch()
+    try:
+        ide.sendLoad(workdir, program, [])
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the first line")
+        ide.sendBreakpoint(program, BreakpointLine, "")
+        ide.sendContinue()
+        if ide.waitForEvent() != "line":
+            raise RuntimeError("the client didn't stop at the breakpoint")
+
+        times = []
+        for _name, expand in Modes:
+            fastest = None
+            for _ in range(repeat):
+                start = Timer()
+                expand(ide, paths)
+                duration = Timer() - start
+                if fastest is None or duration < fastest:
+                    fastest = duration
+            times.append(fastest)
+
+        ide.sendContinue()
+        if ide.waitForEvent() == "exit":
+            ide.sendShutdown()
+    finally:
+        ide.close()
+    return times
+
+
+def main():
+    """
+    Function running the benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the expansion of a tree of variables.")
+    parser.add_argument("--python", default=sys.executable,
+                        help="interpreter for the eric6 client")
+    parser.add_argument("--depth", type=int, default=2,
+                        help="depth of the tree")
+    parser.add_argument("--width", type=int, default=7,
+                        help="number of children of a node")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="number of runs, the fastest one is reported")
+    args = parser.parse_args()
+
+    paths = nodePaths(args.depth, args.width)
+    version = subprocess.check_output(
+        [args.python, "-c", "import sys; print(sys.version.split()[0])"]
+    ).decode().strip()
+    print("eric6 client, Python {0}, {1} nodes".format(version, len(paths)))
+    print("{0:12s}{1:>14s}{2:>14s}".format("mode", "total [ms]",
+                                           "per node [us]"))
+
+    workdir = tempfile.mkdtemp(prefix="bench_variables")
+    try:
+        program = os.path.join(workdir, "tree.py")
+        with open(program, "w") as f:
+            f.write(Program.format(depth=args.depth, width=args.width))
+
+        times = measure(args.python, workdir, program, paths, args.repeat)
+        for (name, _expand), duration in zip(Modes, times):
+            print("{0:12s}{1:14.2f}{2:14.1f}".format(
+                name, duration * 1e3, duration / len(paths) * 1e6))
+    finally:
+        shutil.rmtree(workdir, True)
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,609 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing a loopback stand-in for the IDE driving a debug client.
+
+The eric6 client gets length prefixed JSON-RPC commands as created by
+prepareJsonCommand and sends newline separated JSON-RPC messages or, if the
+msgpack encoding is asked for, length prefixed binary messages. The
+legacy client speaks the line based protocol of DebugProtocol. All messages
+of the client are read by a separate thread, so that a flood of call trace
+messages never blocks the client.
+
+The eric6 client is connected by TCP, a Unix domain socket or a socketpair
+passed as an inherited file descriptor. The legacy client uses TCP only.
+"""
+
+from __future__ import print_function
+
+import os
+import sys
+import json
+import socket
+import shutil
+import tempfile
+import subprocess
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue       # __IGNORE_WARNING__
+
+RemoteDebugDir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "RemoteDebug")
+sys.path.insert(0, RemoteDebugDir)
+
+from dbg_client_eric6.BinaryCodec import unpackMessage         # __IGNORE_WARNING__
+from dbg_client_eric6.DebugUtilities import (                   # __IGNORE_WARNING__
+    prepareJsonCommand, decompressCommand
+)
+
+
+class FakeIde(object):
+    """
+    Base class implementing the IDE side of a debug session.
+    """
+    Timeout = 600
+    SupportsCallTrace = True
+    Transports = ["tcp"]
+
+    def __init__(self, python, transport="tcp"):
+        """
+        Constructor
+
+        @param python path of the interpreter running the debug client
+        @type str
+        @keyparam transport connection to the client (tcp, unix or
+            socketpair)
+        @type str
+        @exception ValueError raised to indicate an unsupported transport
+        """
+        if transport not in self.Transports:
+            raise ValueError("unsupported transport " + transport)
+
+        self.python = python
+        self.transport = transport
+        self.messages = 0
+        self.bytesReceived = 0
+        self.process = None
+        self.connection = None
+
+        self.__events = queue.Queue()
+        self.__server = None
+        self.__clientSocket = None
+        self.__socketDir = None
+        self.port = 0
+        if transport == "tcp":
+            self.__server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__server.bind(("127.0.0.1", 0))
+            self.port = self.__server.getsockname()[1]
+            self.address = "127.0.0.1"
+        elif transport == "unix":
+            self.__socketDir = tempfile.mkdtemp(prefix="fake_ide")
+            path = os.path.join(self.__socketDir, "ide.sock")
+            self.__server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__server.bind(path)
+            self.address = "unix:" + path
+        else:
+            self.connection, self.__clientSocket = socket.socketpair()
+            self.address = "fd:{0}".format(self.__clientSocket.fileno())
+        if self.__server is not None:
+            self.__server.listen(1)
+
+    def clientCommand(self):
+        """
+        Public method to get the command line starting the debug client.
+
+        @return command line
+        @rtype list of str
+        @exception NotImplementedError raised to indicate a missing
+            implementation
+        """
+        raise NotImplementedError
+
+    def sendCommand(self, command):
+        """
+        Public method to send a command to the client.
+
+        @param command command string as expected by the client
+        @type str
+        """
+        self.connection.sendall(command.encode("utf-8"))
+
+    def readMessage(self, stream):
+        """
+        Public method to read a message of the client.
+
+        @param stream stream of the connection
+        @type file
+        @return message read, an empty one at the end of the stream
+        @rtype bytes
+        """
+        return stream.readline()
+
+    def parseMessage(self, data):
+        """
+        Public method to classify a message of the client.
+
+        @param data message as read by readMessage
+        @type bytes
+        @return "line" for a stop, "exception" for an exception, "exit" for
+            the end of the program or None
+        @rtype str
+        @exception NotImplementedError raised to indicate a missing
+            implementation
+        """
+        raise NotImplementedError
+
+    def launch(self):
+        """
+        Public method to start the client and to wait for its connection.
+        """
+        if self.__clientSocket is None:
+            self.process = subprocess.Popen(self.clientCommand())
+            self.__server.settimeout(FakeIde.Timeout)
+            self.connection = self.__server.accept()[0]
+        else:
+            fd = self.__clientSocket.fileno()
+            if sys.version_info[0] == 2:
+                self.process = subprocess.Popen(self.clientCommand(),
+                                                close_fds=False)
+            else:
+                self.process = subprocess.Popen(self.clientCommand(),
+                                                pass_fds=(fd, ))
+            # the client owns its end now
+            self.__clientSocket.close()
+            self.__clientSocket = None
+        reader = threading.Thread(target=self.__reader)
+        reader.daemon = True
+        reader.start()
+
+    def __reader(self):
+        """
+        Private method reading the messages of the client.
+        """
+        stream = self.connection.makefile("rb")
+        data = self.readMessage(stream)
+        while data:
+            self.messages += 1
+            self.bytesReceived += len(data)
+            event = self.parseMessage(data)
+            if event is not None:
+                self.__events.put(event)
+            data = self.readMessage(stream)
+        self.__events.put("closed")
+
+    def waitForEvent(self):
+        """
+        Public method to wait for a stop or the end of the program.
+
+        @return "line", "exception", "exit" or "closed"
+        @rtype str
+        @exception RuntimeError raised to indicate a hanging client
+        """
+        try:
+            return self.__events.get(timeout=FakeIde.Timeout)
+        except queue.Empty:
+            raise RuntimeError("debug client is not responding")
+
+    def runSession(self, workdir, program, argv, breakpoints=(), watches=(),
+                   callTrace=None, coverage=False):
+        """
+        Public method to run a program under control of the debug client.
+
+        The breakpoints and watch expressions are set, when the client stops
+        at the first line of the program, which is continued without further
+        stops.
+
+        @param workdir working directory of the program
+        @type str
+        @param program file name of the program
+        @type str
+        @param argv arguments of the program
+        @type list of str
+        @keyparam breakpoints breakpoints given as file name, line number and
+            condition
+        @type list of tuple of (str, int, str)
+        @keyparam watches watch expressions
+        @type list of str
+        @keyparam callTrace call trace mode to enable
+        @type str
+        @keyparam coverage flag indicating to run the program with coverage
+        @type bool
+        """
+        self.launch()
+        try:
+            if coverage:
+                self.sendCoverage(workdir, program, argv)
+            else:
+                self.sendLoad(workdir, program, argv)
+                if self.waitForEvent() == "line":
+                    for filename, line, condition in breakpoints:
+                        self.sendBreakpoint(filename, line, condition)
+                    for condition in watches:
+                        self.sendWatch(condition)
+                    if callTrace:
+                        self.sendCallTrace(True, callTrace)
+                    self.sendContinue()
+
+            event = self.waitForEvent()
+            while event == "line":
+                self.sendContinue()
+                event = self.waitForEvent()
+            if event == "exit":
+                self.sendShutdown()
+        finally:
+            self.close()
+
+    def close(self):
+        """
+        Public method to close the connection and to end the client.
+        """
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+        if self.__server is not None:
+            self.__server.close()
+            self.__server = None
+        if self.__socketDir is not None:
+            shutil.rmtree(self.__socketDir, True)
+            self.__socketDir = None
+        if self.process is not None:
+            if self.process.poll() is None:
+                try:
+                    self.process.wait(timeout=10)
+                except TypeError:
+                    # Python 2 has no timeout
+                    self.process.wait()
+                except subprocess.TimeoutExpired:
+                    self.process.kill()
+                    self.process.wait()
+            self.process = None
+
+
+class Eric6Ide(FakeIde):
+    """
+    Class implementing the IDE side for the eric6 debug client.
+    """
+    Transports = ["tcp", "unix", "socketpair"]
+    # messages passed to waitForResponse()
+    Responses = ["ResponseVariables", "ResponseVariable",
+                 "ResponseVariableTree", "ResponseBuffer"]
+
+    def __init__(self, python, transport="tcp", encoding="json"):
+        """
+        Constructor
+
+        @param python path of the interpreter running the debug client
+        @type str
+        @keyparam transport connection to the client (tcp, unix or
+            socketpair)
+        @type str
+        @keyparam encoding encoding of the messages of the client (json or
+            msgpack)
+        @type str
+        """
+        super(Eric6Ide, self).__init__(python, transport)
+
+        self.encoding = encoding
+        self.__responses = queue.Queue()
+
+    def clientCommand(self):
+        """
+        Public method to get the command line starting the debug client.
+
+        @return command line
+        @rtype list of str
+        """
+        code = (
+            "import sys; sys.path[:0] = [{0!r}, {1!r}];"
+            "sys.argv = ['', {2!r}, 'False', {3!r}];"
+            "from dbg_client_eric6.DebugClient import DebugClient;"
+            "DebugClient().main()"
+        ).format(RemoteDebugDir, os.path.join(RemoteDebugDir,
+                                              "dbg_client_eric6"),
+                 str(self.port), self.address)
+        return [self.python, "-c", code]
+
+    def sendJsonCommand(self, method, params, requestId=None):
+        """
+        Public method to send a JSON-RPC command to the client.
+
+        @param method command name
+        @type str
+        @param params dictionary of named parameters
+        @type dict
+        @keyparam requestId id of the request, it is passed back with the
+            responses
+        @type int
+        """
+        data = prepareJsonCommand(method, params, requestId).encode("utf-8")
+        self.connection.sendall("{0:09d}".format(len(data)).encode() + data)
+
+    def launch(self):
+        """
+        Public method to start the client and to wait for its connection.
+
+        The client is asked for the encoding of its messages first.
+        """
+        super(Eric6Ide, self).launch()
+        if self.encoding != "json":
+            self.sendJsonCommand("RequestCapabilities", {
+                "encodings": [self.encoding],
+            })
+
+    def readMessage(self, stream):
+        """
+        Public method to read a message of the client.
+
+        @param stream stream of the connection
+        @type file
+        @return message read, an empty one at the end of the stream
+        @rtype bytes
+        """
+        first = stream.read(1)
+        if first == b"{":
+            return first + stream.readline()
+        elif not first:
+            return first
+
+        # binary and compressed messages are prefixed by their length
+        header = first + stream.read(8)
+        return header + stream.read(int(header))
+
+    def parseMessage(self, data):
+        """
+        Public method to classify a message of the client.
+
+        @param data message as read by readMessage
+        @type bytes
+        @return "line" for a stop, "exception" for an exception, "exit" for
+            the end of the program or None
+        @rtype str
+        """
+        if data[:1] != b"{":
+            data = decompressCommand(data[9:])
+        if data[:1] == b"{":
+            message = json.loads(data.decode("utf-8"))
+        else:
+            message = unpackMessage(data)
+        method = message["method"]
+        if method in self.Responses:
+            self.__responses.put(message)
+            return None
+        elif method == "ResponseLine":
+            return "line"
+        elif method == "ResponseException":
+            return "exception"
+        elif method == "ResponseExit":
+            return "exit"
+        else:
+            return None
+
+    def waitForResponse(self):
+        """
+        Public method to wait for a response to a variables request.
+
+        @return response message
+        @rtype dict
+        @exception RuntimeError raised to indicate a hanging client
+        """
+        try:
+            return self.__responses.get(timeout=FakeIde.Timeout)
+        except queue.Empty:
+            raise RuntimeError("debug client is not responding")
+
+    def sendLoad(self, workdir, program, argv):
+        """
+        Public method to load a program for debugging.
+
+        @param workdir working directory of the program
+        @type str
+        @param program file name of the program
+        @type str
+        @param argv arguments of the program
+        @type list of str
+        """
+        self.sendJsonCommand("RequestLoad", {
+            "workdir": workdir,
+            "filename": program,
+            "argv": argv,
+            "traceInterpreter": False,
+            "autofork": False,
+            "forkChild": False,
+        })
+
+    def sendCoverage(self, workdir, program, argv):
+        """
+        Public method to run a program with coverage.
+
+        @param workdir working directory of the program
+        @type str
+        @param program file name of the program
+        @type str
+        @param argv arguments of the program
+        @type list of str
+        """
+        self.sendJsonCommand("RequestCoverage", {
+            "workdir": workdir,
+            "filename": program,
+            "argv": argv,
+            "erase": True,
+        })
+
+    def sendBreakpoint(self, filename, line, condition):
+        """
+        Public method to set a breakpoint.
+
+        @param filename file name of the breakpoint
+        @type str
+        @param line line number of the breakpoint
+        @type int
+        @param condition condition of the breakpoint
+        @type str
+        """
+        self.sendJsonCommand("RequestBreakpoint", {
+            "filename": filename,
+            "line": line,
+            "temporary": False,
+            "setBreakpoint": True,
+            "condition": condition,
+        })
+
+    def sendWatch(self, condition):
+        """
+        Public method to set a watch expression.
+
+        @param condition watch expression
+        @type str
+        """
+        self.sendJsonCommand("RequestWatch", {
+            "temporary": False,
+            "setWatch": True,
+            "condition": condition,
+        })
+
+    def sendCallTrace(self, enable, mode="events"):
+        """
+        Public method to switch the call trace.
+
+        @param enable flag indicating to enable the call trace
+        @type bool
+        @keyparam mode call trace mode
+        @type str
+        """
+        self.sendJsonCommand("RequestCallTrace", {
+            "enable": enable,
+            "mode": mode,
+        })
+
+    def sendContinue(self):
+        """
+        Public method to continue the program.
+        """
+        self.sendJsonCommand("RequestContinue", {"special": False})
+
+    def sendShutdown(self):
+        """
+        Public method to end the client.
+        """
+        self.sendJsonCommand("RequestShutdown", {})
+
+
+class LegacyIde(FakeIde):
+    """
+    Class implementing the IDE side for the legacy debug client.
+
+    The legacy client has no call trace.
+    """
+    SupportsCallTrace = False
+
+    def clientCommand(self):
+        """
+        Public method to get the command line starting the debug client.
+
+        @return command line
+        @rtype list of str
+        """
+        return [self.python,
+                os.path.join(RemoteDebugDir, "dbg_client", "DebugClient.py"),
+                str(self.port), "0", "127.0.0.1"]
+
+    def parseMessage(self, data):
+        """
+        Public method to classify a message of the client.
+
+        @param data message line
+        @type bytes
+        @return "line" for a stop, "exit" for the end of the program or None
+        @rtype str
+        """
+        line = data.decode("utf-8", "replace")
+        if line.startswith(">Line<"):
+            return "line"
+        elif line.startswith(">Exit<"):
+            return "exit"
+        else:
+            return None
+
+    def sendLoad(self, workdir, program, argv):
+        """
+        Public method to load a program for debugging.
+
+        @param workdir working directory of the program
+        @type str
+        @param program file name of the program
+        @type str
+        @param argv arguments of the program
+        @type list of str
+        """
+        self.sendCommand(">Load<{0}|{1}|{2!r}|0\n".format(
+            workdir, program, argv))
+
+    def sendCoverage(self, workdir, program, argv):
+        """
+        Public method to run a program with coverage.
+
+        @param workdir working directory of the program
+        @type str
+        @param program file name of the program
+        @type str
+        @param argv arguments of the program
+        @type list of str
+        """
+        self.sendCommand(">Coverage<{0}@@{1}@@{2!r}@@1\n".format(
+            workdir, program, argv))
+
+    def sendBreakpoint(self, filename, line, condition):
+        """
+        Public method to set a breakpoint.
+
+        @param filename file name of the breakpoint
+        @type str
+        @param line line number of the breakpoint
+        @type int
+        @param condition condition of the breakpoint
+        @type str
+        """
+        self.sendCommand(">Break<{0}@@{1}@@0@@1@@{2}\n".format(
+            filename, line, condition))
+
+    def sendWatch(self, condition):
+        """
+        Public method to set a watch expression.
+
+        @param condition watch expression
+        @type str
+        """
+        self.sendCommand(">Watch<{0}@@0@@1\n".format(condition))
+
+    def sendCallTrace(self, enable, mode="events"):
+        """
+        Public method to switch the call trace.
+
+        @param enable flag indicating to enable the call trace
+        @type bool
+        @keyparam mode call trace mode
+        @type str
+        @exception RuntimeError raised to indicate the missing call trace
+        """
+        raise RuntimeError("the legacy client has no call trace")
+
+    def sendContinue(self):
+        """
+        Public method to continue the program.
+        """
+        self.sendCommand(">Continue<0\n")
+
+    def sendShutdown(self):
+        """
+        Public method to end the client.
+        """
+        self.sendCommand(">Shutdown<\n")
+
+#
+# eflag: noqa = M702
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the programs run by the trace overhead benchmark.
+
+Every workload function gets a count parameter scaling its run time. The
+lines marked with "bench: hot" are executed most often and get the
+conditional breakpoints of the benchmark. The lines of idle() are never
+executed and get the unconditional breakpoints.
+
+Usage: python workloads.py workload scale result_file
+"""
+
+from __future__ import print_function
+
+import sys
+import time
+import threading
+
+
+def numeric(count):
+    """
+    Function running a tight numeric loop.
+
+    @param count number of loop iterations divided by 400000
+    @type float
+    @return computed value
+    @rtype int
+    """
+    total = 0
+    for i in range(int(count * 400000)):
+        total += i * i % 7          # bench: hot
+    return total
+
+
+def fib(count):
+    """
+    Function calculating a Fibonacci number recursively.
+
+    @param count number to calculate the Fibonacci number of
+    @type int
+    @return Fibonacci number
+    @rtype int
+    """
+    if count < 2:                   # bench: hot
+        return count
+    return fib(count - 1) + fib(count - 2)
+
+
+def descend(count):
+    """
+    Function descending into a deep recursion.
+
+    @param count recursion depth
+    @type int
+    @return recursion depth
+    @rtype int
+    """
+    if count == 0:                  # bench: hot
+        return 0
+    return descend(count - 1) + 1
+
+
+def recursion(count):
+    """
+    Function running deep and branching recursions.
+
+    @param count scale of the workload
+    @type float
+    @return computed value
+    @rtype int
+    """
+    total = 0
+    for _ in range(int(count * 1000)):
+        total += descend(200)
+    return total + fib(int(count) + 16)
+
+
+def add(count, value):
+    """
+    Function being called many times.
+
+    @param count number to be added
+    @type int
+    @param value value to be added to
+    @type int
+    @return sum
+    @rtype int
+    """
+    return value + count            # bench: hot
+
+
+def calls(count):
+    """
+    Function running many short calls.
+
+    @param count number of calls divided by 200000
+    @type float
+    @return computed value
+    @rtype int
+    """
+    total = 0
+    for i in range(int(count * 200000)):
+        total = add(i, total) % 1000
+    return total
+
+
+def squares(count):
+    """
+    Generator yielding square numbers.
+
+    @param count number of squares
+    @type int
+    @yield square numbers
+    @ytype int
+    """
+    for i in range(count):
+        yield i * i                 # bench: hot
+
+
+def generators(count):
+    """
+    Function running chained generators.
+
+    @param count number of items divided by 200000
+    @type float
+    @return computed value
+    @rtype int
+    """
+    evens = (x for x in squares(int(count * 200000)) if x % 2 == 0)
+    return sum(x % 13 for x in evens)
+
+
+def threads(count):
+    """
+    Function running the numeric loop in several threads.
+
+    @param count scale of the loop of each thread
+    @type float
+    @return number of threads
+    @rtype int
+    """
+    workers = [threading.Thread(target=numeric, args=(count,))
+               for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return len(workers)
+
+
+def idle(count):
+    """
+    Function, which is never called, holding the unconditional breakpoints.
+
+    @param count dummy value
+    @type int
+    @return dummy value
+    @rtype int
+    """
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    count += 1
+    return count
+
+
+Workloads = {
+    "numeric": numeric,
+    "recursion": recursion,
+    "calls": calls,
+    "generators": generators,
+    "threads": threads,
+}
+
+
+def main():
+    """
+    Function running a workload and writing its run time to a file.
+    """
+    name, scale, resultFile = sys.argv[1:4]
+    workload = Workloads[name]
+    start = time.time()
+    workload(float(scale))
+    duration = time.time() - start
+    with open(resultFile, "w") as f:
+        f.write("{0!r}\n".format(duration))
+
+
+if __name__ == "__main__":
+    main()
+
+#
+# eflag: noqa = M702
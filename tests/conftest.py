@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the fixtures shared by the tests of the eric6 debug
+client.
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+RemoteDebugDir = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "RemoteDebug")
+sys.path.insert(0, RemoteDebugDir)
+
+from dbg_client_eric6.DebugBase import DebugBase                # __IGNORE_WARNING__
+from dbg_client_eric6.BreakpointWatch import Breakpoint, Watch  # __IGNORE_WARNING__
+from dbg_client_eric6.DebugClientBase import DebugClientBase    # __IGNORE_WARNING__
+from dbg_client_eric6 import DebugClientBase as DebugClientModule  # __IGNORE_WARNING__
+
+try:
+    import builtins
+except ImportError:
+    import __builtin__ as builtins  # __IGNORE_WARNING__
+
+# the debug client module replaces these functions for the debugged program
+# on import, the test session keeps the original ones
+os.close = DebugClientModule.DebugClientOrigClose
+if hasattr(DebugClientModule, "DebugClientOrigFork"):
+    os.fork = DebugClientModule.DebugClientOrigFork
+sys.setrecursionlimit = DebugClientModule.DebugClientOrigSetRecursionLimit
+builtins.input = DebugClientModule.DebugClientOrigInput
+
+try:
+    import _thread
+except ImportError:
+    import thread as _thread    # __IGNORE_WARNING__
+
+
+class FakeClient(object):
+    """
+    Class implementing the parts of the debug client used by DebugBase and
+    the trace backends.
+    """
+    callTraceEnabled = None
+    debugging = True
+    detached = False
+    tracerInstalled = False
+    monitor = None
+    pollTimerEnabled = False
+    eventLoopActive = False
+    threadNumber = 1
+
+    def __init__(self):
+        """
+        Constructor
+        """
+        self.threads = {}
+
+    def getThread(self, ident=None):
+        """
+        Public method to get the debugger of a thread.
+
+        @keyparam ident id of the thread or None for the current one
+        @type int
+        @return debugger of the thread
+        @rtype DebugBase
+        """
+        return self.threads[ident or _thread.get_ident()]
+
+    def lockClient(self, blocking=True):
+        """
+        Public method to acquire the lock of the client.
+
+        @keyparam blocking flag indicating a blocking lock
+        @type bool
+        @return flag indicating the lock was acquired
+        @rtype bool
+        """
+        return True
+
+    def unlockClient(self):
+        """
+        Public method to release the lock of the client.
+        """
+
+    def eventPoll(self):
+        """
+        Public method to poll for commands of the IDE.
+        """
+
+    def absPath(self, fn):
+        """
+        Public method to convert a file name to an absolute one.
+
+        @param fn file name
+        @type str
+        @return absolute file name
+        @rtype str
+        """
+        return os.path.abspath(fn)
+
+    def fix_frame_filename(self, frame):
+        """
+        Public method to get the file name of a frame.
+
+        @param frame frame object
+        @type frame object
+        @return absolute file name
+        @rtype str
+        """
+        return os.path.abspath(frame.f_code.co_filename)
+
+
+class RecordingDebugger(DebugBase):
+    """
+    Class implementing a debugger recording the lines it stops at.
+    """
+    def __init__(self, client):
+        """
+        Constructor
+
+        @param client the owning client
+        @type FakeClient
+        """
+        DebugBase.__init__(self, client)
+        self.stops = []
+
+    def user_line(self, frame):
+        """
+        Public method recording a stop.
+
+        @param frame frame stopped in
+        @type frame object
+        """
+        self.stops.append((os.path.basename(frame.f_code.co_filename),
+                           frame.f_lineno))
+
+
+@pytest.fixture(autouse=True)
+def clearBreakpointsAndWatches():
+    """
+    Fixture removing the breakpoints and watch expressions of a test.
+    """
+    yield
+    Breakpoint.clear_all_breaks()
+    Watch.clear_all_watches()
+
+
+@pytest.fixture
+def debugger():
+    """
+    Fixture creating a recording debugger for the current thread.
+
+    @return debugger
+    @rtype RecordingDebugger
+    """
+    client = FakeClient()
+    dbg = RecordingDebugger(client)
+    client.threads[_thread.get_ident()] = dbg
+    return dbg
+
+
+
+@pytest.fixture
+def client():
+    """
+    Fixture creating a debug client, which isn't connected to an IDE and
+    records the messages it sends.
+
+    Only the DebugClientBase part is created, the thread extension would
+    hook the imports of the test session.
+
+    @return debug client with a list of the sent (method, params) tuples as
+        attribute "sent" and a method "command" handling a command and
+        returning the last message sent
+    @rtype DebugClientBase
+    """
+    debugClient = DebugClientBase()
+    debugClient.sent = []
+
+    def sendJsonCommand(method, params):
+        debugClient.sent.append((method, params))
+
+    def command(method, params):
+        debugClient.handleJsonCommand(json.dumps({
+            "jsonrpc": "2.0",
+            "method": method,
+            "params": params,
+        }))
+        return debugClient.sent[-1] if debugClient.sent else None
+
+    debugClient.sendJsonCommand = sendJsonCommand
+    debugClient.command = command
+    return debugClient
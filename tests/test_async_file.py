@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the socket file reading and writing the
+messages exchanged with the IDE.
+"""
+
+import json
+import socket
+
+import pytest
+
+from dbg_client_eric6 import AsyncFile as AsyncFileModule
+from dbg_client_eric6.AsyncFile import AsyncFile, AsyncWriter
+from dbg_client_eric6.BinaryCodec import packMessage, unpackMessage
+from dbg_client_eric6.DebugUtilities import (
+    prepareJsonCommand, compressCommand, decompressCommand,
+    CompressedMessageFlag
+)
+
+
+class ChunkedSocket(object):
+    """
+    Class implementing a socket receiving the data in given chunks.
+    """
+    def __init__(self, chunks):
+        """
+        Constructor
+
+        @param chunks chunks returned by the receive calls, the connection
+            is closed after the last one
+        @type list of bytes
+        """
+        self.chunks = list(chunks)
+        self.receiveCalls = 0
+
+    def recv_into(self, buffer):
+        """
+        Public method to receive the next chunk.
+
+        @param buffer buffer to receive into
+        @type memoryview
+        @return number of bytes received
+        @rtype int
+        """
+        self.receiveCalls += 1
+        if not self.chunks:
+            return 0
+        chunk = self.chunks.pop(0)
+        if len(chunk) > len(buffer):
+            self.chunks.insert(0, chunk[len(buffer):])
+            chunk = chunk[:len(buffer)]
+        buffer[:len(chunk)] = chunk
+        return len(chunk)
+
+
+def frame(command):
+    """
+    Function adding the length field to a command.
+
+    @param command command to be framed
+    @type bytes
+    @return framed command
+    @rtype bytes
+    """
+    return "{0:09d}".format(len(command)).encode() + command
+
+
+def jsonCommand(method, **params):
+    """
+    Function creating a framed JSON command.
+
+    @param method name of the command
+    @type str
+    @param params parameters of the command
+    @type dict
+    @return framed command
+    @rtype bytes
+    """
+    return frame(json.dumps({"method": method, "params": params}).encode())
+
+
+def commandFile(chunks):
+    """
+    Function creating a file reading commands from chunks of data.
+
+    @param chunks chunks of the received data
+    @type list of bytes
+    @return file object
+    @rtype AsyncFile
+    """
+    return AsyncFile(ChunkedSocket(chunks), "r", "stdin")
+
+
+def test_command_read():
+    """
+    Test reading a single command.
+    """
+    data = jsonCommand("RequestContinue", special=False)
+    stream = commandFile([data])
+
+    assert json.loads(stream.readCommand())["method"] == "RequestContinue"
+    assert stream.readCommand() == ""
+
+
+def test_partial_header():
+    """
+    Test reading a command received byte by byte.
+    """
+    data = jsonCommand("RequestStep")
+    stream = commandFile([data[i:i + 1] for i in range(len(data))])
+
+    assert json.loads(stream.readCommand())["method"] == "RequestStep"
+
+
+def test_several_commands_in_one_receive():
+    """
+    Test draining all commands received at once.
+    """
+    data = b"".join(jsonCommand("RequestStep", n=n) for n in range(5))
+    sock = ChunkedSocket([data])
+    stream = AsyncFile(sock, "r", "stdin")
+
+    commands = [json.loads(command) for command in stream.readCommands()]
+    assert [command["params"]["n"] for command in commands] == \
+        list(range(5))
+    assert sock.receiveCalls == 1
+
+
+def test_commands_split_across_receives():
+    """
+    Test reading commands whose header and payload are split.
+    """
+    data = jsonCommand("RequestStep", n=1) + jsonCommand("RequestStep", n=2)
+    stream = commandFile([data[:5], data[5:20], data[20:]])
+
+    assert json.loads(stream.readCommand())["params"]["n"] == 1
+    assert json.loads(stream.readCommand())["params"]["n"] == 2
+
+
+def test_large_command(monkeypatch):
+    """
+    Test reading a command larger than the receive buffer.
+    """
+    monkeypatch.setattr(AsyncFileModule, "ReceiveBufferSize", 64)
+    statement = "x = 1\n" * 1000
+    data = jsonCommand("ExecuteStatement", statement=statement)
+    stream = commandFile([data[i:i + 100] for i in range(0, len(data), 100)])
+
+    command = json.loads(stream.readCommand())
+    assert command["params"]["statement"] == statement
+
+
+def test_invalid_length_field():
+    """
+    Test rejecting a command with an invalid length field and reading the
+    commands received later on.
+    """
+    stream = commandFile([b"xx0000012{}", jsonCommand("RequestStep")])
+
+    with pytest.raises(ValueError):
+        stream.readCommand()
+    assert json.loads(stream.readCommand())["method"] == "RequestStep"
+
+
+def test_binary_command():
+    """
+    Test reading a binary encoded command.
+    """
+    data = packMessage({"method": "RequestStep", "params": {}})
+    stream = commandFile([frame(data) + jsonCommand("RequestContinue")])
+
+    command = stream.readCommand()
+    assert isinstance(command, bytes)
+    assert unpackMessage(command)["method"] == "RequestStep"
+    assert json.loads(stream.readCommand())["method"] == "RequestContinue"
+
+
+def test_compressed_command():
+    """
+    Test reading a compressed command.
+    """
+    statement = "x = 1\n" * 1000
+    data = compressCommand(
+        json.dumps({"method": "ExecuteStatement",
+                    "params": {"statement": statement}}).encode(), 6)
+    stream = commandFile([data])
+
+    command = json.loads(stream.readCommand())
+    assert command["params"]["statement"] == statement
+
+
+def receiveMessages(sock, count):
+    """
+    Function receiving the messages sent by a writer.
+
+    @param sock socket to receive from
+    @type socket
+    @param count number of messages to receive
+    @type int
+    @return received messages with their length field
+    @rtype list of bytes
+    """
+    data = b""
+    messages = []
+    while len(messages) < count:
+        if data[:1] == b"{" and b"\n" in data:
+            message, data = data.split(b"\n", 1)
+            messages.append(message)
+        elif len(data) >= 9 and data[:1] != b"{" and \
+                len(data) >= 9 + int(data[:9]):
+            length = 9 + int(data[:9])
+            messages.append(data[:length])
+            data = data[length:]
+        else:
+            data += sock.recv(65536)
+    return messages
+
+
+def test_writer_compression():
+    """
+    Test compressing the large messages sent by a writer.
+    """
+    sock, ideSock = socket.socketpair()
+    writer = AsyncWriter(sock)
+    writer.setCompression(level=6, threshold=1000)
+    try:
+        small = prepareJsonCommand("ResponseContinue", {})
+        large = prepareJsonCommand("ResponseVariables",
+                                   {"variables": ["x" * 100] * 100})
+        writer.writeMessage(small)
+        writer.writeMessage(large)
+        writer.flush()
+
+        messages = receiveMessages(ideSock, 2)
+    finally:
+        writer.close()
+        sock.close()
+        ideSock.close()
+
+    assert messages[0] == small.rstrip("\n").encode()
+    compressed = messages[1]
+    assert compressed[9:10] == CompressedMessageFlag
+    assert decompressCommand(compressed[9:]) == large.rstrip("\n").encode()
+    assert writer.compressedMessages == 1
+    assert writer.bytesSaved == len(large) - len(compressed)
@@ -0,0 +1,103 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the binary message encoding.
+"""
+
+import pytest
+
+from dbg_client_eric6 import BinaryCodec
+from dbg_client_eric6.BinaryCodec import packMessage, unpackMessage
+from dbg_client_eric6.DebugUtilities import prepareBinaryCommand
+
+Message = {
+    "jsonrpc": "2.0",
+    "method": "ResponseVariables",
+    "params": {
+        "scope": -1,
+        "variables": [
+            ["name", "str", "'value'"],
+            ["count", "int", "12"],
+        ],
+        "text": u"ä" * 40,
+        "flags": [True, False, None],
+        "numbers": [0, -1, 127, 128, -33, 2 ** 16, -2 ** 31, 2 ** 63 - 1,
+                    0.5],
+        "long": list(range(20)),
+        "nested": {"key": {"key": {}}},
+    },
+}
+
+
+@pytest.fixture
+def purePython(monkeypatch):
+    """
+    Fixture selecting the pure Python implementation of the encoding.
+    """
+    monkeypatch.setattr(BinaryCodec, "msgpack", None)
+
+
+def test_round_trip(purePython):
+    """
+    Test decoding an encoded message.
+    """
+    assert unpackMessage(packMessage(Message)) == Message
+
+
+def test_large_containers(purePython):
+    """
+    Test encoding strings, lists and dicts needing the longer headers.
+    """
+    message = {
+        "text": "x" * 70000,
+        "items": list(range(70000)),
+        "map": dict((str(i), i) for i in range(300)),
+    }
+
+    assert unpackMessage(packMessage(message)) == message
+
+
+def test_huge_integer_as_string(purePython):
+    """
+    Test encoding an integer not fitting into 64 bits as a string.
+    """
+    assert unpackMessage(packMessage({"value": 2 ** 70})) == \
+        {"value": str(2 ** 70)}
+
+
+def test_unsupported_type(purePython):
+    """
+    Test rejecting an object of an unsupported type.
+    """
+    with pytest.raises(TypeError):
+        packMessage({"value": object()})
+
+
+def test_invalid_message(purePython):
+    """
+    Test rejecting a truncated message.
+    """
+    with pytest.raises(ValueError):
+        unpackMessage(packMessage(Message)[:-3])
+
+
+def test_compatible_with_msgpack(purePython):
+    """
+    Test decoding the pure Python encoding with the msgpack package.
+    """
+    msgpack = pytest.importorskip("msgpack")
+
+    assert msgpack.unpackb(packMessage(Message), raw=False) == Message
+
+
+def test_binary_command(purePython):
+    """
+    Test the length field of a binary encoded command.
+    """
+    data = prepareBinaryCommand("ResponseVariables", Message["params"])
+
+    assert int(data[:9]) == len(data) - 9
+    assert unpackMessage(data[9:])["params"] == Message["params"]
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the breakpoints.
+"""
+
+import sys
+import types
+
+import pytest
+
+from dbg_client_eric6 import DebugClientCapabilities
+from dbg_client_eric6.BreakpointWatch import Breakpoint, Watch
+
+Filename = "/work/target.py"
+
+GlobalValue = 5
+
+
+def conditionFrame(local=3):
+    """
+    Function returning its own frame.
+
+    @keyparam local local variable used by the conditions
+    @type int
+    @return frame of the function
+    @rtype frame object
+    """
+    return sys._getframe()
+
+
+def test_condition_compiled_once():
+    """
+    Test compiling the condition, when the breakpoint is set.
+    """
+    bp = Breakpoint(Filename, 10, cond="local > 2")
+
+    assert isinstance(bp.compiledCond, types.CodeType)
+    assert bp.cond == "local > 2"
+    assert "local" in bp.condNames
+
+
+def test_invalid_condition():
+    """
+    Test rejecting a breakpoint with an invalid condition.
+    """
+    with pytest.raises(SyntaxError):
+        Breakpoint(Filename, 10, cond="local >")
+    assert Breakpoint.get_break(Filename, 10) is None
+
+
+def test_condition_needs_locals():
+    """
+    Test evaluating a condition with the locals only, if it uses them.
+    """
+    code = conditionFrame.__code__
+
+    assert Breakpoint(Filename, 10, cond="local > 2").needsLocals(code)
+    assert not Breakpoint(Filename, 11, cond="GlobalValue > 2").needsLocals(
+        code)
+    assert Breakpoint(Filename, 12, cond="len(locals()) > 0").needsLocals(
+        code)
+    # module and class bodies have no fixed set of local names
+    moduleCode = compile("pass", Filename, "exec")
+    assert Breakpoint(Filename, 13, cond="GlobalValue > 2").needsLocals(
+        moduleCode)
+
+
+def test_conditional_break():
+    """
+    Test stopping at a conditional breakpoint, if the condition is true.
+    """
+    frame = conditionFrame()
+
+    Breakpoint(Filename, 10, cond="local > 2")
+    Breakpoint(Filename, 11, cond="GlobalValue < 2")
+    Breakpoint(Filename, 12, cond="undefinedName")
+
+    bp, deleteTemporary = Breakpoint.effectiveBreak(Filename, 10, frame)
+    assert bp is Breakpoint.get_break(Filename, 10) and deleteTemporary
+    assert Breakpoint.effectiveBreak(Filename, 11, frame) == (None, False)
+    # a failing condition always stops, but keeps a temporary breakpoint
+    bp, deleteTemporary = Breakpoint.effectiveBreak(Filename, 12, frame)
+    assert bp is not None and not deleteTemporary
+
+
+def test_ignore_count():
+    """
+    Test ignoring the hits of a breakpoint with a true condition.
+    """
+    frame = conditionFrame()
+    bp = Breakpoint(Filename, 10, cond="local > 2")
+    bp.ignore = 2
+
+    results = [Breakpoint.effectiveBreak(Filename, 10, frame)[0]
+               for _ in range(3)]
+    assert results == [None, None, bp]
+    assert bp.hits == 3
+
+
+def test_ignore_precheck():
+    """
+    Test ignoring hits without evaluating the condition.
+    """
+    frame = conditionFrame()
+    bp = Breakpoint(Filename, 10, cond="1 / 0")
+    bp.ignore = 2
+    bp.ignorePrecheck = True
+
+    results = [Breakpoint.effectiveBreak(Filename, 10, frame)[0]
+               for _ in range(3)]
+    # the failing condition is evaluated by the third hit only
+    assert results == [None, None, bp]
+
+
+def test_condition_error_reported(client):
+    """
+    Test reporting an invalid condition of a RequestBreakpoint command.
+    """
+    response = client.command("RequestBreakpoint", {
+        "filename": Filename,
+        "line": 10,
+        "temporary": False,
+        "setBreakpoint": True,
+        "condition": "local >",
+    })
+
+    assert response == ("ResponseBPConditionError",
+                        {"filename": Filename, "line": 10})
+    assert Breakpoint.get_break(Filename, 10) is None
+
+
+def breakpointParams(line, condition=None, temporary=False):
+    """
+    Function creating the parameters of a breakpoint of a RequestBreakpoints
+    command.
+
+    @param line line number of the breakpoint
+    @type int
+    @keyparam condition condition of the breakpoint
+    @type str
+    @keyparam temporary flag indicating a temporary breakpoint
+    @type bool
+    @return breakpoint parameters
+    @rtype dict
+    """
+    return {
+        "filename": Filename,
+        "line": line,
+        "temporary": temporary,
+        "condition": condition,
+    }
+
+
+def test_batch_breakpoints(client):
+    """
+    Test replacing all breakpoints with one RequestBreakpoints command.
+    """
+    client.command("RequestBreakpoints", {"breakpoints": [
+        breakpointParams(10), breakpointParams(11, "local > 2")]})
+    kept = Breakpoint.get_break(Filename, 10)
+    kept.hits = 5
+
+    response = client.command("RequestBreakpoints", {"breakpoints": [
+        breakpointParams(10), breakpointParams(12),
+        breakpointParams(13, "(")]})
+
+    assert response == ("ResponseBreakpoints", {
+        "added": 1,
+        "removed": 1,
+        "errors": [{"filename": Filename, "line": 13}],
+    })
+    assert sorted(line for _, line in Breakpoint.breaks) == [10, 12]
+    assert Breakpoint.get_break(Filename, 10) is kept
+    assert kept.hits == 5
+
+
+def test_batch_breakpoints_reindexed(client):
+    """
+    Test updating the breakpoint index of the code objects of a file
+    changed by a RequestBreakpoints command.
+    """
+    moduleCode = compile("def f():\n    b = 2\n    c = 3\n", Filename, "exec")
+    code = moduleCode.co_consts[0]
+    Breakpoint(Filename, 1)
+    assert Breakpoint.indexCode(code, Filename) == frozenset([1])
+
+    client.command("RequestBreakpoints", {"breakpoints": [
+        breakpointParams(2), breakpointParams(3)]})
+
+    assert Breakpoint.breakInCode[id(code)] == frozenset([2, 3])
+
+
+def test_batch_watches(client):
+    """
+    Test replacing all watch expressions with one RequestWatches command.
+    """
+    client.command("RequestWatches", {"watches": [
+        {"condition": "a > 1", "temporary": False},
+        {"condition": "b ??changed??", "temporary": False},
+    ]})
+
+    response = client.command("RequestWatches", {"watches": [
+        {"condition": "a > 1", "temporary": False},
+        {"condition": "c ??created??", "temporary": False},
+        {"condition": "d >", "temporary": False},
+    ]})
+
+    assert response == ("ResponseWatches", {
+        "added": 1,
+        "removed": 1,
+        "errors": ["d >"],
+    })
+    assert sorted(wp.cond for wp in Watch.watches) == \
+        ["a > 1", "c ??created??"]
+
+
+def test_batch_capability(client):
+    """
+    Test advertising the batched breakpoint commands.
+    """
+    assert client.clientCapabilities & \
+        DebugClientCapabilities.HasBatchBreakpoints
+
+
+def test_code_lines():
+    """
+    Test getting the line numbers of a code object.
+    """
+    source = "a = 1\n\nif a:\n    b = 2\n"
+    code = compile(source, Filename, "exec")
+
+    lines = Breakpoint.getCodeLines(code)
+    assert isinstance(lines, frozenset)
+    assert set([1, 3, 4]) <= lines
+    assert 2 not in lines
+
+
+def test_code_lines_memoized(monkeypatch):
+    """
+    Test computing the line numbers of an indexed code object only once.
+    """
+    code = compile("a = 1\nb = 2\nc = 3\n", Filename, "exec")
+    Breakpoint(Filename, 1)
+    Breakpoint.indexCode(code, Filename)
+
+    def failingGetCodeLines(code):
+        raise AssertionError("line numbers computed again")
+
+    monkeypatch.setattr(Breakpoint, "getCodeLines",
+                        staticmethod(failingGetCodeLines))
+    Breakpoint(Filename, 3)
+    assert Breakpoint.indexCode(code, Filename) == frozenset([1, 3])
+    Breakpoint.clear_break(Filename, 1)
+    assert Breakpoint.breakInCode[id(code)] == frozenset([3])
+
+
+def test_breakpoint_lines_per_file():
+    """
+    Test keeping the breakpoint lines of a file in a set and updating the
+    index of the changed file only.
+    """
+    otherFilename = "/work/other.py"
+    code = compile("a = 1\nb = 2\n", Filename, "exec")
+    otherCode = compile("a = 1\nb = 2\n", otherFilename, "exec")
+    Breakpoint(Filename, 1)
+    Breakpoint(otherFilename, 1)
+    Breakpoint.indexCode(code, Filename)
+    Breakpoint.indexCode(otherCode, otherFilename)
+
+    Breakpoint(Filename, 2)
+    Breakpoint(Filename, 2)
+    assert Breakpoint.breakInFile[Filename] == set([1, 2])
+    assert Breakpoint.breakInCode[id(code)] == frozenset([1, 2])
+    assert Breakpoint.breakInCode[id(otherCode)] == frozenset([1])
+
+    Breakpoint.clear_break(Filename, 1)
+    Breakpoint.clear_break(Filename, 2)
+    assert Filename not in Breakpoint.breakInFile
+    assert Breakpoint.breakInCode[id(code)] == frozenset()
+    assert Breakpoint.breakInCode[id(otherCode)] == frozenset([1])
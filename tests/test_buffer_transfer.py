@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the raw data transfer of RequestBuffer.
+"""
+
+import array
+import socket
+import struct
+
+import pytest
+
+from dbg_client_eric6 import BinaryCodec
+from dbg_client_eric6 import BufferTransfer
+from dbg_client_eric6.AsyncFile import AsyncWriter
+from dbg_client_eric6.BinaryCodec import unpackMessage
+from dbg_client_eric6.BufferTransfer import bufferWindow
+from dbg_client_eric6.DebugUtilities import prepareBufferCommand
+
+
+def test_bytes_window():
+    """
+    Test getting a window of the bytes of a bytes object.
+    """
+    data, description = bufferWindow(b"0123456789", 2, 5)
+
+    assert bytes(data) == b"23456"
+    assert description["dtype"] == "|u1"
+    assert description["length"] == 10
+    assert (description["start"], description["count"]) == (2, 5)
+
+
+def test_contiguous_window_not_copied():
+    """
+    Test taking the window of contiguous memory without copying it.
+    """
+    buffer = bytearray(b"0123456789")
+
+    data, description = bufferWindow(buffer, 4, 2)
+    buffer[4] = ord("x")
+
+    assert bytes(data) == b"x5"
+    data.release()
+
+
+def test_array_window():
+    """
+    Test getting a window of the items of an array.array.
+    """
+    items = array.array("d", [float(i) for i in range(100)])
+
+    data, description = bufferWindow(items, 10, 3)
+
+    assert struct.unpack("3d", bytes(data)) == (10.0, 11.0, 12.0)
+    assert description["itemsize"] == 8
+    assert description["dtype"] in ("<f8", ">f8")
+    assert description["shape"] == [100]
+    assert description["count"] == 3
+
+
+def test_strided_window():
+    """
+    Test copying the items of a window of non-contiguous memory.
+    """
+    view = memoryview(bytearray(range(20)))[::2]
+    assert not view.c_contiguous
+
+    data, description = bufferWindow(view, 3, 4)
+
+    assert bytes(data) == bytes(bytearray([6, 8, 10, 12]))
+    assert description["length"] == 10
+
+
+def test_multidimensional_window():
+    """
+    Test counting the items of a multi-dimensional buffer in C order.
+    """
+    view = memoryview(bytearray(range(12))).cast("B", [3, 4])
+
+    data, description = bufferWindow(view, 5, 4)
+
+    assert bytes(data) == bytes(bytearray([5, 6, 7, 8]))
+    assert description["shape"] == [3, 4]
+    assert description["length"] == 12
+
+
+def test_window_clipped(monkeypatch):
+    """
+    Test clipping a window to the items and the maximum size.
+    """
+    items = array.array("i", range(100))
+
+    data, description = bufferWindow(items, 95)
+    assert description["count"] == 5
+    data, description = bufferWindow(items, 200, 10)
+    assert description["count"] == 0
+
+    monkeypatch.setattr(BufferTransfer, "MaxBufferSize", 16)
+    data, description = bufferWindow(items, 0, 50)
+    assert description["count"] == 16 // items.itemsize
+    assert len(bytes(data)) == 16
+
+
+def test_no_raw_data():
+    """
+    Test rejecting an object without raw data.
+    """
+    with pytest.raises(TypeError):
+        bufferWindow([1, 2, 3])
+
+
+def test_ndarray_windows():
+    """
+    Test getting windows of contiguous and strided numpy arrays.
+    """
+    numpy = pytest.importorskip("numpy")
+    arr = numpy.arange(20, dtype=numpy.int32).reshape(4, 5)
+
+    data, description = bufferWindow(arr, 6, 3)
+    assert numpy.frombuffer(data, numpy.int32).tolist() == [6, 7, 8]
+    assert description["shape"] == [4, 5]
+
+    data, description = bufferWindow(arr.T, 0, 4)
+    assert numpy.frombuffer(data, numpy.int32).tolist() == [0, 5, 10, 15]
+
+
+def test_buffer_command_round_trip(monkeypatch):
+    """
+    Test sending the raw data as a separate part of a binary message and
+    releasing it afterwards.
+    """
+    monkeypatch.setattr(BinaryCodec, "msgpack", None)
+    buffer = bytearray(b"x" * 1000)
+    data, description = bufferWindow(buffer, 100, 200)
+    parts = prepareBufferCommand("ResponseBuffer", {
+        "data": data,
+        "description": description,
+    })
+    del data
+
+    sock, ideSock = socket.socketpair()
+    writer = AsyncWriter(sock)
+    try:
+        writer.writeMessage(parts, "ResponseBuffer")
+        del parts
+        writer.flush()
+        received = b""
+        while len(received) < 9 or len(received) < 9 + int(received[:9]):
+            received += ideSock.recv(65536)
+    finally:
+        writer.close()
+        sock.close()
+        ideSock.close()
+
+    message = unpackMessage(received[9:])
+    assert message["params"]["data"] == b"x" * 200
+    assert message["params"]["description"]["start"] == 100
+    # the sent memoryview was released, the buffer may be resized
+    buffer.extend(b"y")
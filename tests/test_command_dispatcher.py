@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the registry of the command handlers.
+"""
+
+import pytest
+
+from dbg_client_eric6.CommandDispatcher import CommandDispatcher
+
+
+def test_dispatch_registered_command():
+    """
+    Test calling the handler of a registered command.
+    """
+    calls = []
+    dispatcher = CommandDispatcher()
+    dispatcher.register("RequestTest", calls.append)
+
+    assert dispatcher.dispatch("RequestTest", {"value": 1})
+    assert calls == [{"value": 1}]
+    assert dispatcher.commands() == ["RequestTest"]
+
+
+def test_unknown_command_ignored():
+    """
+    Test ignoring a command without a handler.
+    """
+    dispatcher = CommandDispatcher()
+
+    assert not dispatcher.dispatch("RequestUnknown", {})
+    assert dispatcher.statistics() == {}
+
+
+def test_replace_and_unregister():
+    """
+    Test replacing and removing the handler of a command.
+    """
+    calls = []
+    dispatcher = CommandDispatcher()
+    dispatcher.register("RequestTest", lambda params: calls.append("old"))
+    dispatcher.register("RequestTest", lambda params: calls.append("new"))
+
+    dispatcher.dispatch("RequestTest", {})
+    dispatcher.unregister("RequestTest")
+    dispatcher.unregister("RequestTest")
+
+    assert calls == ["new"]
+    assert dispatcher.handler("RequestTest") is None
+    assert not dispatcher.dispatch("RequestTest", {})
+
+
+def test_statistics():
+    """
+    Test counting the calls of the commands, even failing ones.
+    """
+    def failingHandler(params):
+        raise RuntimeError(params)
+
+    dispatcher = CommandDispatcher()
+    dispatcher.register("RequestTest", lambda params: None)
+    dispatcher.register("RequestFailing", failingHandler)
+
+    dispatcher.dispatch("RequestTest", {})
+    dispatcher.dispatch("RequestTest", {})
+    with pytest.raises(RuntimeError):
+        dispatcher.dispatch("RequestFailing", {})
+
+    statistics = dispatcher.statistics()
+    assert statistics["RequestTest"]["calls"] == 2
+    assert statistics["RequestFailing"]["calls"] == 1
+    assert statistics["RequestTest"]["max"] <= statistics["RequestTest"]["time"]
+
+    dispatcher.resetStatistics()
+    assert dispatcher.statistics() == {}
+
+
+def test_client_command_registered(client):
+    """
+    Test extending the commands of the debug client.
+    """
+    calls = []
+    client.commandDispatcher.register("RequestPlugin", calls.append)
+
+    client.command("RequestPlugin", {"value": 1})
+
+    assert calls == [{"value": 1}]
+    assert "RequestContinue" in client.commandDispatcher.commands()
+
+
+def test_client_batch(client):
+    """
+    Test handling the commands of a RequestBatch command in order.
+    """
+    calls = []
+    client.commandDispatcher.register(
+        "RequestPlugin", lambda params: calls.append(params["n"]))
+
+    client.command("RequestBatch", {"commands": [
+        {"method": "RequestPlugin", "params": {"n": n}} for n in range(3)]})
+
+    assert calls == [0, 1, 2]
+
+
+def test_client_command_statistics(client):
+    """
+    Test sending the command counters to the IDE.
+    """
+    client.commandDispatcher.register("RequestPlugin", lambda params: None)
+    client.command("RequestPlugin", {})
+
+    method, params = client.command("RequestCommandStatistics",
+                                    {"reset": True})
+
+    assert method == "ResponseCommandStatistics"
+    assert params["commands"]["RequestPlugin"]["calls"] == 1
+    assert "RequestPlugin" not in client.commandDispatcher.statistics()
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the resolvers of the variables.
+"""
+
+import array
+import gc
+import weakref
+
+import pytest
+
+from dbg_client_eric6 import DebugVariables
+from dbg_client_eric6.DebugVariables import (
+    MaxItemsToHandle, TooLargeAttribute, ArrayItemsContainer,
+    listResolver, dictResolver, setResolver, arrayResolver,
+    itemsContainerResolver, getType, getTypeInfo
+)
+from dbg_client_eric6.DebugConfig import ConfigVarTypeStrings
+
+
+def itemKeys(window):
+    """
+    Function getting the indexes of a window without the additional fields.
+
+    @param window window as returned by a resolver
+    @type dict
+    @return sorted indexes
+    @rtype list of str
+    """
+    return sorted((key for key in window if key.isdigit()), key=int)
+
+
+def test_list_window():
+    """
+    Test getting a window of the items of a large list.
+    """
+    items = list(range(100000))
+
+    window = listResolver.getWindow(items, 50000, 20)
+
+    assert itemKeys(window) == [str(i) for i in range(50000, 50020)]
+    assert window["50010"] == 50010
+    # the additional fields belong to the first window
+    assert "__len__" not in window
+    assert "__len__" in listResolver.getWindow(items, 0, 20)
+
+
+def test_window_clipped():
+    """
+    Test clipping windows to the items and the maximum number of items.
+    """
+    items = list(range(10))
+
+    assert itemKeys(listResolver.getWindow(items, 8, 20)) == ["8", "9"]
+    assert itemKeys(listResolver.getWindow(items, 20, 5)) == []
+    assert itemKeys(listResolver.getWindow(items, -5, 2)) == ["0", "1"]
+    assert len(itemKeys(listResolver.getWindow(
+        list(range(1000)), 0, 1000))) == MaxItemsToHandle
+
+
+def test_dict_windows_stable():
+    """
+    Test paging through a dictionary in a stable order.
+    """
+    items = dict(("key{0}".format(i), i) for i in range(1000))
+
+    values = []
+    for start in range(0, 1000, 100):
+        window = dictResolver.getWindow(items, start, 100)
+        values.extend(value for key, value in window.items()
+                      if "(ID:" in key)
+
+    assert sorted(values) == list(range(1000))
+    assert dictResolver.getWindow(items, 300, 100) == \
+        dictResolver.getWindow(items, 300, 100)
+
+
+def test_set_window():
+    """
+    Test getting a window of the items of a set.
+    """
+    items = set(range(1000))
+
+    window = setResolver.getWindow(items, 990, 20)
+
+    values = [value for key, value in window.items()
+              if key.startswith("ID: ")]
+    assert len(values) == 10
+    assert set(values) <= items
+
+
+def test_array_window():
+    """
+    Test getting a window of the items of an array.array.
+    """
+    items = array.array("i", range(100000))
+
+    window = arrayResolver.getWindow(items, 99990, 20)
+
+    assert window == dict((str(i), i) for i in range(99990, 100000))
+
+
+def test_items_container_limited():
+    """
+    Test limiting the items of an array shown without a window.
+    """
+    container = ArrayItemsContainer(array.array("d", range(1000)))
+
+    d = itemsContainerResolver.getDictionary(container)
+
+    assert TooLargeAttribute in d
+    assert d["299"] == 299.0
+    assert str(MaxItemsToHandle) not in d
+
+
+def test_ndarray_window():
+    """
+    Test getting a window of the rows of a numpy array.
+    """
+    numpy = pytest.importorskip("numpy")
+    items = numpy.arange(1000).reshape(100, 10)
+
+    window = DebugVariables.ndarrayResolver.getWindow(items, 90, 20)
+
+    assert itemKeys(window) == [str(i) for i in range(90, 100)]
+    assert list(window["95"]) == list(range(950, 960))
+
+
+class ClaimingDict(object):
+    """
+    Class of objects claiming to be dictionaries.
+    """
+    @property
+    def __class__(self):
+        """
+        Special property returning the class claimed.
+
+        @return claimed class
+        @rtype type
+        """
+        return dict
+
+
+class SubList(list):
+    """
+    Class deriving from a builtin container.
+    """
+
+
+def test_type_info_cached():
+    """
+    Test classifying a type once.
+    """
+    typeInfo = getTypeInfo(dict)
+
+    assert getTypeInfo(dict) is typeInfo
+    assert typeInfo.resolver is dictResolver
+    assert typeInfo.typeStr == "dict"
+    assert typeInfo.valueType == "dict"
+    assert typeInfo.filterIndex == ConfigVarTypeStrings.index("dict")
+    assert typeInfo.itemsCount == "len"
+
+
+def test_type_info_subclass():
+    """
+    Test classifying a subclass of a builtin container.
+    """
+    typeInfo = getTypeInfo(SubList)
+
+    assert typeInfo.resolver is listResolver
+    assert typeInfo.filterIndex == ConfigVarTypeStrings.index("instance")
+
+
+def test_type_info_plain_value():
+    """
+    Test classifying the type of a value without a resolver.
+    """
+    typeInfo = getTypeInfo(int)
+
+    assert typeInfo.resolver is None
+    assert typeInfo.itemsCount is None
+
+
+def test_type_infos_limited(monkeypatch):
+    """
+    Test dropping the classified types, when there are too many.
+    """
+    monkeypatch.setattr(DebugVariables, "MaxTypeInfos", 5)
+    for index in range(10):
+        getTypeInfo(type("Dynamic{0}".format(index), (object,), {}))
+
+    assert len(DebugVariables._TypeInfos) <= 5
+
+
+def test_class_override_resolved_like_claimed_class():
+    """
+    Test resolving an object claiming another class like this class, but
+    classifying it by its real type.
+    """
+    typeObject, typeName, typeStr, resolver = getType(ClaimingDict())
+
+    assert typeObject is ClaimingDict
+    assert typeName == "ClaimingDict"
+    assert resolver is dictResolver
+    # the cached classification of the real type isn't changed
+    assert getTypeInfo(ClaimingDict).resolver is \
+        DebugVariables.defaultResolver
+
+
+def test_proxy_resolved_like_referent():
+    """
+    Test resolving a weak reference proxy like the object it refers to.
+    """
+    referent = SubList([1, 2])
+    proxy = weakref.proxy(referent)
+
+    typeObject, typeName, typeStr, resolver = getType(proxy)
+
+    assert typeObject is weakref.ProxyType
+    assert resolver is listResolver
+
+
+def test_dead_proxy():
+    """
+    Test resolving a weak reference proxy of a deleted object.
+    """
+    proxy = weakref.proxy(SubList())
+    gc.collect()
+
+    assert getType(proxy)[0] is weakref.ProxyType
@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the bounded value formatter.
+"""
+
+import time
+
+from dbg_client_eric6 import ValueFormatter as ValueFormatterModule
+from dbg_client_eric6.ValueFormatter import (
+    ValueFormatter, OmissionMarker, TruncationMarker
+)
+
+
+class SlowRepr(object):
+    """
+    Class with a __repr__ method exceeding the time budget.
+    """
+    calls = 0
+
+    def __repr__(self):
+        """
+        Special method creating the representation slowly.
+
+        @return representation
+        @rtype str
+        """
+        SlowRepr.calls += 1
+        time.sleep(0.02)
+        return "SlowRepr()"
+
+
+class QgsVectorLayer(object):
+    """
+    Class standing in for the vector layer type of QGIS.
+    """
+    def __repr__(self):
+        """
+        Special method failing, if it is called at all.
+
+        @return representation
+        @rtype str
+        """
+        raise AssertionError("__repr__ of a known slow type called")
+
+
+QgsVectorLayer.__module__ = "qgis._core"
+
+
+class PluginLayer(QgsVectorLayer):
+    """
+    Class standing in for a layer type of a plugin.
+    """
+
+
+def test_small_values_complete():
+    """
+    Test formatting values fitting into the maximum size.
+    """
+    formatter = ValueFormatter(100)
+
+    assert formatter.format([1, "a", (2,)]) == "[1, 'a', (2,)]"
+    assert formatter.format({"a": 1}) == "{'a': 1}"
+    assert formatter.format(set()) == "set()"
+
+
+def test_long_string_sliced():
+    """
+    Test cutting off a long string.
+    """
+    formatter = ValueFormatter(10)
+
+    value = formatter.format("x" * 1000)
+    assert value.endswith(TruncationMarker)
+    assert len(value) == 10 + len(TruncationMarker)
+
+
+def test_long_integer_shortened():
+    """
+    Test omitting the middle digits of a long integer.
+    """
+    formatter = ValueFormatter(10)
+
+    value = formatter.format(10 ** 100)
+    assert OmissionMarker in value
+    assert value.endswith(TruncationMarker)
+
+
+def test_long_list_items_omitted():
+    """
+    Test formatting only the first items of a long list.
+    """
+    formatter = ValueFormatter(20)
+
+    value = formatter.format(list(range(100000)))
+    assert value.endswith(TruncationMarker)
+    assert len(value) <= 20 + len(TruncationMarker)
+
+
+def test_nested_containers_limited():
+    """
+    Test omitting deeply nested containers.
+    """
+    formatter = ValueFormatter(1000)
+
+    value = formatter.format([[[[[[[1]]]]]]])
+    assert OmissionMarker in value
+    assert value.endswith(TruncationMarker)
+
+
+def test_slow_repr_demoted(monkeypatch):
+    """
+    Test using the default representation after a __repr__ method exceeded
+    the time budget.
+    """
+    monkeypatch.setattr(ValueFormatterModule, "ReprTimeBudget", 0.01)
+    monkeypatch.setattr(SlowRepr, "calls", 0)
+    formatter = ValueFormatter(100)
+
+    # the first call is unbounded
+    assert formatter.format(SlowRepr()) == "SlowRepr()"
+    value = formatter.format([SlowRepr(), SlowRepr()])
+    assert "SlowRepr object at" in value
+    assert SlowRepr.calls == 1
+
+    # a new formatter tries again
+    assert ValueFormatter(100).format(SlowRepr()) == "SlowRepr()"
+    assert SlowRepr.calls == 2
+
+
+def test_known_slow_types():
+    """
+    Test using the default representation for the known slow types and
+    their subclasses.
+    """
+    formatter = ValueFormatter(100)
+
+    assert "qgis._core.QgsVectorLayer object at" in \
+        formatter.format(QgsVectorLayer())
+    assert "PluginLayer object at" in formatter.format(PluginLayer())
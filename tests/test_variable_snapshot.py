@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the variable snapshots used to send the
+changes of the variables of a frame.
+"""
+
+from dbg_client_eric6.VariableSnapshot import (
+    VariableSnapshot, VariableSnapshots, MaxReusedValueSize
+)
+
+MaxSize = 1024
+
+
+def formatted(varDict):
+    """
+    Function formatting variables like the debug client.
+
+    @param varDict dictionary of the variables
+    @type dict
+    @return formatted variables
+    @rtype list of tuple of (str, str, str)
+    """
+    return [(name, type(value).__name__, repr(value))
+            for name, value in sorted(varDict.items())]
+
+
+def test_changes():
+    """
+    Test determining the added, changed and removed variables.
+    """
+    before = {"a": 1, "b": "text", "c": [1, 2]}
+    after = {"a": 1, "b": "other", "d": None}
+    snapshot = VariableSnapshot(1, formatted(before), before, MaxSize)
+
+    added, changed, removed = snapshot.changes(formatted(after))
+
+    assert added == [("d", "NoneType", "None")]
+    assert changed == [("b", "str", "'other'")]
+    assert removed == ["c"]
+
+
+def test_no_changes():
+    """
+    Test an empty delta of unchanged variables.
+    """
+    variables = {"a": 1, "b": [1, 2]}
+    snapshot = VariableSnapshot(1, formatted(variables), variables, MaxSize)
+
+    assert snapshot.changes(formatted(variables)) == ([], [], [])
+
+
+def test_reused_values():
+    """
+    Test keeping the formatted values of small immutable values only.
+    """
+    large = "x" * (MaxReusedValueSize + 1)
+    variables = {"a": 1, "b": "text", "c": [1, 2], "d": large}
+    snapshot = VariableSnapshot(1, formatted(variables), variables, MaxSize)
+
+    values = snapshot.formattedValues(MaxSize)
+    assert sorted(values) == ["a", "b"]
+    assert values["b"] == ("text", "'text'")
+    # values formatted with another maximum size aren't reused
+    assert snapshot.formattedValues(MaxSize // 2) == {}
+
+
+def test_snapshots_per_frame():
+    """
+    Test keeping the last snapshot of each frame with a new id.
+    """
+    snapshots = VariableSnapshots()
+    first = snapshots.store(("frame", 0), formatted({"a": 1}), {}, MaxSize)
+    second = snapshots.store(("frame", 0), formatted({"a": 2}), {}, MaxSize)
+    other = snapshots.store(("frame", 1), formatted({"b": 1}), {}, MaxSize)
+
+    assert second.snapshotId > first.snapshotId
+    assert snapshots.get(("frame", 0)) is second
+    assert snapshots.get(("frame", 1)) is other
+
+    snapshots.clear()
+    assert snapshots.get(("frame", 0)) is None
+
+
+def test_oldest_snapshot_dropped():
+    """
+    Test limiting the number of snapshots.
+    """
+    snapshots = VariableSnapshots(maxSnapshots=3)
+    for frame in range(5):
+        snapshots.store(("frame", frame), [], {}, MaxSize)
+
+    assert [snapshots.get(("frame", frame)) is not None
+            for frame in range(5)] == [False, False, True, True, True]
@@ -0,0 +1,168 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the watch expressions.
+"""
+
+import gc
+import sys
+import weakref
+
+from dbg_client_eric6.BreakpointWatch import Watch
+
+
+def setWatch(cond):
+    """
+    Function creating a watch expression.
+
+    @param cond condition as string with flag
+    @type str
+    @return created watch expression
+    @rtype Watch
+    """
+    compiledCond, flag = Watch.compileCondition(cond)
+    return Watch(cond, compiledCond, flag)
+
+
+class Payload(object):
+    """
+    Class used to detect, that the locals of a frame are released.
+    """
+
+
+def usesTotal():
+    """
+    Function using the name watched by the tests.
+
+    @return the value of total
+    @rtype int
+    """
+    total = 1
+    return total
+
+
+def usesOther():
+    """
+    Function not using the name watched by the tests.
+
+    @return the value of other
+    @rtype int
+    """
+    other = 1
+    return other
+
+
+def test_watches_filtered_by_names():
+    """
+    Test getting only the watch expressions using names of a code object.
+    """
+    totalWatch = setWatch("total > 0")
+    attributeWatch = setWatch("self.total > 0")
+    localsWatch = setWatch("len(locals()) > 5")
+
+    watches = Watch.getWatches(usesTotal.__code__)
+    assert totalWatch in watches
+    assert attributeWatch in watches
+    assert localsWatch in watches
+
+    assert Watch.getWatches(usesOther.__code__) == [localsWatch]
+
+
+def test_watch_cache_invalidated():
+    """
+    Test updating the cached watch expressions when a watch is added or
+    removed.
+    """
+    assert Watch.getWatches(usesTotal.__code__) == []
+
+    watch = setWatch("total > 0")
+    assert Watch.getWatches(usesTotal.__code__) == [watch]
+
+    Watch.clear_watch("total > 0")
+    assert Watch.getWatches(usesTotal.__code__) == []
+
+
+def test_module_code_gets_all_watches():
+    """
+    Test getting all watch expressions for a module body.
+    """
+    watch = setWatch("total > 0")
+    code = compile("other = 1", "<module>", "exec")
+
+    assert Watch.getWatches(code) == [watch]
+
+
+def test_changed_watch():
+    """
+    Test a watch expression stopping when its value changes.
+    """
+    watch = setWatch("total ??changed??")
+    frame = sys._getframe()
+
+    total = 1
+    assert Watch.effectiveWatch(frame) == (watch, True)
+    assert Watch.effectiveWatch(frame) == (None, False)
+    total = 2
+    assert Watch.effectiveWatch(frame) == (watch, True)
+    assert total == 2
+
+
+def test_created_watch():
+    """
+    Test a watch expression stopping once per frame.
+    """
+    watch = setWatch("total ??created??")
+    frame = sys._getframe()
+
+    assert Watch.effectiveWatch(frame) == (None, False)
+    total = 1
+    assert Watch.effectiveWatch(frame) == (watch, True)
+    assert Watch.effectiveWatch(frame) == (None, False)
+    assert total == 1
+
+    Watch.releaseFrame(frame)
+    assert Watch.effectiveWatch(frame) == (watch, True)
+
+
+def test_values_dont_keep_frame_alive():
+    """
+    Test releasing a frame without return event while its values are
+    stored.
+    """
+    watch = setWatch("total ??changed??")
+
+    def run():
+        payload = Payload()     # __IGNORE_WARNING__
+        total = 1               # __IGNORE_WARNING__
+        Watch.effectiveWatch(sys._getframe())
+        return weakref.ref(payload)
+
+    ref = run()
+    gc.collect()
+    assert ref() is None
+    assert len(watch.values) == 1
+
+    Watch.releaseFrames()
+    assert len(watch.values) == 0
+
+
+def test_values_limited():
+    """
+    Test limiting the number of frames with stored values.
+    """
+    watch = setWatch("total ??created??")
+
+    def run():
+        total = 1   # __IGNORE_WARNING__
+        frame = sys._getframe()
+        Watch.effectiveWatch(frame)
+        return frame
+
+    # the frames are kept alive to get distinct ids
+    frames = [run() for _ in range(Watch.MaxFrameValues + 10)]
+    assert len(watch.values) == Watch.MaxFrameValues
+    assert id(frames[-1]) in watch.values
+    assert id(frames[0]) not in watch.values
@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) Sourcepole AG and the qgis-remote-debug contributors
+#
+
+"""
+Module implementing the tests of the zero trace breakpoint mode.
+"""
+
+import os
+import sys
+import textwrap
+
+import pytest
+
+from dbg_client_eric6.DebugMonitor import DebugMonitor
+from dbg_client_eric6.BreakpointWatch import Breakpoint
+
+Module = textwrap.dedent("""\
+    def total(n):
+        result = 0
+        for i in range(n):
+            result += i
+        return result
+    """)
+BreakpointLine = 4
+
+
+@pytest.fixture
+def module(tmp_path):
+    """
+    Fixture writing a module to be imported by a test.
+
+    @param tmp_path directory of the module
+    @type pathlib.Path
+    @return file name of the module
+    @rtype str
+    """
+    path = tmp_path / "zerotarget.py"
+    path.write_text(Module)
+    sys.path.insert(0, str(tmp_path))
+    yield str(path)
+    sys.path.remove(str(tmp_path))
+    sys.modules.pop("zerotarget", None)
+
+
+@pytest.fixture
+def monitor(debugger):
+    """
+    Fixture creating the zero trace backend of the debugger's client.
+
+    @param debugger debugger of the current thread
+    @type RecordingDebugger
+    @return zero trace backend
+    @rtype DebugMonitor
+    """
+    monitor = DebugMonitor(debugger._dbgClient, zeroTrace=True)
+    debugger._dbgClient.monitor = monitor
+    yield monitor
+    monitor.stop()
+
+
+def test_breakpoint_in_live_function(debugger, monitor, module):
+    """
+    Test stopping at a breakpoint of a function imported before.
+    """
+    import zerotarget
+    Breakpoint(module, BreakpointLine)
+    assert monitor.start()
+
+    assert zerotarget.total(3) == 3
+    assert debugger.stops == [("zerotarget.py", BreakpointLine)] * 3
+
+
+def test_breakpoint_before_import(debugger, monitor, module):
+    """
+    Test stopping at a breakpoint set before importing its module.
+    """
+    Breakpoint(module, BreakpointLine)
+    assert monitor.start()
+    import zerotarget
+
+    assert zerotarget.total(2) == 1
+    assert debugger.stops == [("zerotarget.py", BreakpointLine)] * 2
+
+
+def test_no_stop_after_stop(debugger, monitor, module):
+    """
+    Test running without stops after the backend was stopped.
+    """
+    Breakpoint(module, BreakpointLine)
+    assert monitor.start()
+    import zerotarget
+    monitor.stop()
+
+    assert zerotarget.total(2) == 1
+    assert debugger.stops == []